@@ -15,6 +15,7 @@ from src.tts_engine import TTSEngine
 from src.video_creator import VideoCreator
 from src.storage import StorageManager
 from src.srt_generator import SRTGenerator
+from src.draft import draft_config
 
 # Configuration du logging
 logging.basicConfig(
@@ -43,9 +44,13 @@ class VideoGenerator:
         parser = argparse.ArgumentParser(description="Génération de vidéo")
         parser.add_argument("-t", '--theme',dest='theme', nargs="?", help="Thème de la vidéo", default="None")
         parser.add_argument("-v", "--version", dest="v", help="Version à utiliser (v1 ou v2)", default="v1")
+        parser.add_argument("--draft", action="store_true",
+                            help="Rendu brouillon en basse résolution pour vérifier timings et mise en page")
 
         args = parser.parse_args()
         self.args = args
+        if args.draft:
+            self.config = draft_config(self.config)
         theme = args.theme
         if theme == "None":
             theme = self.theme_selector.get_next_theme()
@@ -54,6 +59,9 @@ class VideoGenerator:
         self.video_creator = VideoCreator(theme=self.theme, config=self.config)
         self.storage_manager = StorageManager(config=self.config)
         self.srt_generator = SRTGenerator(config=self.config)
+        if self.config["subtitles"].get("prewarm_whisperx", False):
+            # Modèles WhisperX chargés pendant la génération des questions et la synthèse vocale
+            self.srt_generator.prewarm()
         self.background_manager = BackgroundManager(config=self.config)
     def _load_config(self):
         """Charge la configuration depuis le fichier settings.json"""
@@ -81,19 +89,20 @@ class VideoGenerator:
         # 2. Génération des questions
         questions = self.question_generator.generate_question(theme)
         logger.info(f"{len(questions)} questions générées")
+        self.video_creator.prepare_texts(questions)
 
         # 3. Génération des vidéos pour chaque question
         video_clips = []
         all_audio_info = []
         current_time = 0  # Pour suivre le timing des sous-titres
         
-        for i, question in enumerate(questions, 1):
+        # Génération de la voix de toutes les questions (requêtes TTS en parallèle)
+        questions_audio_info = self.tts_engine.generate_questions_audio(questions)
+        logger.info(f"Audio généré pour {len(questions)} questions")
+
+        for i, (question, audio_info) in enumerate(zip(questions, questions_audio_info), 1):
             logger.info(f"Traitement de la question {i}/{len(questions)}")
             
-            # Génération de la voix avec les informations détaillées
-            audio_info = self.tts_engine.generate_question_audio(question)
-            logger.info(f"Audio généré pour la question {i}")
-            
             # Ajuster les timings pour les sous-titres
             for j, info in enumerate(audio_info):
                 info['start_time'] = current_time
@@ -107,8 +116,11 @@ class VideoGenerator:
             
             all_audio_info.extend(audio_info)
             
-            # Création de la vidéo
-            video_clip = self.video_creator.create_video(question, audio_info)
+            # Création de la vidéo (calques à plat pour le compositeur NumPy)
+            if self.video_creator.uses_scenes:
+                video_clip = self.video_creator.create_scene(question, audio_info)
+            else:
+                video_clip = self.video_creator.create_video(question, audio_info)
             video_clips.append(video_clip)
             logger.info(f"Vidéo générée pour la question {i}")
 
@@ -126,16 +138,17 @@ class VideoGenerator:
                 logger.info(f"Fichier SRT généré par répartition uniforme : {srt_file}")
 
             # 4. Concaténation des vidéos avec les sous-titres
-            final_video_path = self.video_creator.concatenate_videos(
+            final_video_path = self._concatenate(
                 video_clips=video_clips,
                 srt_file=srt_file,
                 audio_info=all_audio_info
             )
         else:
-            final_video_path = self.video_creator.concatenate_videos(video_clips=video_clips)
+            final_video_path = self._concatenate(video_clips=video_clips)
 
         # 5. Sauvegarde de la vidéo
-        saved_path = self.storage_manager.save_video(final_video_path)
+        filename = f"draft_{Path(final_video_path).name}" if self.args.draft else None
+        saved_path = self.storage_manager.save_video(final_video_path, filename)
         logger.info(f"Vidéo sauvegardée : {saved_path}")
 
         # Nettoyage des fichiers temporaires
@@ -144,6 +157,12 @@ class VideoGenerator:
 
         return saved_path
 
+    def _concatenate(self, video_clips: List, srt_file: str = None, audio_info: List[Dict] = None) -> str:
+        """Assemble les vidéos des questions avec le backend de rendu configuré"""
+        if self.video_creator.uses_scenes:
+            return self.video_creator.concatenate_scenes(video_clips, srt_file=srt_file, audio_info=audio_info)
+        return self.video_creator.concatenate_videos(video_clips, srt_file=srt_file, audio_info=audio_info)
+
     def calculate_duration_start_end(self, steps: List[Dict]):
         total_duration = 0.0
         for step in steps:
@@ -228,6 +247,7 @@ class VideoGenerator:
             "text": phase_3_text,
         })
         print(questions)
+        self.video_creator.prepare_texts([step["text"] for step in steps])
         steps = self.tts_engine.generate_question_audio_v2(steps)
         steps, total_duration = self.calculate_duration_start_end(steps)
         print(steps)
@@ -0,0 +1,28 @@
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from src.background_cache import BackgroundCache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prépare les mezzanines des vidéos de fond (à lancer depuis la racine: python -m scripts.prepare_backgrounds)")
+    parser.add_argument("--config", "-c", help="Fichier de configuration (défaut: config/settings.json)", default="config/settings.json")
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    cache_dir = Path(config["path_assets"].get("cache", "assets/cache")) / "backgrounds"
+    background_cache = BackgroundCache(
+        cache_dir=str(cache_dir),
+        size=(config["video"]["width"], config["video"]["height"]),
+        fps=config["video"]["fps"],
+        max_bytes=int(config.get("render", {}).get("background_cache_mb", 2048) * 1024 * 1024)
+    )
+    background_cache.prepare_directory(config["path_assets"]["backgrounds"])
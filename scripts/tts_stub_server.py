@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant l'API REST de Google Cloud Text-to-Speech, pour tester la
+synthèse vocale sans réseau ni credentials.
+
+Chaque requête renvoie un son dont la durée dépend de la longueur du texte, après un
+délai simulant l'aller-retour réseau ; une partie des requêtes peut échouer (503) pour
+vérifier les nouveaux essais. Les requêtes SSML avec enableTimePointing (API v1beta1)
+reçoivent l'instant de chaque repère <mark>, proportionnel au texte qui le précède.
+
+Utilisation :
+    python scripts/tts_stub_server.py --port 8765 --latency 0.4 --failure-rate 0.1
+puis définir "endpoint": "http://localhost:8765" dans la section tts de la configuration.
+"""
+import re
+import html
+import json
+import time
+import base64
+import random
+import logging
+import argparse
+import subprocess
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from moviepy.config import FFMPEG_BINARY
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Format FFmpeg de chaque encodage de l'API
+ENCODINGS = {
+    "MP3": ["-f", "mp3"],
+    "LINEAR16": ["-f", "wav", "-acodec", "pcm_s16le"],
+    "OGG_OPUS": ["-f", "ogg", "-acodec", "libopus"],
+}
+
+MARK_PATTERN = re.compile(r'<mark\s+name="([^"]*)"\s*/>')
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Début de la parole et durée de lecture d'un caractère, en secondes
+LEAD_IN = 0.15
+SECONDS_PER_CHAR = 0.08
+
+def parse_ssml(ssml: str):
+    """Retourne le texte lu d'un SSML et le nombre de caractères précédant chaque repère."""
+    text = ""
+    marks = []
+    cursor = 0
+    for match in MARK_PATTERN.finditer(ssml):
+        text += html.unescape(TAG_PATTERN.sub("", ssml[cursor:match.start()]))
+        marks.append((match.group(1), len(text)))
+        cursor = match.end()
+    text += html.unescape(TAG_PATTERN.sub("", ssml[cursor:]))
+    return text, marks
+
+@lru_cache(maxsize=256)
+def render_audio(duration: float, encoding: str, sample_rate: int) -> bytes:
+    """Génère un son de la durée demandée dans l'encodage de l'API."""
+    cmd = [FFMPEG_BINARY, "-loglevel", "error", "-f", "lavfi",
+           "-i", f"sine=frequency=440:sample_rate={sample_rate}:duration={duration:.2f}",
+           "-ac", "1", *ENCODINGS.get(encoding, ENCODINGS["MP3"]), "-"]
+    return subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    failure_rate = 0.0
+    counter_lock = threading.Lock()
+    counters = {"requests": 0, "failures": 0}
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.split("?")[0].endswith("/text:synthesize"):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.latency)
+
+        with self.counter_lock:
+            self.counters["requests"] += 1
+            failed = random.random() < self.failure_rate
+            if failed:
+                self.counters["failures"] += 1
+        if failed:
+            self._send_json(503, {"error": {"code": 503, "message": "Service indisponible (simulé)",
+                                            "status": "UNAVAILABLE"}})
+            return
+
+        synthesis_input = request.get("input", {})
+        if "ssml" in synthesis_input:
+            text, marks = parse_ssml(synthesis_input["ssml"])
+        else:
+            text, marks = synthesis_input.get("text", ""), []
+        audio_config = request.get("audioConfig", {})
+        encoding = audio_config.get("audioEncoding", "MP3")
+        sample_rate = int(audio_config.get("sampleRateHertz") or 24000)
+        duration = round(2 * LEAD_IN + SECONDS_PER_CHAR * len(text.strip()), 2)
+        audio = render_audio(duration, encoding, sample_rate)
+        response = {"audioContent": base64.b64encode(audio).decode("ascii")}
+        if "SSML_MARK" in request.get("enableTimePointing", []):
+            # Les espaces de tête ne sont pas lus
+            offset = len(text) - len(text.lstrip())
+            response["timepoints"] = [
+                {"markName": name, "timeSeconds": round(LEAD_IN + SECONDS_PER_CHAR * max(0, position - offset), 3)}
+                for name, position in marks
+            ]
+        self._send_json(200, response)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur TTS local pour les tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.4, help="Délai de chaque réponse en secondes")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Part des requêtes en erreur 503")
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.failure_rate = args.failure_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    logger.info(f"Serveur TTS local sur http://{args.host}:{args.port} "
+                f"(latence {args.latency}s, erreurs {args.failure_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"{StubHandler.counters['requests']} requêtes, {StubHandler.counters['failures']} erreurs simulées")
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,58 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import subprocess
+from multiprocessing import Pool
 import numpy as np
 from PIL import Image, ImageFilter
 import cv2
 import math
+from moviepy import VideoClip
 
-class ZoomEffect:
-    def __init__(self):
-        print("ZoomEffect init")
-    def create_zoom_video(self,image_path, output_path, duration=5.0, zoom_factor=1.5, fps=30, 
-                          blur=0, width=1080, height=1920, movement=0.1, movement_type="circle",
-                          zoom_time=0.5):
+class ZoomFrameSource:
+    def __init__(self, source, width, height, duration, fps, zoom_factor, zoom_time,
+                 movement_margin, movement_type):
         """
-        Crée une vidéo avec un effet de zoom progressif sur une image et un mouvement léger.
+        Source de frames paresseuse de l'effet de zoom : chaque frame est calculée à la
+        demande à partir de l'image source agrandie et des paramètres de mouvement.
+
+        L'objet ne contient que des données simples pour pouvoir être envoyé aux
+        processus de rendu.
 
         Args:
-            image_path (str): Chemin de l'image source
-            output_path (str): Chemin de sortie pour la vidéo
-            duration (float): Durée de la vidéo en secondes
-            zoom_factor (float): Facteur de zoom final (1.0 = pas de zoom, 2.0 = zoom x2)
-            fps (int): Images par seconde
-            blur (int): Intensité du flou (constant) à appliquer (0 = pas de flou)
+            source (np.ndarray): Image BGR agrandie (marge de mouvement comprise)
             width (int): Largeur de la vidéo
             height (int): Hauteur de la vidéo
-            movement (float): Intensité du mouvement (0 = pas de mouvement, 1 = mouvement maximal)
-            movement_type (str): Type de mouvement ("circle", "horizontal", "vertical", "diagonal", "random")
-            zoom_time (float): Temps de zoom en secondes (durée d'un cycle zoom/dézoom)
+            duration (float): Durée de la vidéo en secondes
+            fps (int): Images par seconde
+            zoom_factor (float): Facteur de zoom maximal
+            zoom_time (float): Durée d'un cycle zoom/dézoom en secondes
+            movement_margin (int): Marge disponible pour le mouvement, en pixels
+            movement_type (str): Type de mouvement
+        """
+        self.source = source
+        self.width = width
+        self.height = height
+        self.duration = duration
+        self.fps = fps
+        self.num_frames = int(duration * fps + 1e-6)
+        self.zoom_factor = zoom_factor
+        self.zoom_time = zoom_time
+        self.movement_margin = movement_margin
+        self.movement_type = movement_type
+        self.enlarged_height, self.enlarged_width = source.shape[:2]
+        # Dernière frame calculée (moviepy redemande souvent le même instant)
+        self._last_frame = (None, None)
+
+    @classmethod
+    def from_image(cls, image_path, duration=5.0, zoom_factor=1.5, fps=30, blur=0, width=1080, height=1920,
+                   movement=0.1, movement_type="circle", zoom_time=0.5):
         """
+        Prépare la source de frames à partir d'une image (mêmes paramètres que ZoomEffect.create_zoom_video).
 
+        Returns:
+            ZoomFrameSource: Source de frames
+        """
         # Vérifier que le fichier image existe
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"L'image {image_path} n'existe pas")
@@ -67,132 +91,260 @@ class ZoomEffect:
         if blur > 0:
             original_image = original_image.filter(ImageFilter.GaussianBlur(radius=blur))
 
-        # Convertir l'image PIL en tableau NumPy pour OpenCV
-        original_array = np.array(original_image)
-
-        # Convertir RGB à BGR pour OpenCV si l'image a 3 canaux (RGB)
-        if len(original_array.shape) == 3 and original_array.shape[2] == 3:
-            original_array = original_array[:, :, ::-1]  # Inverser les canaux RGB -> BGR
-
-        # Calculer le nombre total de frames
-        num_frames = int(duration * fps)
-
-        # Créer l'objet VideoWriter
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-        # Fonction pour calculer le zoom avec effet de rebond
-        def calculate_zoom(progress, frame_index):
-            # Calculer le nombre de cycles de zoom complets
-            cycles = duration / zoom_time
-            # Calculer la position dans le cycle actuel
-            cycle_progress = (progress * cycles) % 1.0
-            # Utiliser une fonction sinusoïdale pour créer l'effet de rebond
-            zoom_progress = abs(math.sin(cycle_progress * math.pi))
-            # Appliquer le facteur de zoom
-            return 1.0 + zoom_progress * (zoom_factor - 1.0)
-
-        # Fonction pour calculer le déplacement selon le type de mouvement
-        def calculate_movement(progress, frame_index):
-            # Intensité du mouvement ajustée pour la marge disponible
-            max_offset_x = movement_margin
-            max_offset_y = movement_margin
-
-            if movement_type == "circle":
-                # Mouvement circulaire
-                angle = progress * 2 * math.pi  # Compléter un cercle sur la durée
-                offset_x = max_offset_x * math.cos(angle)
-                offset_y = max_offset_y * math.sin(angle)
-            elif movement_type == "horizontal":
-                # Mouvement horizontal (aller-retour)
-                offset_x = max_offset_x * math.sin(progress * math.pi * 2)
-                offset_y = 0
-            elif movement_type == "vertical":
-                # Mouvement vertical (aller-retour)
-                offset_x = 0
-                offset_y = max_offset_y * math.sin(progress * math.pi * 2)
-            elif movement_type == "diagonal":
-                # Mouvement diagonal (coin à coin)
-                offset_x = max_offset_x * math.sin(progress * math.pi * 2)
-                offset_y = max_offset_y * math.sin(progress * math.pi * 2)
-            elif movement_type == "random":
-                # Mouvement semi-aléatoire doux (utiliser une fonction de bruit ou une interpolation pourrait être mieux)
-                # On utilise des fréquences différentes pour X et Y pour éviter un mouvement trop régulier
-                offset_x = max_offset_x * math.sin(progress * math.pi * 2.5 + 0.4)
-                offset_y = max_offset_y * math.sin(progress * math.pi * 1.7 + 0.9)
-            else:
-                # Par défaut, pas de mouvement
-                offset_x = 0
-                offset_y = 0
-
-            return offset_x, offset_y
+        # Convertir l'image PIL en tableau NumPy pour OpenCV, RGB -> BGR
+        original_array = np.ascontiguousarray(np.array(original_image.convert("RGB"))[:, :, ::-1])
+
+        return cls(original_array, width, height, duration, fps, zoom_factor, zoom_time,
+                   movement_margin, movement_type)
+
+    def calculate_zoom(self, progress):
+        # Calculer le nombre de cycles de zoom complets
+        cycles = self.duration / self.zoom_time
+        # Calculer la position dans le cycle actuel
+        cycle_progress = (progress * cycles) % 1.0
+        # Utiliser une fonction sinusoïdale pour créer l'effet de rebond
+        zoom_progress = abs(math.sin(cycle_progress * math.pi))
+        # Appliquer le facteur de zoom
+        return 1.0 + zoom_progress * (self.zoom_factor - 1.0)
+
+    def calculate_movement(self, progress):
+        # Intensité du mouvement ajustée pour la marge disponible
+        max_offset_x = self.movement_margin
+        max_offset_y = self.movement_margin
+
+        if self.movement_type == "circle":
+            # Mouvement circulaire
+            angle = progress * 2 * math.pi  # Compléter un cercle sur la durée
+            offset_x = max_offset_x * math.cos(angle)
+            offset_y = max_offset_y * math.sin(angle)
+        elif self.movement_type == "horizontal":
+            # Mouvement horizontal (aller-retour)
+            offset_x = max_offset_x * math.sin(progress * math.pi * 2)
+            offset_y = 0
+        elif self.movement_type == "vertical":
+            # Mouvement vertical (aller-retour)
+            offset_x = 0
+            offset_y = max_offset_y * math.sin(progress * math.pi * 2)
+        elif self.movement_type == "diagonal":
+            # Mouvement diagonal (coin à coin)
+            offset_x = max_offset_x * math.sin(progress * math.pi * 2)
+            offset_y = max_offset_y * math.sin(progress * math.pi * 2)
+        elif self.movement_type == "random":
+            # Mouvement semi-aléatoire doux (utiliser une fonction de bruit ou une interpolation pourrait être mieux)
+            # On utilise des fréquences différentes pour X et Y pour éviter un mouvement trop régulier
+            offset_x = max_offset_x * math.sin(progress * math.pi * 2.5 + 0.4)
+            offset_y = max_offset_y * math.sin(progress * math.pi * 1.7 + 0.9)
+        else:
+            # Par défaut, pas de mouvement
+            offset_x = 0
+            offset_y = 0
 
-        # Génération des frames et écriture directe dans le fichier vidéo
-        for i in range(num_frames):
-            # Afficher la progression tous les 10% ou toutes les 100 frames
-            if i % max(1, num_frames // 10) == 0 or i % 100 == 0:
-                print(f"Progression: {i}/{num_frames} frames ({i/num_frames*100:.1f}%)")
+        return offset_x, offset_y
 
-            # Calculer le zoom pour cette frame avec effet de rebond
-            progress = i / num_frames
-            current_zoom = calculate_zoom(progress, i)
+    def cycle_frames(self):
+        """
+        Retourne la longueur en frames du cycle de zoom si la vidéo est périodique, sinon None.
 
-            # Calculer le mouvement pour cette frame
-            offset_x, offset_y = calculate_movement(progress, i)
+        Sans mouvement, le zoom est la seule variation : les frames se répètent à chaque
+        cycle de zoom_time secondes.
+        """
+        static_framing = self.movement_margin == 0 or self.movement_type not in ("circle", "horizontal", "vertical", "diagonal", "random")
+        cycle_frames = self.num_frames * self.zoom_time / self.duration
+        if static_framing and abs(cycle_frames - round(cycle_frames)) < 1e-6 and 0 < round(cycle_frames) < self.num_frames:
+            return int(round(cycle_frames))
+        return None
 
-            # Calculer les nouvelles dimensions pour le zoom
-            new_w = int(enlarged_width * current_zoom)
-            new_h = int(enlarged_height * current_zoom)
+    def render(self, i):
+        """
+        Calcule la frame i.
 
-            # Redimensionner l'image avec OpenCV
-            resized = cv2.resize(original_array, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+        Args:
+            i (int): Indice de la frame
 
-            # Calculer les offsets pour centrer le zoom (en tenant compte du mouvement)
-            # Les offsets sont calculés pour centrer la frame dans la dimension agrandie
-            center_x = (new_w - width) // 2
-            center_y = (new_h - height) // 2
+        Returns:
+            np.ndarray: Frame BGR uint8 (hauteur, largeur, 3)
+        """
+        # Calculer le zoom pour cette frame avec effet de rebond
+        progress = i / self.num_frames
+        current_zoom = self.calculate_zoom(progress)
+
+        # Calculer le mouvement pour cette frame
+        offset_x, offset_y = self.calculate_movement(progress)
+
+        # Calculer les nouvelles dimensions pour le zoom
+        new_w = int(self.enlarged_width * current_zoom)
+        new_h = int(self.enlarged_height * current_zoom)
+
+        # Calculer les offsets pour centrer le zoom (en tenant compte du mouvement)
+        # Les offsets sont calculés pour centrer la frame dans la dimension agrandie
+        center_x = (new_w - self.width) // 2
+        center_y = (new_h - self.height) // 2
+
+        # Ajouter le décalage de mouvement
+        adjusted_x = int(center_x + offset_x * current_zoom)
+        adjusted_y = int(center_y + offset_y * current_zoom)
+
+        # S'assurer que les offsets restent dans les limites de l'image zoomée
+        adjusted_x = max(0, min(adjusted_x, new_w - self.width))
+        adjusted_y = max(0, min(adjusted_y, new_h - self.height))
+
+        # Zoom et recadrage en une seule transformation affine, directement à la
+        # taille de sortie : pixel (x, y) de la frame = pixel (x + adjusted_x, y + adjusted_y)
+        # de l'image zoomée, sans construire l'image zoomée entière
+        scale_x = self.enlarged_width / new_w
+        scale_y = self.enlarged_height / new_h
+        matrix = np.float32([
+            [scale_x, 0, (adjusted_x + 0.5) * scale_x - 0.5],
+            [0, scale_y, (adjusted_y + 0.5) * scale_y - 0.5],
+        ])
+        return cv2.warpAffine(self.source, matrix, (self.width, self.height),
+                              flags=cv2.INTER_CUBIC | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def get_frame(self, t):
+        """
+        Calcule la frame affichée à l'instant t (mêmes frames que la vidéo encodée).
 
-            # Ajouter le décalage de mouvement
-            adjusted_x = int(center_x + offset_x * current_zoom)
-            adjusted_y = int(center_y + offset_y * current_zoom)
+        Args:
+            t (float): Instant en secondes
 
-            # S'assurer que les offsets restent dans les limites de l'image redimensionnée
-            adjusted_x = max(0, min(adjusted_x, new_w - width))
-            adjusted_y = max(0, min(adjusted_y, new_h - height))
+        Returns:
+            np.ndarray: Frame RGB uint8 (hauteur, largeur, 3)
+        """
+        i = max(0, min(int(t * self.fps + 1e-6), self.num_frames - 1))
+        if self._last_frame[0] != i:
+            self._last_frame = (i, np.ascontiguousarray(self.render(i)[:, :, ::-1]))
+        return self._last_frame[1]
 
-            # Extraire la région avec le zoom et le mouvement appliqués
-            cropped = resized[adjusted_y:adjusted_y + height, adjusted_x:adjusted_x + width]
+    def to_clip(self):
+        """
+        Expose la source sous forme de clip moviepy, sans fichier intermédiaire.
 
-            # Écrire la frame dans la vidéo
-            video_writer.write(cropped)
+        Returns:
+            VideoClip: Clip dont les frames sont calculées à la demande
+        """
+        return VideoClip(frame_function=self.get_frame, duration=self.duration)
 
-        # Libérer les ressources
-        video_writer.release()
+    def write_video(self, output_path, workers=None):
+        """
+        Encode la source dans un fichier MP4 (libx264).
 
-        print(f"Vidéo créée avec succès: {output_path}")
+        Args:
+            output_path (str): Chemin de sortie pour la vidéo
+            workers (int): Nombre de processus de rendu des frames (défaut: nombre de cœurs)
 
-        # Conversion du format de la vidéo si nécessaire (OpenCV utilise MPEG-4 qui peut ne pas être compatible avec tous les lecteurs)
+        Returns:
+            str: Chemin de la vidéo
+        """
+        # Sans mouvement, on ne rend qu'un cycle, rejoué ensuite par copie de flux
+        cycle_frames = self.cycle_frames()
+        periodic = cycle_frames is not None
+        frames_to_render = cycle_frames if periodic else self.num_frames
+        if periodic:
+            print(f"Mouvement périodique: rendu d'un cycle de {frames_to_render} frames sur {self.num_frames}")
+
+        # Les frames brutes BGR sont envoyées directement à un unique encodeur FFmpeg
+        encoded_output = output_path + ".cycle.mp4" if periodic else output_path
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{self.width}x{self.height}", "-r", str(self.fps), "-i", "-",
+            "-c:v", "libx264", "-preset", "ultrafast",
+            "-pix_fmt", "yuv420p", encoded_output
+        ]
+        encoder = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        workers = max(1, min(workers or os.cpu_count() or 1, frames_to_render))
+        pool = Pool(workers, initializer=_init_worker, initargs=(self,)) if workers > 1 else None
+        completed = False
         try:
-            import subprocess
-            temp_output = output_path + ".temp.mp4"
-            os.rename(output_path, temp_output)
-
-            # Utiliser FFmpeg pour convertir en format plus compatible
+            if pool is not None:
+                # imap rend les frames dans l'ordre, quel que soit le processus qui les a calculées
+                frames = pool.imap(_render_frame_bytes, range(frames_to_render), chunksize=4)
+            else:
+                frames = (self.render(i).tobytes() for i in range(frames_to_render))
+
+            # Génération des frames et écriture directe dans l'encodeur
+            for i, frame in enumerate(frames):
+                # Afficher la progression tous les 10% ou toutes les 100 frames
+                if i % max(1, frames_to_render // 10) == 0 or i % 100 == 0:
+                    print(f"Progression: {i}/{frames_to_render} frames ({i/frames_to_render*100:.1f}%)")
+                encoder.stdin.write(frame)
+            completed = True
+        except BrokenPipeError:
+            # FFmpeg s'est arrêté avant la fin : son erreur est remontée ci-dessous
+            pass
+        finally:
+            if pool is not None:
+                if completed:
+                    pool.close()
+                else:
+                    pool.terminate()
+                pool.join()
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+            stderr = encoder.stderr.read()
+            encoder.wait()
+
+        if encoder.returncode != 0 or not completed:
+            raise RuntimeError(
+                f"Échec de l'encodage FFmpeg (code {encoder.returncode}): {stderr.decode(errors='replace').strip()}"
+            )
+
+        if periodic:
+            # Le cycle encodé est rejoué jusqu'à la durée demandée, par simple copie de flux
             cmd = [
-                "ffmpeg", "-y", "-i", temp_output, 
-                "-c:v", "libx264", "-preset", "ultrafast", 
-                "-pix_fmt", "yuv420p", output_path
+                "ffmpeg", "-y", "-stream_loop", "-1", "-i", encoded_output,
+                "-c", "copy", "-t", str(self.num_frames / self.fps), output_path
             ]
-
             subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            os.remove(encoded_output)
+
+        return output_path
+
+# Source du processus de rendu courant (initialisé une fois par processus du pool)
+_worker_source = None
+
+def _init_worker(source):
+    global _worker_source
+    # Un seul thread OpenCV par processus : le parallélisme vient du pool
+    cv2.setNumThreads(1)
+    _worker_source = source
+
+def _render_frame_bytes(i):
+    return _worker_source.render(i).tobytes()
+
+class ZoomEffect:
+    def __init__(self):
+        print("ZoomEffect init")
+    def create_zoom_video(self,image_path, output_path, duration=5.0, zoom_factor=1.5, fps=30, 
+                          blur=0, width=1080, height=1920, movement=0.1, movement_type="circle",
+                          zoom_time=0.5, workers=None):
+        """
+        Crée une vidéo avec un effet de zoom progressif sur une image et un mouvement léger.
+
+        Args:
+            image_path (str): Chemin de l'image source
+            output_path (str): Chemin de sortie pour la vidéo
+            duration (float): Durée de la vidéo en secondes
+            zoom_factor (float): Facteur de zoom final (1.0 = pas de zoom, 2.0 = zoom x2)
+            fps (int): Images par seconde
+            blur (int): Intensité du flou (constant) à appliquer (0 = pas de flou)
+            width (int): Largeur de la vidéo
+            height (int): Hauteur de la vidéo
+            movement (float): Intensité du mouvement (0 = pas de mouvement, 1 = mouvement maximal)
+            movement_type (str): Type de mouvement ("circle", "horizontal", "vertical", "diagonal", "random")
+            zoom_time (float): Temps de zoom en secondes (durée d'un cycle zoom/dézoom)
+            workers (int): Nombre de processus de rendu des frames (défaut: nombre de cœurs)
+        """
 
-            # Supprimer le fichier temporaire
-            os.remove(temp_output)
-            print(f"Conversion terminée: {output_path}")
-        except Exception as e:
-            # En cas d'échec, restaurer la vidéo originale
-            if os.path.exists(temp_output):
-                os.rename(temp_output, output_path)
+        source = ZoomFrameSource.from_image(image_path, duration=duration, zoom_factor=zoom_factor, fps=fps,
+                                            blur=blur, width=width, height=height, movement=movement,
+                                            movement_type=movement_type, zoom_time=zoom_time)
+        source.write_video(output_path, workers=workers)
+
+        print(f"Vidéo créée avec succès: {output_path}")
 
         return output_path
 
@@ -210,6 +362,7 @@ if __name__ == "__main__":
     parser.add_argument("--movement-type", "-mt", help="Type de mouvement (défaut: circle)", 
                        choices=["circle", "horizontal", "vertical", "diagonal", "random", "none"], default="circle")
     parser.add_argument("--zoom-time", "-zt", type=float, help="Temps de zoom en secondes (défaut: 0.5)", default=0.5)
+    parser.add_argument("--workers", "-w", type=int, help="Nombre de processus de rendu (défaut: nombre de cœurs)", default=None)
 
     args = parser.parse_args()
 
@@ -225,5 +378,6 @@ if __name__ == "__main__":
         height=args.height,
         movement=args.movement,
         movement_type=args.movement_type,
-        zoom_time=args.zoom_time
+        zoom_time=args.zoom_time,
+        workers=args.workers
     )
@@ -0,0 +1,154 @@
+import os
+import math
+import hashlib
+import logging
+import subprocess
+from typing import Dict, Optional, Tuple
+import numpy as np
+from moviepy.audio.AudioClip import AudioArrayClip
+from moviepy.config import FFMPEG_BINARY
+
+from src.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le décodage change
+DECODE_VERSION = 1
+
+def decode_file(path: str, fps: int, channels: int) -> np.ndarray:
+    """
+    Décode et rééchantillonne un fichier audio avec FFmpeg.
+
+    Args:
+        path (str): Chemin du fichier audio
+        fps (int): Fréquence d'échantillonnage cible
+        channels (int): Nombre de canaux cible
+
+    Returns:
+        np.ndarray: PCM float32 (échantillons, canaux) entre -1 et 1
+    """
+    cmd = [
+        FFMPEG_BINARY, "-loglevel", "error", "-i", path, "-vn",
+        "-f", "f32le", "-ac", str(channels), "-ar", str(fps), "-",
+    ]
+    try:
+        result = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Échec du décodage de {path}: {e.stderr.decode(errors='replace')}") from e
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, channels)
+
+class AudioAssetCache:
+    def __init__(self, cache_dir: str, fps: int = 44100, channels: int = 2, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialise le cache des sons décodés (musiques, effets sonores).
+
+        Chaque fichier est décodé et rééchantillonné une seule fois en PCM float32, gardé
+        en mémoire pour tout le processus et enregistré en .npy. La clé disque dépend du
+        contenu du fichier et du format cible ; en mémoire, un fichier est reconnu par son
+        chemin, sa taille et sa date de modification.
+
+        Args:
+            cache_dir (str): Répertoire du cache
+            fps (int): Fréquence d'échantillonnage cible
+            channels (int): Nombre de canaux cible
+            max_bytes (int): Taille maximale du cache sur disque
+        """
+        self.disk_cache = DiskCache(cache_dir, max_bytes=max_bytes, suffix=".npy", name="audio")
+        self.fps = fps
+        self.channels = channels
+        # Sons déjà chargés : (chemin, taille, date de modification) -> PCM en lecture seule
+        self._buffers: Dict[Tuple[str, int, int], np.ndarray] = {}
+        self.stats = self.disk_cache.stats
+        self.stats.setdefault("memory_hits", 0)
+
+    def _source_hash(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, path: str) -> np.ndarray:
+        """
+        Retourne le PCM d'un fichier audio, en le décodant si nécessaire.
+
+        Le tableau est partagé entre tous les utilisateurs du cache : il est en lecture seule.
+
+        Args:
+            path (str): Chemin du fichier audio
+
+        Returns:
+            np.ndarray: PCM float32 (échantillons, canaux) entre -1 et 1
+        """
+        stat = os.stat(path)
+        stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if stat_key in self._buffers:
+            self.stats["memory_hits"] += 1
+            return self._buffers[stat_key]
+
+        key = DiskCache.make_key({
+            "source": self._source_hash(path),
+            "fps": self.fps,
+            "channels": self.channels,
+            "version": DECODE_VERSION,
+        })
+        cached_path = self.disk_cache.get(key)
+        pcm = None
+        if cached_path is not None:
+            try:
+                pcm = np.load(cached_path)
+            except Exception as e:
+                logger.warning(f"Son illisible dans le cache, nouveau décodage: {str(e)}")
+
+        if pcm is None:
+            pcm = decode_file(path, self.fps, self.channels)
+            self.disk_cache.put(key, lambda temp_path: np.save(temp_path, pcm))
+
+        pcm.setflags(write=False)
+        self._buffers[stat_key] = pcm
+        return pcm
+
+    def get_clip(self, path: str, duration: Optional[float] = None) -> AudioArrayClip:
+        """
+        Retourne un fichier audio décodé sous forme de clip moviepy, répété si besoin.
+
+        Args:
+            path (str): Chemin du fichier audio
+            duration (Optional[float]): Durée du clip (défaut: celle du fichier)
+
+        Returns:
+            AudioArrayClip: Clip audio sans lecteur FFmpeg
+        """
+        pcm = self.get(path)
+        if duration is not None:
+            samples = int(round(duration * self.fps))
+            if len(pcm) < samples:
+                pcm = np.tile(pcm, (int(math.ceil(samples / len(pcm))), 1))
+            pcm = pcm[:samples]
+        return AudioArrayClip(pcm, fps=self.fps)
+
+    def log_stats(self):
+        """Affiche les statistiques du cache dans les logs."""
+        self.disk_cache.log_stats()
+
+# Cache partagé par tout le processus
+_audio_asset_caches: Dict[Tuple[str, int, int], AudioAssetCache] = {}
+
+def get_audio_asset_cache(cache_dir: str, fps: int = 44100, channels: int = 2,
+                          max_bytes: int = 512 * 1024 * 1024) -> AudioAssetCache:
+    """
+    Retourne le cache des sons décodés du processus, créé au premier appel.
+
+    Args:
+        cache_dir (str): Répertoire du cache
+        fps (int): Fréquence d'échantillonnage cible
+        channels (int): Nombre de canaux cible
+        max_bytes (int): Taille maximale du cache sur disque
+
+    Returns:
+        AudioAssetCache: Cache partagé pour ce répertoire et ce format
+    """
+    key = (os.path.abspath(cache_dir), fps, channels)
+    if key not in _audio_asset_caches:
+        _audio_asset_caches[key] = AudioAssetCache(cache_dir, fps=fps, channels=channels, max_bytes=max_bytes)
+    return _audio_asset_caches[key]
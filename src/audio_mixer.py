@@ -0,0 +1,165 @@
+import math
+import logging
+import subprocess
+from typing import Dict, List, Optional
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+
+from src.audio_cache import AudioAssetCache, decode_file
+from src.speech_audio import get_speech_store
+
+logger = logging.getLogger(__name__)
+
+# Taille des morceaux lus dans un clip audio moviepy (valeur par défaut de write_audiofile)
+CLIP_CHUNK_SIZE = 2000
+
+class AudioCue:
+    def __init__(self, source, start: float, duration: Optional[float] = None, gain: float = 1.0,
+                 loop: bool = False, asset: bool = False):
+        """
+        Son positionné sur la timeline, décodé une seule fois par le mixeur.
+
+        Args:
+            source (str | AudioClip): Chemin d'un fichier audio, ou clip audio moviepy déjà assemblé
+            start (float): Début en secondes
+            duration (Optional[float]): Durée jouée (défaut: toute la source, ou jusqu'à la fin
+                du mixage si loop)
+            gain (float): Gain linéaire appliqué à la source
+            loop (bool): Répéter la source pour couvrir la durée
+            asset (bool): Fichier de ressources (musique, effet sonore) partagé par le cache des sons décodés
+        """
+        self.source = source
+        self.start = start
+        self.duration = duration
+        self.gain = gain
+        self.loop = loop
+        self.asset = asset
+
+    def shifted(self, offset: float) -> "AudioCue":
+        """Retourne une copie du son décalée de offset secondes."""
+        return AudioCue(self.source, self.start + offset, self.duration, self.gain, self.loop, self.asset)
+
+class AudioMixer:
+    def __init__(self, fps: int = 44100, channels: int = 2, asset_cache: Optional[AudioAssetCache] = None):
+        """
+        Mixeur audio en une passe : chaque source est décodée une fois en PCM float32,
+        puis tous les sons sont additionnés dans un seul tampon préalloué aux positions
+        de la timeline, au lieu d'être réévalués morceau par morceau pendant l'encodage.
+
+        Args:
+            fps (int): Fréquence d'échantillonnage
+            channels (int): Nombre de canaux
+            asset_cache (Optional[AudioAssetCache]): Cache des musiques et effets sonores décodés,
+                au même format que le mixeur
+        """
+        self.fps = fps
+        self.channels = channels
+        self.asset_cache = asset_cache
+        # Fichiers déjà décodés : chemin -> PCM (échantillons, canaux)
+        self._decoded: Dict[object, np.ndarray] = {}
+
+    def _decode_clip(self, clip) -> np.ndarray:
+        # Lecture par petits morceaux comme write_audiofile : les lecteurs de AudioFileClip
+        # renvoient du silence quand un morceau déborde de leur tampon
+        chunks = list(clip.iter_chunks(fps=self.fps, chunksize=CLIP_CHUNK_SIZE))
+        if not chunks:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        pcm = np.vstack(chunks).astype(np.float32)
+        if pcm.ndim == 1:
+            pcm = pcm[:, None]
+        if pcm.shape[1] != self.channels:
+            # Mono vers stéréo (ou l'inverse) par répétition / moyenne des canaux
+            pcm = np.repeat(pcm.mean(axis=1, keepdims=True), self.channels, axis=1)
+        return pcm
+
+    def decode(self, source, asset: bool = False) -> np.ndarray:
+        """
+        Décode une source en PCM float32 (échantillons, canaux). Les fichiers ne sont
+        décodés qu'une fois ; les voix synthétisées sont prises en mémoire dans le registre
+        des voix, sans FFmpeg ; un clip moviepy est lu à chaque appel.
+
+        Args:
+            source (str | AudioClip): Chemin d'un fichier audio ou clip audio moviepy
+            asset (bool): Passer par le cache des sons décodés (musiques, effets sonores)
+
+        Returns:
+            np.ndarray: Échantillons entre -1 et 1
+        """
+        if not isinstance(source, str):
+            return self._decode_clip(source)
+        if asset and self.asset_cache is not None:
+            return self.asset_cache.get(source)
+        if source not in self._decoded:
+            speech = get_speech_store().get(source)
+            if speech is not None:
+                self._decoded[source] = np.repeat(speech.view(self.fps)[:, None], self.channels, axis=1)
+            else:
+                self._decoded[source] = decode_file(source, self.fps, self.channels)
+        return self._decoded[source]
+
+    def mix(self, cues: List[AudioCue], duration: float) -> np.ndarray:
+        """
+        Mixe les sons dans un tampon de la durée demandée.
+
+        Args:
+            cues (List[AudioCue]): Sons positionnés sur la timeline
+            duration (float): Durée du mixage en secondes
+
+        Returns:
+            np.ndarray: PCM float32 (échantillons, canaux), écrêté entre -1 et 1
+        """
+        total_samples = int(round(duration * self.fps))
+        buffer = np.zeros((total_samples, self.channels), dtype=np.float32)
+        for cue in cues:
+            first = int(round(cue.start * self.fps))
+            if first >= total_samples:
+                continue
+            pcm = self.decode(cue.source, cue.asset)
+            if len(pcm) == 0:
+                continue
+
+            if cue.duration is not None:
+                length = int(round(cue.duration * self.fps))
+            elif cue.loop:
+                length = total_samples - first
+            else:
+                length = len(pcm)
+            length = min(length, total_samples - first)
+
+            if cue.loop and len(pcm) < length:
+                pcm = np.tile(pcm, (int(math.ceil(length / len(pcm))), 1))
+            length = min(length, len(pcm))
+
+            target = buffer[first:first + length]
+            if cue.gain == 1.0:
+                target += pcm[:length]
+            else:
+                target += pcm[:length] * np.float32(cue.gain)
+
+        np.clip(buffer, -1.0, 1.0, out=buffer)
+        return buffer
+
+    def write(self, cues: List[AudioCue], duration: float, output_path: str) -> str:
+        """
+        Mixe les sons et les encode dans un fichier (AAC pour .m4a, PCM pour .wav).
+
+        Args:
+            cues (List[AudioCue]): Sons positionnés sur la timeline
+            duration (float): Durée du mixage en secondes
+            output_path (str): Chemin du fichier audio
+
+        Returns:
+            str: Chemin du fichier audio
+        """
+        pcm = self.mix(cues, duration)
+        cmd = [
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-f", "f32le", "-ar", str(self.fps), "-ac", str(self.channels), "-i", "-",
+            output_path,
+        ]
+        try:
+            subprocess.run(cmd, input=pcm.tobytes(), check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Échec de l'encodage audio: {e.stderr.decode(errors='replace')}") from e
+        logger.info(f"Audio mixé: {len(cues)} sons, {duration:.1f}s -> {output_path}")
+        return output_path
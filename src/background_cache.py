@@ -0,0 +1,163 @@
+import os
+import math
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from src.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si les paramètres d'encodage des mezzanines changent
+MEZZANINE_VERSION = 1
+
+class BackgroundCache:
+    def __init__(self, cache_dir: str, size: Tuple[int, int], fps: float, max_bytes: int = 2048 * 1024 * 1024):
+        """
+        Initialise le cache des vidéos de fond prêtes au rendu (mezzanines).
+
+        Chaque vidéo source est transcodée une seule fois à la résolution et au nombre
+        d'images par seconde exacts de la sortie, avec une image clé par seconde, pour
+        que le rendu lise les frames sans redimensionnement ni saut. La clé dépend du
+        contenu du fichier source et des paramètres cibles.
+
+        Args:
+            cache_dir (str): Répertoire du cache
+            size (tuple): Dimensions (largeur, hauteur) de la vidéo finale
+            fps (float): Images par seconde de la vidéo finale
+            max_bytes (int): Taille maximale du cache sur disque
+        """
+        self.disk_cache = DiskCache(cache_dir, max_bytes=max_bytes, suffix=".mp4", name="fonds")
+        self.width, self.height = size
+        self.fps = fps
+        # Empreintes déjà calculées : (chemin, taille, date de modification) -> sha256
+        self._source_hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def _source_hash(self, source_path: str) -> str:
+        """Calcule l'empreinte SHA-256 du contenu d'un fichier source."""
+        stat = os.stat(source_path)
+        stat_key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+        if stat_key not in self._source_hashes:
+            digest = hashlib.sha256()
+            with open(source_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            self._source_hashes[stat_key] = digest.hexdigest()
+        return self._source_hashes[stat_key]
+
+    def _params(self, source_path: str, loops: int) -> dict:
+        return {
+            "source": self._source_hash(source_path),
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "loops": loops,
+            "version": MEZZANINE_VERSION,
+        }
+
+    def _run_ffmpeg(self, args: list):
+        cmd = [FFMPEG_BINARY, "-y", "-loglevel", "error"] + args
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def _transcode(self, source_path: str, output_path: Path):
+        """Transcode la source à la résolution et aux fps exacts, GOP fermé d'une seconde."""
+        gop = max(1, int(round(self.fps)))
+        self._run_ffmpeg([
+            "-i", source_path,
+            "-an",
+            "-vf", f"scale={self.width}:{self.height}:flags=bicubic,fps={self.fps}",
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-crf", "18",
+            "-pix_fmt", "yuv420p",
+            "-g", str(gop),
+            "-keyint_min", str(gop),
+            "-sc_threshold", "0",
+            "-bf", "0",
+            "-movflags", "+faststart",
+            "-f", "mp4",
+            str(output_path),
+        ])
+
+    def _loop(self, mezzanine_path: Path, loops: int, output_path: Path):
+        """Concatène la mezzanine avec elle-même sans réencodage."""
+        self._run_ffmpeg([
+            "-stream_loop", str(loops - 1),
+            "-i", str(mezzanine_path),
+            "-c", "copy",
+            "-movflags", "+faststart",
+            "-f", "mp4",
+            str(output_path),
+        ])
+
+    def _get_or_create(self, params: dict, create) -> Tuple[Path, float]:
+        key = DiskCache.make_key(params)
+        path = self.disk_cache.get(key)
+        metadata = self.disk_cache.get_metadata(key) if path is not None else None
+        if path is None or metadata is None:
+            # Les métadonnées sont complétées par write avant d'être enregistrées
+            metadata = {}
+            def write(temp_path: Path):
+                create(temp_path)
+                metadata["duration"] = ffmpeg_parse_infos(str(temp_path))["duration"]
+            path = self.disk_cache.put(key, write, metadata=metadata)
+        return path, metadata["duration"]
+
+    def prepare(self, source_path: str) -> Tuple[Path, float]:
+        """
+        Prépare (ou récupère) la mezzanine d'une vidéo source.
+
+        Args:
+            source_path (str): Chemin de la vidéo source
+
+        Returns:
+            tuple: (chemin de la mezzanine, durée en secondes)
+        """
+        return self._get_or_create(
+            self._params(source_path, 1),
+            lambda temp_path: self._transcode(source_path, temp_path)
+        )
+
+    def get(self, source_path: str, min_duration: Optional[float] = None) -> str:
+        """
+        Retourne le chemin d'une mezzanine de la source, bouclée pour couvrir min_duration.
+
+        Le bouclage est fait une fois pour toutes par copie de flux, pour éviter un
+        retour en arrière du décodeur à chaque tour de boucle pendant le rendu.
+
+        Args:
+            source_path (str): Chemin de la vidéo source
+            min_duration (Optional[float]): Durée minimale souhaitée
+
+        Returns:
+            str: Chemin de la mezzanine
+        """
+        mezzanine_path, duration = self.prepare(source_path)
+        if not min_duration or duration >= min_duration:
+            return str(mezzanine_path)
+
+        loops = int(math.ceil(min_duration / duration))
+        looped_path, _ = self._get_or_create(
+            self._params(source_path, loops),
+            lambda temp_path: self._loop(mezzanine_path, loops, temp_path)
+        )
+        return str(looped_path)
+
+    def prepare_directory(self, videos_dir: str):
+        """
+        Prépare les mezzanines de toutes les vidéos d'un répertoire.
+
+        Args:
+            videos_dir (str): Répertoire des vidéos de fond
+        """
+        for source_path in sorted(Path(videos_dir).glob("*.mp4")):
+            try:
+                mezzanine_path, duration = self.prepare(str(source_path))
+                logger.info(f"Mezzanine prête pour {source_path.name}: {mezzanine_path} ({duration:.1f}s)")
+            except Exception as e:
+                logger.error(f"Erreur lors de la préparation de {source_path}: {str(e)}")
+        self.disk_cache.log_stats()
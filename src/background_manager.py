@@ -26,4 +26,43 @@ class BackgroundManager:
             return str(video_path)
         video_generator = VideoGenerator(theme)
         img_generated_path = ImageGenerator(config=self.config).generete_and_save_image(theme)
-        return video_generator.generate_video_from_image(img_generated_path)
\ No newline at end of file
+        return video_generator.generate_video_from_image(img_generated_path)
+
+    def get_background_source(self, theme: str, duration: float):
+        """
+        Récupère le fond d'un thème : la vidéo existante, ou une source de frames
+        calculées à la demande depuis l'image du thème, à la durée exacte demandée.
+        
+        Args:
+            theme (str): Le thème du fond vidéo
+            duration (float): Durée de la vidéo finale en secondes
+            
+        Returns:
+            str | ZoomFrameSource: Chemin de la vidéo de fond ou source de frames
+        """
+        render_config = self.config.get("render", {})
+        if not render_config.get("procedural_background", True):
+            return self.get_background(theme)
+        
+        formatted_theme = theme.lower().replace(" ", "_")
+        video_path = self.videos_dir / f"{formatted_theme}.mp4"
+        if video_path.exists():
+            return str(video_path)
+        
+        # L'image déjà générée pour ce thème est réutilisée
+        image_path = Path(ImageGenerator.output_dir) / f"{formatted_theme}.png"
+        if not image_path.exists():
+            image_path = ImageGenerator(config=self.config).generete_and_save_image(theme)
+        
+        video_config = self.config["video"]
+        cache_video = render_config.get("cache_procedural_background", False)
+        source = VideoGenerator(theme).create_background_source(
+            str(image_path), duration,
+            width=video_config["width"], height=video_config["height"], fps=video_config["fps"],
+            # La vidéo gardée est bouclée par les rendus plus longs : cycles de zoom complets
+            loopable=cache_video
+        )
+        if cache_video:
+            # Vidéo gardée pour les prochains rendus de ce thème
+            return source.write_video(str(video_path))
+        return source
@@ -0,0 +1,328 @@
+import logging
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from moviepy import VideoClip
+
+from src.timeline import Timeline
+
+logger = logging.getLogger(__name__)
+
+class Layer:
+    def __init__(self, image: np.ndarray, x: int, y: int, start: float, end: float, fps: Optional[float] = None):
+        """
+        Calque pré-rastérisé positionné dans le temps et dans l'image.
+
+        Args:
+            image (np.ndarray): Image RGBA uint8 en alpha prémultiplié (hauteur, largeur, 4),
+                ou suite de frames (frames, hauteur, largeur, 4) pour un calque animé
+            x (int): Position horizontale du coin haut gauche
+            y (int): Position verticale du coin haut gauche
+            start (float): Début d'affichage en secondes
+            end (float): Fin d'affichage en secondes (exclue)
+            fps (Optional[float]): Images par seconde d'un calque animé
+        """
+        self.image = image
+        self.x = int(x)
+        self.y = int(y)
+        self.start = start
+        self.end = end
+        self.fps = fps
+
+    @property
+    def animated(self) -> bool:
+        return self.image.ndim == 4
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Dimensions (largeur, hauteur) du calque."""
+        return self.image.shape[-2], self.image.shape[-3]
+
+    def is_active(self, t: float) -> bool:
+        return self.start <= t < self.end
+
+    def frame_at(self, t: float) -> np.ndarray:
+        """
+        Retourne l'image du calque à l'instant t (temps absolu de la vidéo).
+
+        Args:
+            t (float): Instant en secondes
+
+        Returns:
+            np.ndarray: Image RGBA prémultipliée
+        """
+        if not self.animated:
+            return self.image
+        index = int((t - self.start) * self.fps + 1e-6)
+        return self.image[max(0, min(index, len(self.image) - 1))]
+
+    def shifted(self, offset: float) -> "Layer":
+        """Retourne une copie du calque décalée de offset secondes."""
+        return Layer(self.image, self.x, self.y, self.start + offset, self.end + offset, self.fps)
+
+class Scene:
+    def __init__(self, layers: List[Layer], audio_cues: List, duration: float):
+        """
+        Morceau de vidéo décrit par des calques à plat, sans arbre de clips moviepy.
+
+        Args:
+            layers (List[Layer]): Calques de la scène (temps relatifs au début de la scène)
+            audio_cues (List[AudioCue]): Sons de la scène (temps relatifs au début de la scène)
+            duration (float): Durée de la scène en secondes
+        """
+        self.layers = layers
+        self.audio_cues = audio_cues
+        self.duration = duration
+
+def _over(target: np.ndarray, source: np.ndarray):
+    """Fusionne en place une image RGBA prémultipliée sur une autre (opérateur « over »)."""
+    alpha = source[:, :, 3:4].astype(np.uint16)
+    blended = target.astype(np.uint16)
+    blended *= 255 - alpha
+    blended += 127
+    blended //= 255
+    blended += source
+    np.minimum(blended, 255, out=blended)
+    target[:] = blended
+
+def _merge_layers(layers: List[Layer], start: float, end: float, min_gap: int) -> List[Layer]:
+    """
+    Fusionne des calques statiques en un overlay unique découpé en bandes horizontales.
+
+    Les lignes entièrement transparentes séparant des zones de plus de min_gap pixels
+    ne sont pas conservées, pour que l'overlay ne coûte pas plus cher à fusionner
+    que les calques d'origine.
+
+    Args:
+        layers (List[Layer]): Calques statiques, dans l'ordre d'empilement
+        start (float): Début de l'intervalle
+        end (float): Fin de l'intervalle
+        min_gap (int): Hauteur minimale d'un espace vide pour couper une bande
+
+    Returns:
+        List[Layer]: Bandes de l'overlay
+    """
+    x0 = min(layer.x for layer in layers)
+    y0 = min(layer.y for layer in layers)
+    x1 = max(layer.x + layer.size[0] for layer in layers)
+    y1 = max(layer.y + layer.size[1] for layer in layers)
+    canvas = np.zeros((y1 - y0, x1 - x0, 4), dtype=np.uint8)
+    for layer in layers:
+        w, h = layer.size
+        _over(canvas[layer.y - y0:layer.y - y0 + h, layer.x - x0:layer.x - x0 + w], layer.image)
+
+    # Découpage en bandes de lignes non vides
+    filled_rows = np.flatnonzero(canvas[:, :, 3].any(axis=1))
+    if len(filled_rows) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(filled_rows) > min_gap)
+    band_starts = np.concatenate(([filled_rows[0]], filled_rows[breaks + 1]))
+    band_ends = np.concatenate((filled_rows[breaks], [filled_rows[-1]])) + 1
+
+    bands = []
+    for band_start, band_end in zip(band_starts, band_ends):
+        band = canvas[band_start:band_end]
+        filled_columns = np.flatnonzero(band[:, :, 3].any(axis=0))
+        left, right = filled_columns[0], filled_columns[-1] + 1
+        bands.append(Layer(np.ascontiguousarray(band[:, left:right]), x0 + left, y0 + band_start, start, end))
+    return bands
+
+def _overlaps(a: Layer, b: Layer) -> bool:
+    """Indique si deux calques se chevauchent à la fois dans le temps et dans l'image."""
+    if a.start >= b.end or b.start >= a.end:
+        return False
+    (aw, ah), (bw, bh) = a.size, b.size
+    return a.x < b.x + bw and b.x < a.x + aw and a.y < b.y + bh and b.y < a.y + ah
+
+def _clusters(layers: List[Layer], min_gap: int) -> List[List[Layer]]:
+    """
+    Regroupe des calques en bandes horizontales d'après leurs seules positions : deux
+    calques séparés verticalement par plus de min_gap pixels ne sont jamais fusionnés
+    ensemble. L'ordre d'empilement est conservé dans chaque groupe.
+    """
+    order = sorted(range(len(layers)), key=lambda index: layers[index].y)
+    groups = []
+    bottom = None
+    for index in order:
+        layer = layers[index]
+        if bottom is None or layer.y - bottom > min_gap:
+            groups.append([])
+            bottom = layer.y + layer.size[1]
+        else:
+            bottom = max(bottom, layer.y + layer.size[1])
+        groups[-1].append(index)
+    return [[layers[index] for index in sorted(group)] for group in groups]
+
+def _flatten_run(layers: List[Layer], min_gap: int) -> List[Layer]:
+    """
+    Aplatit des calques statiques, donnés dans l'ordre d'empilement.
+
+    Chaque intervalle élémentaire est découpé en groupes de calques (voir _clusters) ;
+    un groupe est fusionné une seule fois par ensemble de calques, puis prolongé ou
+    réutilisé tel quel sur les intervalles suivants où il est identique.
+    """
+    if len(layers) < 2:
+        return list(layers)
+
+    boundaries = sorted({layer.start for layer in layers} | {layer.end for layer in layers})
+    flattened = []
+    # Ensemble de calques -> bandes fusionnées (images partagées entre intervalles)
+    merged = {}
+    # Ensemble de calques -> bandes affichées qui se terminent à la fin de l'intervalle courant
+    current = {}
+    for start, end in zip(boundaries, boundaries[1:]):
+        active = [layer for layer in layers if layer.start <= start and layer.end >= end]
+        previous, current = current, {}
+        for group in _clusters(active, min_gap):
+            key = tuple(id(layer) for layer in group)
+            if key in previous:
+                # Même contenu que l'intervalle précédent : on prolonge les bandes
+                bands = previous[key]
+                for band in bands:
+                    band.end = end
+            elif key in merged:
+                # Contenu déjà fusionné plus tôt : nouvelles bandes sur les mêmes images
+                bands = [Layer(band.image, band.x, band.y, start, end) for band in merged[key]]
+                flattened += bands
+            elif len(group) == 1:
+                bands = [Layer(group[0].image, group[0].x, group[0].y, start, end)]
+                flattened += bands
+            else:
+                bands = _merge_layers(group, start, end, min_gap)
+                merged[key] = bands
+                flattened += bands
+            current[key] = bands
+    return flattened
+
+def flatten_static_layers(layers: List[Layer], min_gap: int = 64, min_duration: float = 1.0) -> List[Layer]:
+    """
+    Remplace les calques statiques durables par un overlay pré-aplati par intervalle de temps.
+
+    Sur chaque intervalle où l'ensemble des calques statiques visibles ne change pas,
+    ces calques sont fusionnés une seule fois. Les calques affichés moins de min_duration
+    secondes (sous-titres mot par mot) sont laissés tels quels : ils découperaient la
+    timeline en autant d'intervalles. Un calque statique n'est placé sous les calques
+    restants que s'il ne chevauche (temps et image) aucun calque qu'il recouvrait,
+    afin que le rendu reste identique.
+
+    Args:
+        layers (List[Layer]): Calques dans l'ordre d'empilement
+        min_gap (int): Hauteur minimale d'un espace vide pour couper l'overlay en bandes
+        min_duration (float): Durée minimale d'affichage d'un calque pour être aplati
+
+    Returns:
+        List[Layer]: Calques aplatis
+    """
+    static_layers = []
+    remaining_layers = []
+    for layer in layers:
+        if (layer.animated or layer.end - layer.start < min_duration
+                or any(_overlaps(layer, other) for other in remaining_layers)):
+            remaining_layers.append(layer)
+        else:
+            static_layers.append(layer)
+    return _flatten_run(static_layers, min_gap) + remaining_layers
+
+class QuizCompositor:
+    def __init__(self, size: Tuple[int, int], background: Optional[Callable[[float], np.ndarray]] = None,
+                 background_color: Tuple[int, int, int] = (0, 0, 0)):
+        """
+        Compositeur NumPy dédié aux vidéos de quiz.
+
+        Chaque frame est composée dans un unique tampon réutilisé : le fond est copié
+        puis chaque calque actif est fusionné uniquement sur sa boîte englobante, en
+        arithmétique entière avec alpha prémultiplié.
+
+        Args:
+            size (tuple): Dimensions (largeur, hauteur) de la vidéo
+            background (Optional[Callable[[float], np.ndarray]]): Fonction retournant la frame RGB du fond à l'instant t
+            background_color (tuple): Couleur de fond si aucune fonction de fond n'est fournie
+        """
+        self.width, self.height = size
+        self.background = background
+        self.background_color = background_color
+        self.layers: List[Layer] = []
+        self._timeline: Optional[Timeline] = None
+        self._frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+    def add_layer(self, layer: Layer):
+        self.layers.append(layer)
+        self._timeline = None
+
+    def add_layers(self, layers: List[Layer]):
+        self.layers.extend(layers)
+        self._timeline = None
+
+    def flatten_static(self, min_gap: int = 64, min_duration: float = 1.0):
+        """
+        Pré-aplatit les calques statiques durables (voir flatten_static_layers), pour que
+        le coût par frame ne dépende plus du nombre de calques fixes.
+        """
+        count = len(self.layers)
+        self.layers = flatten_static_layers(self.layers, min_gap=min_gap, min_duration=min_duration)
+        self._timeline = None
+        logger.info(f"Calques statiques aplatis: {count} -> {len(self.layers)} calques")
+
+    def _active_layers(self, t: float) -> List[Layer]:
+        if self._timeline is None:
+            self._timeline = Timeline((layer.start, layer.end, layer) for layer in self.layers)
+        return self._timeline.at(t)
+
+    def _blend(self, image: np.ndarray, x: int, y: int):
+        """
+        Fusionne une image RGBA prémultipliée sur le tampon, limitée à sa boîte englobante.
+
+        Args:
+            image (np.ndarray): Image RGBA uint8 prémultipliée
+            x (int): Position horizontale
+            y (int): Position verticale
+        """
+        h, w = image.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        source = image[y0 - y:y1 - y, x0 - x:x1 - x]
+        target = self._frame[y0:y1, x0:x1]
+        alpha = source[:, :, 3:4]
+
+        # sortie = source + destination * (255 - alpha) / 255, arrondi entier
+        blended = target.astype(np.uint16)
+        blended *= 255 - alpha.astype(np.uint16)
+        blended += 127
+        blended //= 255
+        blended += source[:, :, :3]
+        np.minimum(blended, 255, out=blended)
+        target[:] = blended
+
+    def render_frame(self, t: float) -> np.ndarray:
+        """
+        Compose la frame à l'instant t.
+
+        Args:
+            t (float): Instant en secondes
+
+        Returns:
+            np.ndarray: Frame RGB uint8 (le tampon est réutilisé à chaque appel)
+        """
+        if self.background is not None:
+            np.copyto(self._frame, self.background(t), casting="unsafe")
+        else:
+            self._frame[:] = self.background_color
+
+        for layer in self._active_layers(t):
+            self._blend(layer.frame_at(t), layer.x, layer.y)
+        return self._frame
+
+    def to_clip(self, duration: float) -> VideoClip:
+        """
+        Expose le compositeur sous forme de clip moviepy pour l'export.
+
+        Args:
+            duration (float): Durée de la vidéo
+
+        Returns:
+            VideoClip: Clip dont chaque frame est produite par render_frame
+        """
+        logger.info(f"Compositeur NumPy: {len(self.layers)} calques")
+        return VideoClip(frame_function=self.render_frame, duration=duration)
@@ -0,0 +1,160 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    def __init__(self, cache_dir: str, max_bytes: int, suffix: str, name: str = "cache"):
+        """
+        Initialise un cache disque adressé par contenu avec éviction LRU.
+
+        Chaque entrée est un fichier `<clé><suffixe>`, accompagné d'un fichier
+        `<clé>.json` optionnel pour ses métadonnées. La date de modification sert
+        de date de dernier accès pour l'éviction.
+
+        Args:
+            cache_dir (str): Répertoire du cache
+            max_bytes (int): Taille maximale du cache en octets
+            suffix (str): Extension des fichiers de données (ex: '.npy')
+            name (str): Nom du cache utilisé dans les logs
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.name = name
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        """
+        Calcule la clé d'une entrée à partir de ses paramètres.
+
+        Args:
+            params (dict): Paramètres identifiant le contenu
+
+        Returns:
+            str: Empreinte SHA-256 des paramètres
+        """
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Retourne le chemin du fichier de données d'une entrée."""
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def _metadata_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Recherche une entrée dans le cache et la marque comme récemment utilisée.
+
+        Args:
+            key (str): Clé de l'entrée
+
+        Returns:
+            Optional[Path]: Chemin du fichier de données, ou None si absent
+        """
+        path = self.path_for(key)
+        if not path.exists():
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return path
+
+    def get_metadata(self, key: str) -> Optional[Dict]:
+        """
+        Lit les métadonnées d'une entrée.
+
+        Args:
+            key (str): Clé de l'entrée
+
+        Returns:
+            Optional[Dict]: Métadonnées, ou None si absentes ou illisibles
+        """
+        metadata_path = self._metadata_path(key)
+        if not metadata_path.exists():
+            return None
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, write: Callable[[Path], None], metadata: Optional[Dict] = None) -> Path:
+        """
+        Ajoute une entrée au cache de façon atomique puis applique l'éviction.
+
+        Args:
+            key (str): Clé de l'entrée
+            write (Callable[[Path], None]): Fonction écrivant les données dans le chemin fourni
+            metadata (Optional[Dict]): Métadonnées à stocker avec l'entrée
+
+        Returns:
+            Path: Chemin du fichier de données
+        """
+        path = self.path_for(key)
+        temp_path = self.cache_dir / f"{key}.{os.getpid()}.tmp{self.suffix}"
+        write(temp_path)
+        if metadata is not None:
+            temp_metadata = self.cache_dir / f"{key}.{os.getpid()}.tmp.json"
+            with open(temp_metadata, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False)
+            os.replace(temp_metadata, self._metadata_path(key))
+        os.replace(temp_path, path)
+        self.stats["writes"] += 1
+        self.evict()
+        return path
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à respecter la taille maximale."""
+        entries = []
+        total_size = 0
+        for path in self.cache_dir.glob(f"*{self.suffix}"):
+            if ".tmp" in path.name:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_bytes:
+            return
+
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                metadata_path = self._metadata_path(path.name[:-len(self.suffix)])
+                if metadata_path.exists():
+                    metadata_path.unlink()
+            except OSError:
+                continue
+            total_size -= size
+            self.stats["evictions"] += 1
+
+    def reset_stats(self):
+        """Remet à zéro les statistiques de succès et d'échecs."""
+        self.stats = {key: 0 for key in self.stats}
+
+    def log_stats(self):
+        """Affiche les statistiques du cache dans les logs."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / lookups * 100) if lookups else 0.0
+        logger.info(
+            f"Cache {self.name}: {self.stats['hits']} succès, {self.stats['misses']} échecs "
+            f"({hit_rate:.1f}%), {self.stats['writes']} écritures, {self.stats['evictions']} évictions"
+        )
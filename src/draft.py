@@ -0,0 +1,60 @@
+import copy
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Paramètres en pixels de la configuration, mis à l'échelle en mode brouillon
+SCALED_VIDEO_KEYS = ("spacing", "question_font_size", "choices_font_size")
+SCALED_SUBTITLES_KEYS = ("font_size", "stroke_width", "corner_radius", "padding_x", "padding_y",
+                         "bottom_margin", "extra_spacing")
+
+def _scale(value, scale: float) -> int:
+    """Met une longueur à l'échelle, sans faire disparaître une longueur non nulle."""
+    return max(1, int(round(value * scale))) if value else 0
+
+def _scale_even(value, scale: float) -> int:
+    """Met une dimension de la vidéo à l'échelle, arrondie au pair pour le yuv420p."""
+    return max(2, int(round(value * scale / 2)) * 2)
+
+def draft_config(config: dict) -> dict:
+    """
+    Retourne une copie de la configuration pour un rendu brouillon.
+
+    Les dimensions de la vidéo et toutes les longueurs de la mise en page sont multipliées
+    par draft.scale (video.scale transmet le facteur aux constantes de VideoCreator), les
+    fps sont réduits et l'encodage utilise un preset rapide. La timeline est inchangée :
+    le brouillon sert à vérifier les timings et la mise en page à moindre coût. Les fonds
+    sont transcodés à la résolution du brouillon par le cache des fonds.
+
+    Args:
+        config (dict): Configuration complète
+
+    Returns:
+        dict: Configuration du brouillon
+    """
+    draft = config.get("draft", {})
+    scale = float(draft.get("scale", 0.35))
+    config = copy.deepcopy(config)
+
+    video = config["video"]
+    video["width"] = _scale_even(video["width"], scale)
+    video["height"] = _scale_even(video["height"], scale)
+    video["fps"] = draft.get("fps", 15)
+    video["scale"] = scale * video.get("scale", 1.0)
+    for key in SCALED_VIDEO_KEYS:
+        if key in video:
+            video[key] = _scale(video[key], scale)
+
+    subtitles = config["subtitles"]
+    for key in SCALED_SUBTITLES_KEYS:
+        if key in subtitles:
+            subtitles[key] = _scale(subtitles[key], scale)
+
+    render = config.setdefault("render", {})
+    render["preset"] = draft.get("preset", "ultrafast")
+    # Un fond procédural en basse résolution ne doit pas remplacer celui du thème
+    render["cache_procedural_background"] = False
+
+    logger.info(f"Mode brouillon: {video['width']}x{video['height']} à {video['fps']} fps "
+                f"(échelle {scale}, preset {render['preset']})")
+    return config
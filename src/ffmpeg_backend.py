@@ -0,0 +1,181 @@
+import re
+import shutil
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+from PIL import Image
+from moviepy.config import FFMPEG_BINARY
+
+from src import rasterizer
+from src.compositor import Layer
+from src.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+def _escape_filter_value(value: str) -> str:
+    """Échappe une valeur d'option pour les deux niveaux d'analyse d'un graphe de filtres."""
+    value = re.sub(r"([\\:'])", r"\\\1", value)
+    return re.sub(r"([\\'\[\],;])", r"\\\1", value)
+
+def ass_filter(ass_path: str, fonts_dir: Optional[str] = None) -> str:
+    """
+    Construit le filtre FFmpeg qui incruste des sous-titres ASS avec libass.
+    
+    Args:
+        ass_path (str): Chemin du fichier ASS
+        fonts_dir (Optional[str]): Répertoire où libass cherche les polices
+        
+    Returns:
+        str: Filtre utilisable avec -vf ou dans un graphe de filtres
+    """
+    options = [f"filename={_escape_filter_value(ass_path)}"]
+    if fonts_dir:
+        options.append(f"fontsdir={_escape_filter_value(fonts_dir)}")
+    return "ass=" + ":".join(options)
+
+class FfmpegOverlayRenderer:
+    def __init__(self, size: Tuple[int, int], fps: float, cache_dir: str,
+                 background_color: Tuple[int, int, int] = (0, 0, 0), max_bytes: int = 256 * 1024 * 1024):
+        """
+        Backend de rendu par graphe de filtres FFmpeg.
+
+        Chaque calque est rastérisé une seule fois en PNG (adressé par son contenu, dans un
+        cache disque de taille bornée), puis toute la composition est décrite par une chaîne
+        de filtres overlay=...:enable=... au-dessus du fond, exécutée par un unique processus
+        FFmpeg. Un PNG partagé par plusieurs calques n'est lu qu'une fois (filtre split).
+
+        Le rendu est proche de celui du compositeur NumPy sans lui être identique au bit
+        près : les PNG sont en alpha direct (repassés depuis le prémultiplié), overlay mélange
+        en alpha direct et l'encodage se fait en yuv420p.
+
+        Args:
+            size (tuple): Dimensions (largeur, hauteur) de la vidéo
+            fps (float): Images par seconde
+            cache_dir (str): Répertoire des PNG des calques
+            background_color (tuple): Couleur de fond si aucune vidéo de fond n'est fournie
+            max_bytes (int): Taille maximale du cache des PNG sur disque
+        """
+        self.width, self.height = size
+        self.fps = fps
+        self.png_cache = DiskCache(cache_dir, max_bytes=max_bytes, suffix=".png", name="overlays")
+        self.background_color = background_color
+
+    @staticmethod
+    def _save_png(image: np.ndarray, path: Path):
+        """Enregistre une image RGBA prémultipliée en PNG (alpha direct)."""
+        Image.fromarray(rasterizer.unpremultiply(image), "RGBA").save(path, format="PNG", compress_level=1)
+
+    def _write_png(self, image: np.ndarray) -> Path:
+        """Écrit le PNG d'une image RGBA prémultipliée dans le cache, une seule fois par contenu."""
+        digest = hashlib.sha256()
+        digest.update(str(image.shape).encode("utf-8"))
+        digest.update(np.ascontiguousarray(image).data)
+        key = digest.hexdigest()
+        path = self.png_cache.get(key)
+        if path is None:
+            path = self.png_cache.put(key, lambda temp_path: self._save_png(image, temp_path))
+        return path
+
+    def _write_sequence(self, frames: np.ndarray, work_dir: Path, index: int) -> str:
+        """Écrit les frames d'un calque animé en suite de PNG et retourne le motif de fichiers."""
+        sequence_dir = work_dir / f"layer{index:03d}"
+        sequence_dir.mkdir(parents=True, exist_ok=True)
+        for frame_index, frame in enumerate(frames):
+            self._save_png(frame, sequence_dir / f"{frame_index:05d}.png")
+        return str(sequence_dir / "%05d.png")
+
+    @staticmethod
+    def _enable(layer: Layer) -> str:
+        # Intervalle [début, fin) comme dans le compositeur NumPy
+        return f"gte(t\\,{layer.start:.6f})*lt(t\\,{layer.end:.6f})"
+
+    def render(self, layers: List[Layer], duration: float, output_path: str,
+               background_path: Optional[str] = None, audio_path: Optional[str] = None,
+               preset: str = "ultrafast", threads: int = 16, subtitles_path: Optional[str] = None,
+               fonts_dir: Optional[str] = None):
+        """
+        Compose et encode la vidéo en un seul processus FFmpeg.
+
+        Args:
+            layers (List[Layer]): Calques dans l'ordre d'empilement
+            duration (float): Durée de la vidéo
+            output_path (str): Chemin de la vidéo finale
+            background_path (Optional[str]): Vidéo de fond, déjà aux dimensions de sortie
+            audio_path (Optional[str]): Piste audio (AAC) à multiplexer
+            preset (str): Preset x264
+            threads (int): Nombre de threads de l'encodeur
+            subtitles_path (Optional[str]): Sous-titres ASS incrustés au-dessus des calques
+            fonts_dir (Optional[str]): Répertoire des polices des sous-titres
+        """
+        work_dir = Path(output_path + ".layers")
+        work_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            inputs = []
+            if background_path:
+                inputs += ["-stream_loop", "-1", "-i", background_path]
+                background_filter = f"[0:v]scale={self.width}:{self.height},fps={self.fps},setpts=PTS-STARTPTS"
+            else:
+                color = "0x{:02x}{:02x}{:02x}".format(*self.background_color)
+                inputs += ["-f", "lavfi", "-i", f"color=c={color}:s={self.width}x{self.height}:r={self.fps}"]
+                background_filter = "[0:v]null"
+            input_count = 1
+
+            filters = [f"{background_filter},format=rgb24[base0]"]
+            overlays = []
+            # PNG -> (indice de l'entrée, position du chemin dans inputs, image, étiquettes des calques)
+            images = {}
+            for index, layer in enumerate(layers, start=1):
+                if layer.animated:
+                    inputs += ["-framerate", str(layer.fps), "-i", self._write_sequence(layer.image, work_dir, index)]
+                    # Les frames du calque animé démarrent à son début d'affichage
+                    filters.append(f"[{input_count}:v]setpts=PTS-STARTPTS+{layer.start:.6f}/TB[layer{index}]")
+                    input_count += 1
+                else:
+                    path = self._write_png(layer.image)
+                    if path not in images:
+                        inputs += ["-i", str(path)]
+                        images[path] = (input_count, len(inputs) - 1, layer.image, [])
+                        input_count += 1
+                    images[path][3].append(f"[layer{index}]")
+                overlays.append(
+                    f"[base{index - 1}][layer{index}]overlay=x={layer.x}:y={layer.y}"
+                    f":enable='{self._enable(layer)}':eof_action=repeat:format=rgb[base{index}]"
+                )
+
+            for path, (input_index, position, image, labels) in images.items():
+                if not path.exists():
+                    # PNG évincé du cache pendant ce rendu (cache plus petit que la vidéo)
+                    inputs[position] = str(work_dir / f"input{input_index:03d}.png")
+                    self._save_png(image, Path(inputs[position]))
+                if len(labels) == 1:
+                    filters.append(f"[{input_index}:v]null{labels[0]}")
+                else:
+                    filters.append(f"[{input_index}:v]split={len(labels)}{''.join(labels)}")
+            filters += overlays
+            subtitles_filter = f"{ass_filter(subtitles_path, fonts_dir)}," if subtitles_path else ""
+            filters.append(f"[base{len(layers)}]{subtitles_filter}format=yuv420p[video]")
+
+            filter_script = work_dir / "filters.txt"
+            filter_script.write_text(";\n".join(filters), encoding="utf-8")
+
+            cmd = [FFMPEG_BINARY, "-y", "-loglevel", "error"] + inputs
+            if audio_path:
+                cmd += ["-i", audio_path]
+            cmd += ["-filter_complex_script", str(filter_script), "-map", "[video]"]
+            if audio_path:
+                cmd += ["-map", f"{input_count}:a", "-c:a", "copy"]
+            cmd += [
+                "-t", f"{int(duration * self.fps) / self.fps:.6f}", "-r", str(self.fps),
+                "-c:v", "libx264", "-preset", preset, "-threads", str(threads),
+                "-movflags", "+faststart", output_path,
+            ]
+            logger.info(f"Rendu FFmpeg: {len(layers)} calques, {input_count} entrées, en un seul graphe de filtres")
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.png_cache.log_stats()
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Échec du rendu FFmpeg: {e.stderr.decode(errors='replace')}") from e
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
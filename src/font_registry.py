@@ -0,0 +1,188 @@
+import os
+import io
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from PIL import ImageFont
+
+from src.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si les options de sous-ensemble changent
+SUBSET_VERSION = 1
+
+class FontRegistry:
+    def __init__(self, subset_dir: Optional[str] = None, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Registre des polices du processus.
+
+        Chaque face (chemin, taille, index) n'est chargée qu'une fois puis partagée par le
+        timer, les boîtes de texte et les sous-titres. En option, un sous-ensemble de la police réduit aux glyphes des textes
+        de la série de questions est écrit sur disque : les TextClip, qui rouvrent leur
+        police à chaque création, chargent alors un petit fichier au lieu de la police complète.
+
+        Args:
+            subset_dir (Optional[str]): Répertoire des sous-ensembles de polices (None: désactivé)
+            max_bytes (int): Taille maximale du répertoire des sous-ensembles
+        """
+        self.subset_cache = DiskCache(subset_dir, max_bytes=max_bytes, suffix=".font", name="polices") if subset_dir else None
+        # Faces chargées : (chemin, taille, index) -> police PIL
+        self._faces: Dict[Tuple[str, int, int], ImageFont.FreeTypeFont] = {}
+        # Sous-ensemble courant : (chemin, index) -> (caractères couverts, chemin du sous-ensemble)
+        self._subsets: Dict[Tuple[str, int], Tuple[FrozenSet[str], str]] = {}
+        self.stats = {
+            "face_loads": 0,
+            "face_hits": 0,
+            "load_seconds": 0.0,
+            "subset_builds": 0,
+            "subset_hits": 0,
+            "subset_fallbacks": 0,
+        }
+
+    def get(self, path: str, size: int, index: int = 0) -> ImageFont.FreeTypeFont:
+        """
+        Retourne la face PIL d'une police, chargée une seule fois par processus.
+
+        Args:
+            path (str): Chemin du fichier de police (.ttf, .otf, .ttc)
+            size (int): Taille en pixels
+            index (int): Index de la face dans une collection (.ttc)
+
+        Returns:
+            ImageFont.FreeTypeFont: Police partagée (ne pas la modifier)
+        """
+        key = (path, int(size), index)
+        face = self._faces.get(key)
+        if face is not None:
+            self.stats["face_hits"] += 1
+            return face
+
+        start_time = time.perf_counter()
+        face = ImageFont.truetype(path, int(size), index=index)
+        self.stats["load_seconds"] += time.perf_counter() - start_time
+        self.stats["face_loads"] += 1
+        self._faces[key] = face
+        return face
+
+    def prepare_subset(self, path: str, texts: Iterable[str], index: int = 0) -> Optional[str]:
+        """
+        Prépare le sous-ensemble d'une police réduit aux caractères des textes fournis.
+
+        Nécessite fontTools ; sans lui (ou en cas d'erreur), la police complète reste utilisée.
+
+        Args:
+            path (str): Chemin du fichier de police
+            texts (Iterable[str]): Textes à couvrir (questions, choix, réponses...)
+            index (int): Index de la face dans une collection (.ttc)
+
+        Returns:
+            Optional[str]: Chemin du sous-ensemble, ou None s'il n'a pas pu être créé
+        """
+        if self.subset_cache is None:
+            return None
+        characters = frozenset("".join(texts)) - frozenset("\n\r\t")
+        with open(path, "rb") as f:
+            font_bytes = f.read()
+        key = DiskCache.make_key({
+            "font": hashlib.sha256(font_bytes).hexdigest(),
+            "index": index,
+            "characters": "".join(sorted(characters)),
+            "version": SUBSET_VERSION,
+        })
+
+        subset_path = self.subset_cache.get(key)
+        if subset_path is not None:
+            self.stats["subset_hits"] += 1
+        else:
+            try:
+                from fontTools import subset
+                from fontTools.ttLib import TTFont
+            except ImportError:
+                logger.warning("fontTools n'est pas installé, utilisation de la police complète")
+                return None
+            # fontTools détaille chaque table au niveau INFO
+            logging.getLogger("fontTools").setLevel(logging.WARNING)
+
+            def write(temp_path: Path):
+                font = TTFont(io.BytesIO(font_bytes), fontNumber=index)
+                options = subset.Options()
+                # Mêmes glyphes, métriques, crénage et hinting que la police d'origine
+                options.layout_features = ["*"]
+                options.name_IDs = ["*"]
+                options.name_languages = ["*"]
+                options.notdef_outline = True
+                options.hinting = True
+                # Sans raqm, PIL positionne les glyphes avec l'ancienne table kern
+                options.legacy_kern = True
+                subsetter = subset.Subsetter(options)
+                subsetter.populate(text="".join(characters))
+                subsetter.subset(font)
+                font.save(str(temp_path))
+
+            start_time = time.perf_counter()
+            try:
+                subset_path = self.subset_cache.put(key, write)
+            except Exception as e:
+                logger.error(f"Erreur lors de la création du sous-ensemble de {path}: {str(e)}")
+                return None
+            self.stats["subset_builds"] += 1
+            logger.info(f"Sous-ensemble de police créé: {len(characters)} caractères en "
+                        f"{time.perf_counter() - start_time:.2f}s ({os.path.getsize(subset_path) // 1024} Ko)")
+
+        self._subsets[(path, index)] = (characters, str(subset_path))
+        return str(subset_path)
+
+    def font_path(self, path: str, text: str = "", index: int = 0) -> str:
+        """
+        Retourne le fichier de police à utiliser pour un texte : le sous-ensemble courant
+        s'il couvre tous ses caractères, sinon la police complète.
+
+        Args:
+            path (str): Chemin du fichier de police
+            text (str): Texte à afficher
+            index (int): Index de la face dans une collection (.ttc)
+
+        Returns:
+            str: Chemin de la police
+        """
+        subset = self._subsets.get((path, index))
+        if subset is None:
+            return path
+        characters, subset_path = subset
+        if set(text) - set("\n\r\t") <= characters:
+            return subset_path
+        self.stats["subset_fallbacks"] += 1
+        return path
+
+    def log_stats(self):
+        """Affiche les statistiques de chargement des polices dans les logs."""
+        logger.info(
+            f"Polices: {self.stats['face_loads']} faces chargées, "
+            f"{self.stats['face_hits']} réutilisations, {self.stats['load_seconds']:.2f}s de chargement, "
+            f"sous-ensembles: {self.stats['subset_builds']} créés, {self.stats['subset_hits']} réutilisés, "
+            f"{self.stats['subset_fallbacks']} textes non couverts"
+        )
+
+# Registre partagé par tout le processus
+_font_registry: Optional[FontRegistry] = None
+
+def get_font_registry(subset_dir: Optional[str] = None) -> FontRegistry:
+    """
+    Retourne le registre des polices du processus, créé au premier appel.
+
+    Args:
+        subset_dir (Optional[str]): Répertoire des sous-ensembles de polices, activé s'il est
+            fourni lors d'un appel
+
+    Returns:
+        FontRegistry: Registre partagé
+    """
+    global _font_registry
+    if _font_registry is None:
+        _font_registry = FontRegistry(subset_dir)
+    elif subset_dir and _font_registry.subset_cache is None:
+        _font_registry.subset_cache = DiskCache(subset_dir, max_bytes=64 * 1024 * 1024, suffix=".font", name="polices")
+    return _font_registry
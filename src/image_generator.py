@@ -8,11 +8,13 @@ from PIL import Image
 from src.question_generator import QuestionGenerator
 
 class ImageGenerator:
+    # Dossier des images générées, nommées d'après leur thème
+    output_dir = "assets/backgrounds/images"
+
     def __init__(self, config: dict):
         # Chargement des variables d'environnement
         load_dotenv(override=True)
         self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        self.output_dir = "assets/backgrounds/images"
         self.config = config
     def generete_and_save_image(self, theme: str):
         
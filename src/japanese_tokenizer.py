@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import logging
+import threading
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de textes dont le découpage est gardé en mémoire
+TOKEN_CACHE_SIZE = 4096
+
+# Découpage de secours sans Fugashi : suites de kanji/kana, mots latins, ponctuation
+FALLBACK_PATTERN = re.compile(
+    r"[\u3005\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]+|[a-zA-Z0-9]+|[.,!?;。、！？]"
+)
+
+class JapaneseTokenizer:
+    def __init__(self, cache_size: int = TOKEN_CACHE_SIZE):
+        """
+        Service de découpage des textes japonais en mots.
+
+        Le tagger Fugashi (MeCab + unidic) n'est chargé qu'une fois, à la première
+        utilisation, et le découpage de chaque texte est mémorisé (LRU borné) : les boîtes
+        de texte, les sous-titres et l'alignement WhisperX partagent les mêmes résultats.
+
+        Args:
+            cache_size (int): Nombre maximal de textes mémorisés
+        """
+        self._tagger = None
+        self._tagger_loaded = False
+        # Le tagger MeCab n'est pas réentrant
+        self._lock = threading.Lock()
+        self._tokenize = lru_cache(maxsize=cache_size)(self._tokenize_uncached)
+
+    @property
+    def tagger(self):
+        """Tagger Fugashi, chargé au premier accès (None s'il n'est pas disponible)."""
+        with self._lock:
+            if not self._tagger_loaded:
+                self._tagger_loaded = True
+                self._tagger = self._load_tagger()
+            return self._tagger
+
+    @staticmethod
+    def _load_tagger():
+        try:
+            # Vérifier d'abord si unidic est correctement installé
+            import unidic
+            dicdir = unidic.DICDIR
+            if not os.path.exists(dicdir):
+                logger.warning(f"Le dictionnaire unidic n'est pas trouvé à {dicdir}")
+                logger.info("Téléchargement du dictionnaire unidic...")
+                import subprocess
+                subprocess.run([sys.executable, "-m", "unidic", "download"], check=True)
+
+            # Importer Fugashi après s'être assuré que unidic est correctement installé
+            from fugashi import Tagger
+            tagger = Tagger()
+            logger.info("Tagger japonais initialisé avec succès")
+            return tagger
+        except Exception as e:
+            logger.error(f"Erreur lors de l'initialisation du tagger japonais: {str(e)}")
+            logger.info("Utilisation de la méthode alternative pour le découpage des mots japonais")
+            return None
+
+    def _tokenize_uncached(self, text: str) -> Tuple[Tuple[str, str], ...]:
+        tagger = self.tagger
+        if tagger is not None:
+            try:
+                with self._lock:
+                    return tuple((word.white_space, word.surface) for word in tagger(text))
+            except Exception as e:
+                logger.error(f"Erreur lors de la tokenisation japonaise: {str(e)}")
+        # Méthode alternative si Fugashi n'est pas disponible
+        return tuple(("", word) for word in FALLBACK_PATTERN.findall(text) if word.strip())
+
+    def words(self, text: str) -> List[str]:
+        """
+        Découpe un texte japonais en mots.
+
+        Args:
+            text (str): Texte japonais
+
+        Returns:
+            List[str]: Mots, sans les espaces
+        """
+        return [surface for _, surface in self._tokenize(text)]
+
+    def words_with_spaces(self, text: str) -> List[str]:
+        """
+        Découpe un texte japonais en mots en gardant les espaces qui les précèdent.
+
+        Args:
+            text (str): Texte japonais
+
+        Returns:
+            List[str]: Mots précédés de leurs espaces
+        """
+        return [white_space + surface for white_space, surface in self._tokenize(text)]
+
+    def tokenize_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        """
+        Découpe d'avance tous les textes d'une série de questions (un seul passage par
+        texte distinct, résultats mémorisés pour les utilisations suivantes).
+
+        Args:
+            texts (Iterable[str]): Textes japonais
+
+        Returns:
+            List[List[str]]: Mots de chaque texte, dans l'ordre
+        """
+        return [self.words(text) for text in texts]
+
+    @property
+    def available(self) -> bool:
+        """Indique si Fugashi est utilisé (sinon découpage de secours)."""
+        return self.tagger is not None
+
+    def log_stats(self):
+        """Affiche les statistiques de la mémoïsation dans les logs."""
+        info = self._tokenize.cache_info()
+        logger.info(
+            f"Tokenizer japonais: {info.misses} textes découpés, {info.hits} réutilisations "
+            f"({info.currsize}/{info.maxsize} en mémoire)"
+        )
+
+# Service partagé par tout le processus
+_japanese_tokenizer: Optional[JapaneseTokenizer] = None
+
+def get_japanese_tokenizer() -> JapaneseTokenizer:
+    """
+    Retourne le tokenizer japonais du processus, créé au premier appel.
+
+    Returns:
+        JapaneseTokenizer: Tokenizer partagé
+    """
+    global _japanese_tokenizer
+    if _japanese_tokenizer is None:
+        _japanese_tokenizer = JapaneseTokenizer()
+    return _japanese_tokenizer
@@ -0,0 +1,77 @@
+import os
+import logging
+import subprocess
+from typing import List, Tuple
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+logger = logging.getLogger(__name__)
+
+def split_frames(total_frames: int, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Découpe une vidéo en morceaux de frames consécutives de tailles équilibrées.
+
+    Args:
+        total_frames (int): Nombre total de frames
+        chunks (int): Nombre de morceaux souhaité
+
+    Returns:
+        List[Tuple[int, int]]: Intervalles [première frame, dernière frame exclue)
+    """
+    chunks = max(1, min(chunks, total_frames))
+    bounds = [total_frames * i // chunks for i in range(chunks + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def write_frames(clip, output_path: str, first_frame: int, last_frame: int, fps: float,
+                 preset: str = "ultrafast", threads: int = None):
+    """
+    Encode les frames [first_frame, last_frame) d'un clip dans un fichier vidéo sans audio.
+
+    Les frames sont prises aux mêmes instants (indice / fps) qu'un rendu en une seule
+    passe. Chaque morceau commence par une image clé et n'utilise que des GOP fermés,
+    pour pouvoir être concaténé par copie de flux.
+
+    Args:
+        clip: Clip vidéo moviepy
+        output_path (str): Chemin du morceau
+        first_frame (int): Première frame
+        last_frame (int): Frame de fin (exclue)
+        fps (float): Images par seconde
+        preset (str): Preset x264
+        threads (int): Nombre de threads de l'encodeur
+    """
+    with FFMPEG_VideoWriter(
+        output_path,
+        clip.size,
+        fps,
+        codec="libx264",
+        preset=preset,
+        threads=threads,
+        ffmpeg_params=["-flags", "+cgop"],
+        pixel_format="yuv420p",
+    ) as writer:
+        for frame_index in range(first_frame, last_frame):
+            writer.write_frame(clip.get_frame(frame_index / fps))
+
+def concat_chunks(chunk_paths: List[str], output_path: str, audio_path: str = None):
+    """
+    Assemble des morceaux vidéo par copie de flux (démultiplexeur concat de FFmpeg).
+
+    Args:
+        chunk_paths (List[str]): Morceaux, dans l'ordre
+        output_path (str): Chemin de la vidéo finale
+        audio_path (str): Piste audio à multiplexer avec la vidéo
+    """
+    list_path = output_path + ".concat.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for chunk_path in chunk_paths:
+            f.write(f"file '{os.path.abspath(chunk_path)}'\n")
+
+    cmd = [FFMPEG_BINARY, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+    if audio_path:
+        cmd += ["-i", audio_path, "-map", "0:v", "-map", "1:a"]
+    cmd += ["-c", "copy", "-movflags", "+faststart", output_path]
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finally:
+        os.remove(list_path)
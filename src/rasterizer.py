@@ -0,0 +1,152 @@
+from functools import lru_cache
+from typing import Sequence, Tuple
+import numpy as np
+
+# Nombre maximal de formes gardées en mémoire par primitive
+RASTER_CACHE_SIZE = 256
+
+def _as_color(color: Sequence) -> Tuple[int, ...]:
+    """Convertit une couleur (liste ou tuple) en tuple hashable pour la mémoïsation."""
+    return tuple(int(c) for c in color)
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Protège un tableau partagé par le cache contre les modifications en place."""
+    array.setflags(write=False)
+    return array
+
+@lru_cache(maxsize=RASTER_CACHE_SIZE)
+def _rounded_rect_mask(size: Tuple[int, int], radius: int) -> np.ndarray:
+    w, h = size
+    r = max(0, min(radius, w // 2, h // 2))
+    if r == 0:
+        return _read_only(np.ones((h, w), dtype=np.float64))
+
+    # Distance de chaque centre de pixel au rectangle intérieur (coins exclus)
+    x = np.arange(w, dtype=np.float64) + 0.5
+    y = np.arange(h, dtype=np.float64) + 0.5
+    dx = np.maximum(np.maximum(r - x, x - (w - r)), 0.0)
+    dy = np.maximum(np.maximum(r - y, y - (h - r)), 0.0)
+    distance = np.sqrt(dx[np.newaxis, :] ** 2 + dy[:, np.newaxis] ** 2)
+
+    # Couverture anti-aliasée sur un pixel de large autour de l'arc
+    mask = np.clip(r - distance + 0.5, 0.0, 1.0)
+    return _read_only(mask)
+
+def rounded_rect_mask(size: Tuple[int, int], radius: int) -> np.ndarray:
+    """
+    Crée le masque anti-aliasé d'un rectangle à coins arrondis.
+
+    Args:
+        size (tuple): Dimensions (largeur, hauteur)
+        radius (int): Rayon des coins arrondis
+
+    Returns:
+        np.ndarray: Masque (hauteur, largeur) en float entre 0 et 1, en lecture seule
+    """
+    return _rounded_rect_mask((int(size[0]), int(size[1])), int(radius))
+
+@lru_cache(maxsize=RASTER_CACHE_SIZE)
+def _solid_fill(size: Tuple[int, int], color: Tuple[int, ...]) -> np.ndarray:
+    w, h = size
+    fill = np.empty((h, w, len(color)), dtype=np.uint8)
+    fill[:, :] = color
+    return _read_only(fill)
+
+def solid_fill(size: Tuple[int, int], color: Sequence) -> np.ndarray:
+    """
+    Crée une image remplie d'une couleur unie.
+
+    Args:
+        size (tuple): Dimensions (largeur, hauteur)
+        color (Sequence): Couleur RGB ou RGBA
+
+    Returns:
+        np.ndarray: Image uint8 (hauteur, largeur, canaux), en lecture seule
+    """
+    return _solid_fill((int(size[0]), int(size[1])), _as_color(color))
+
+def rounded_background(size: Tuple[int, int], color: Sequence, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Crée un fond uni avec coins arrondis.
+
+    Args:
+        size (tuple): Dimensions (largeur, hauteur)
+        color (Sequence): Couleur de fond RGB
+        radius (int): Rayon des coins arrondis
+
+    Returns:
+        tuple: (fond RGB uint8, masque float entre 0 et 1)
+    """
+    return solid_fill(size, _as_color(color)[:3]), rounded_rect_mask(size, radius)
+
+@lru_cache(maxsize=RASTER_CACHE_SIZE)
+def _bordered_box(size: Tuple[int, int], fill_color: Tuple[int, ...], border_color: Tuple[int, ...],
+                  border_width: int) -> np.ndarray:
+    w, h = size
+    box = np.empty((h, w, 4), dtype=np.uint8)
+    box[:, :] = fill_color
+    if border_width > 0:
+        # Même emprise que ImageDraw.rectangle([(0, 0), (w, h)]) : le bord droit et
+        # le bord bas tombent en partie hors de l'image
+        inner = border_width - 1
+        box[:border_width, :] = border_color
+        box[:, :border_width] = border_color
+        if inner > 0:
+            box[h - inner:, :] = border_color
+            box[:, w - inner:] = border_color
+    return _read_only(box)
+
+def bordered_box(size: Tuple[int, int], fill_color: Sequence, border_color: Sequence,
+                 border_width: int = 4) -> np.ndarray:
+    """
+    Crée une boîte rectangulaire remplie avec une bordure, comme celles des questions et des choix.
+
+    Args:
+        size (tuple): Dimensions (largeur, hauteur)
+        fill_color (Sequence): Couleur de remplissage RGBA
+        border_color (Sequence): Couleur de la bordure RGBA
+        border_width (int): Épaisseur de la bordure
+
+    Returns:
+        np.ndarray: Image RGBA uint8 (hauteur, largeur, 4), en lecture seule
+    """
+    fill = _as_color(fill_color)
+    border = _as_color(border_color)
+    if len(fill) == 3:
+        fill += (255,)
+    if len(border) == 3:
+        border += (255,)
+    return _bordered_box((int(size[0]), int(size[1])), fill, border, int(border_width))
+
+def premultiply(rgba: np.ndarray) -> np.ndarray:
+    """
+    Convertit une image RGBA en alpha prémultiplié.
+
+    Args:
+        rgba (np.ndarray): Image RGBA uint8 en alpha direct
+
+    Returns:
+        np.ndarray: Image RGBA uint8 en alpha prémultiplié
+    """
+    alpha = rgba[:, :, 3:4].astype(np.uint16)
+    result = np.empty_like(rgba)
+    result[:, :, :3] = (rgba[:, :, :3].astype(np.uint16) * alpha + 127) // 255
+    result[:, :, 3] = rgba[:, :, 3]
+    return result
+
+def unpremultiply(rgba: np.ndarray) -> np.ndarray:
+    """
+    Convertit une image RGBA en alpha prémultiplié vers l'alpha direct.
+
+    Args:
+        rgba (np.ndarray): Image RGBA uint8 en alpha prémultiplié
+
+    Returns:
+        np.ndarray: Image RGBA uint8 en alpha direct
+    """
+    alpha = rgba[:, :, 3:4].astype(np.uint32)
+    safe_alpha = np.maximum(alpha, 1)
+    result = np.empty_like(rgba)
+    result[:, :, :3] = np.minimum((rgba[:, :, :3].astype(np.uint32) * 255 + safe_alpha // 2) // safe_alpha, 255)
+    result[:, :, 3] = rgba[:, :, 3]
+    return result
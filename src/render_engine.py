@@ -0,0 +1,166 @@
+import logging
+import subprocess
+import time
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional, Tuple
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+
+logger = logging.getLogger(__name__)
+
+# Délai entre deux vérifications de l'état des producteurs pendant une attente
+POLL_INTERVAL = 1.0
+
+def _produce(factory: Callable[[], Callable[[float], np.ndarray]], producer_index: int, producers: int,
+             total_frames: int, fps: float, shm_name: str, slots: int, frame_shape: Tuple[int, int, int],
+             condition, consumed, ready):
+    """
+    Boucle d'un processus producteur : calcule les frames producer_index, producer_index + producers, ...
+    et les dépose dans l'anneau de mémoire partagée.
+    """
+    shm = SharedMemory(name=shm_name)
+    ring = None
+    try:
+        ring = np.ndarray((slots,) + frame_shape, dtype=np.uint8, buffer=shm.buf)
+        frame_function = factory()
+        for frame_index in range(producer_index, total_frames, producers):
+            # La frame est calculée avant d'attendre une case libre
+            frame = frame_function(frame_index / fps)
+            slot = frame_index % slots
+            with condition:
+                # La case est libre quand la frame qui l'occupait a été encodée
+                condition.wait_for(lambda: consumed.value > frame_index - slots)
+            np.copyto(ring[slot], frame, casting="unsafe")
+            with condition:
+                ready[slot] = frame_index
+                condition.notify_all()
+    except Exception:
+        logger.exception(f"Erreur dans le producteur de frames {producer_index}")
+        raise
+    finally:
+        # La vue sur la mémoire partagée doit être libérée avant de la fermer
+        ring = None
+        shm.close()
+
+class RenderEngine:
+    def __init__(self, factory: Callable[[], Callable[[float], np.ndarray]], size: Tuple[int, int], fps: float,
+                 producers: int = 4, slots: Optional[int] = None):
+        """
+        Moteur de rendu : N processus producteurs calculent les frames en parallèle et les
+        déposent dans un anneau de mémoire partagée ; un consommateur unique les envoie
+        dans l'ordre, sans copie ni sérialisation, à l'entrée standard de FFmpeg.
+
+        La frame i occupe la case i % slots. Un producteur n'écrit dans une case qu'une
+        fois la frame précédente de cette case encodée, et le consommateur attend que la
+        case contienne exactement la frame i : l'ordre est garanti sans verrou par case.
+
+        Args:
+            factory (Callable): Objet sérialisable qui, appelé dans un producteur, retourne
+                la fonction t -> frame RGB uint8
+            size (tuple): Dimensions (largeur, hauteur) de la vidéo
+            fps (float): Images par seconde
+            producers (int): Nombre de processus producteurs
+            slots (Optional[int]): Nombre de cases de l'anneau (défaut: 2 par producteur)
+        """
+        self.factory = factory
+        self.width, self.height = size
+        self.fps = fps
+        self.producers = max(1, producers)
+        self.slots = slots or 2 * self.producers
+
+    def _encoder_command(self, output_path: str, audio_path: Optional[str], preset: str, threads: int) -> list:
+        cmd = [
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{self.width}x{self.height}", "-r", str(self.fps),
+            "-i", "-",
+        ]
+        if audio_path:
+            cmd += ["-i", audio_path, "-map", "0:v", "-map", "1:a", "-c:a", "copy"]
+        cmd += [
+            "-c:v", "libx264", "-preset", preset, "-threads", str(threads),
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart", output_path,
+        ]
+        return cmd
+
+    def render(self, output_path: str, duration: float, audio_path: Optional[str] = None,
+               preset: str = "ultrafast", threads: int = 16):
+        """
+        Rend la vidéo et l'encode avec libx264.
+
+        Args:
+            output_path (str): Chemin de la vidéo finale
+            duration (float): Durée de la vidéo
+            audio_path (Optional[str]): Piste audio (AAC) à multiplexer
+            preset (str): Preset x264
+            threads (int): Nombre de threads de l'encodeur
+        """
+        total_frames = int(duration * self.fps)
+        frame_shape = (self.height, self.width, 3)
+        frame_bytes = int(np.prod(frame_shape))
+        context = get_context("spawn")
+        condition = context.Condition()
+        consumed = context.Value("q", 0, lock=False)
+        ready = context.Array("q", [-1] * self.slots, lock=False)
+        shm = SharedMemory(create=True, size=self.slots * frame_bytes)
+        processes = []
+        encoder = None
+        try:
+            for producer_index in range(self.producers):
+                process = context.Process(
+                    target=_produce,
+                    args=(self.factory, producer_index, self.producers, total_frames, self.fps, shm.name,
+                          self.slots, frame_shape, condition, consumed, ready),
+                    daemon=True
+                )
+                process.start()
+                processes.append(process)
+
+            encoder = subprocess.Popen(self._encoder_command(output_path, audio_path, preset, threads),
+                                       stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            start_time = time.time()
+            completed = False
+            for frame_index in range(total_frames):
+                slot = frame_index % self.slots
+                with condition:
+                    while not condition.wait_for(lambda: ready[slot] == frame_index, timeout=POLL_INTERVAL):
+                        failed = [p for p in processes if p.exitcode not in (None, 0)]
+                        if failed:
+                            raise RuntimeError(f"Un producteur de frames s'est arrêté (code {failed[0].exitcode})")
+                # Écriture directe de la case partagée vers FFmpeg
+                try:
+                    encoder.stdin.write(shm.buf[slot * frame_bytes:(slot + 1) * frame_bytes])
+                except OSError:
+                    # FFmpeg s'est arrêté avant la fin (BrokenPipeError) : son erreur est remontée ci-dessous
+                    break
+                with condition:
+                    consumed.value = frame_index + 1
+                    condition.notify_all()
+
+                if frame_index % max(1, total_frames // 10) == 0:
+                    logger.info(f"Rendu: {frame_index}/{total_frames} frames")
+            else:
+                completed = True
+
+            try:
+                encoder.stdin.close()
+            except OSError:
+                pass
+            stderr = encoder.stderr.read()
+            encoder.wait()
+            if encoder.returncode != 0 or not completed:
+                raise RuntimeError(
+                    f"Échec de l'encodage FFmpeg (code {encoder.returncode}): {stderr.decode(errors='replace').strip()}"
+                )
+            elapsed = time.time() - start_time
+            logger.info(f"Rendu terminé: {total_frames} frames en {elapsed:.1f}s "
+                        f"({total_frames / max(elapsed, 1e-6):.1f} fps, {self.producers} producteurs)")
+        finally:
+            if encoder is not None and encoder.poll() is None:
+                encoder.kill()
+            for process in processes:
+                process.join(timeout=POLL_INTERVAL)
+                if process.is_alive():
+                    process.terminate()
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,213 @@
+import io
+import wave
+import logging
+import threading
+from math import gcd
+from functools import lru_cache
+from typing import Dict, Optional
+import numpy as np
+
+from src.audio_cache import decode_file
+
+logger = logging.getLogger(__name__)
+
+# Fréquence de décodage des voix reçues dans un format compressé (MP3, Opus)
+SPEECH_SAMPLE_RATE = 24000
+
+def read_wav(data: bytes) -> tuple:
+    """
+    Lit un WAV PCM 16 bits (réponse LINEAR16 de Text-to-Speech) sans sous-processus.
+
+    Args:
+        data (bytes): Contenu du fichier WAV
+
+    Returns:
+        tuple: PCM float32 mono entre -1 et 1, fréquence d'échantillonnage
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"WAV de {wav.getsampwidth() * 8} bits non pris en charge")
+        channels = wav.getnchannels()
+        sample_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    pcm = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    return pcm, sample_rate
+
+# Filtre de rééchantillonnage : passages par zéro du sinc de chaque côté, coupure relative
+# à la fréquence de Nyquist la plus basse et paramètre de la fenêtre de Kaiser
+RESAMPLE_ZERO_CROSSINGS = 16
+RESAMPLE_CUTOFF = 0.97
+RESAMPLE_KAISER_BETA = 9.0
+
+@lru_cache(maxsize=16)
+def _resample_filter(up: int, down: int) -> np.ndarray:
+    """Filtre passe-bas à sinc fenêtré, échantillonné à up fois la fréquence d'origine."""
+    factor = max(up, down)
+    half = RESAMPLE_ZERO_CROSSINGS * factor
+    cutoff = RESAMPLE_CUTOFF / factor
+    positions = np.arange(-half, half + 1, dtype=np.float64)
+    taps = cutoff * np.sinc(cutoff * positions) * np.kaiser(2 * half + 1, RESAMPLE_KAISER_BETA)
+    # Gain up : chaque échantillon d'origine est suivi de up - 1 zéros
+    taps = taps * up
+    taps.setflags(write=False)
+    return taps
+
+def resample(pcm: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Rééchantillonne un signal mono par filtre polyphase à sinc fenêtré (Kaiser), sans
+    dépendance ni sous-processus. Le signal est prolongé par symétrie à ses bords : le
+    début et la fin ne se mélangent pas, contrairement à un rééchantillonnage par
+    transformée de Fourier du signal entier.
+
+    Args:
+        pcm (np.ndarray): Signal mono float32
+        source_rate (int): Fréquence d'origine
+        target_rate (int): Fréquence cible
+
+    Returns:
+        np.ndarray: Signal mono float32 à la fréquence cible
+    """
+    if source_rate == target_rate or len(pcm) == 0:
+        return pcm
+    divisor = gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+    taps = _resample_filter(up, down)
+    center = len(taps) // 2
+    phases = -(-len(taps) // up)
+    target_length = int(round(len(pcm) * target_rate / source_rate))
+
+    # Position de chaque échantillon de sortie sur la grille suréchantillonnée : indice du
+    # dernier échantillon d'origine concerné et phase du filtre
+    positions = np.arange(target_length, dtype=np.int64) * down + center
+    last, phase = np.divmod(positions, up)
+    # Signal prolongé par symétrie aux deux bords (comme FFmpeg) : ni silence ni saut
+    padded = np.pad(np.pad(pcm.astype(np.float64), (phases, 0), mode="reflect"), (0, phases), mode="symmetric")
+    taps = np.concatenate([taps, np.zeros(phases * up - len(taps))])
+    output = np.zeros(target_length, dtype=np.float64)
+    for j in range(phases):
+        output += taps[phase + j * up] * padded[last - j + phases]
+    return output.astype(np.float32)
+
+class SpeechAudio:
+    def __init__(self, path: str, pcm: Optional[np.ndarray] = None, sample_rate: Optional[int] = None):
+        """
+        Voix synthétisée gardée en mémoire : PCM mono à sa fréquence d'origine et vues
+        rééchantillonnées (44,1 kHz pour le mixeur, 16 kHz pour l'alignement), calculées une fois.
+
+        Args:
+            path (str): Fichier audio correspondant (chargé à la demande si pcm est absent)
+            pcm (Optional[np.ndarray]): PCM float32 mono entre -1 et 1
+            sample_rate (Optional[int]): Fréquence d'échantillonnage du PCM
+        """
+        self.path = path
+        self._pcm = pcm
+        self._sample_rate = sample_rate
+        # Vues rééchantillonnées : fréquence -> PCM en lecture seule
+        self._views: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._pcm is not None:
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data[:4] == b"RIFF":
+            self._pcm, self._sample_rate = read_wav(data)
+        else:
+            self._pcm = decode_file(self.path, SPEECH_SAMPLE_RATE, 1)[:, 0]
+            self._sample_rate = SPEECH_SAMPLE_RATE
+
+    @property
+    def sample_rate(self) -> int:
+        with self._lock:
+            self._load()
+            return self._sample_rate
+
+    @property
+    def duration(self) -> float:
+        """Durée exacte, d'après le nombre d'échantillons."""
+        with self._lock:
+            self._load()
+            return len(self._pcm) / self._sample_rate
+
+    def view(self, sample_rate: int) -> np.ndarray:
+        """
+        Retourne le PCM mono à la fréquence demandée, rééchantillonné une seule fois.
+
+        Args:
+            sample_rate (int): Fréquence d'échantillonnage souhaitée
+
+        Returns:
+            np.ndarray: PCM float32 mono, en lecture seule
+        """
+        with self._lock:
+            view = self._views.get(sample_rate)
+            if view is None:
+                self._load()
+                view = resample(self._pcm, self._sample_rate, sample_rate)
+                view.setflags(write=False)
+                self._views[sample_rate] = view
+            return view
+
+class SpeechAudioStore:
+    def __init__(self):
+        """
+        Voix synthétisées de la vidéo en cours, par chemin de fichier : le TTS les dépose,
+        le mixeur et l'alignement WhisperX les lisent sans fichier temporaire ni FFmpeg.
+        """
+        self._entries: Dict[str, SpeechAudio] = {}
+        self._lock = threading.Lock()
+
+    def add(self, path: str, pcm: Optional[np.ndarray] = None, sample_rate: Optional[int] = None) -> SpeechAudio:
+        """
+        Enregistre une voix ; sans PCM, le fichier sera lu à la première utilisation.
+
+        Args:
+            path (str): Chemin du fichier audio de la voix
+            pcm (Optional[np.ndarray]): PCM float32 mono déjà décodé
+            sample_rate (Optional[int]): Fréquence d'échantillonnage du PCM
+
+        Returns:
+            SpeechAudio: Voix enregistrée
+        """
+        with self._lock:
+            speech = self._entries.get(path)
+            if speech is None or pcm is not None:
+                speech = SpeechAudio(path, pcm, sample_rate)
+                self._entries[path] = speech
+            return speech
+
+    def get(self, path: str) -> Optional[SpeechAudio]:
+        """
+        Recherche une voix par le chemin de son fichier.
+
+        Args:
+            path (str): Chemin du fichier audio
+
+        Returns:
+            Optional[SpeechAudio]: Voix en mémoire, ou None si ce n'est pas une voix synthétisée
+        """
+        with self._lock:
+            return self._entries.get(path)
+
+    def clear(self):
+        """Libère toutes les voix gardées en mémoire."""
+        with self._lock:
+            self._entries.clear()
+
+# Voix partagées par tout le processus
+_speech_store: Optional[SpeechAudioStore] = None
+
+def get_speech_store() -> SpeechAudioStore:
+    """
+    Retourne le registre des voix synthétisées du processus, créé au premier appel.
+
+    Returns:
+        SpeechAudioStore: Registre partagé
+    """
+    global _speech_store
+    if _speech_store is None:
+        _speech_store = SpeechAudioStore()
+    return _speech_store
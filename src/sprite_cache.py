@@ -0,0 +1,108 @@
+import logging
+from typing import Callable
+import numpy as np
+from moviepy import ImageClip
+
+from src import rasterizer
+from src.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le rendu ou le format des sprites change
+SPRITE_CACHE_VERSION = 2
+
+class SpriteCache:
+    def __init__(self, cache_dir: str = "assets/cache/sprites", max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialise le cache des sprites de sous-titres.
+
+        Les sprites sont stockés tels que rendus, en RGBA alpha direct (.npy), adressés par
+        le contenu (texte, police, taille, couleurs, contour, marges, rayon) : moviepy les
+        reçoit sans perte, le compositeur NumPy reçoit leur version prémultipliée, calculée
+        une fois par processus.
+
+        Args:
+            cache_dir (str): Répertoire du cache
+            max_bytes (int): Taille maximale du cache sur disque
+        """
+        self.disk_cache = DiskCache(cache_dir, max_bytes=max_bytes, suffix=".npy", name="sprites")
+        # Sprites déjà chargés dans ce processus (alpha direct, puis prémultiplié)
+        self._sprites = {}
+        self._premultiplied = {}
+        self.stats = self.disk_cache.stats
+        self.stats.setdefault("memory_hits", 0)
+
+    def _get(self, params: dict, render: Callable[[], np.ndarray]) -> tuple:
+        key = DiskCache.make_key(dict(params, version=SPRITE_CACHE_VERSION))
+        if key in self._sprites:
+            self.stats["memory_hits"] += 1
+            return key, self._sprites[key]
+
+        path = self.disk_cache.get(key)
+        sprite = None
+        if path is not None:
+            try:
+                sprite = np.load(path)
+            except Exception as e:
+                logger.warning(f"Sprite illisible dans le cache, nouveau rendu: {str(e)}")
+
+        if sprite is None:
+            sprite = np.ascontiguousarray(render(), dtype=np.uint8)
+            self.disk_cache.put(key, lambda temp_path: np.save(temp_path, sprite))
+
+        sprite.setflags(write=False)
+        self._sprites[key] = sprite
+        return key, sprite
+
+    def get_rgba(self, params: dict, render: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Récupère un sprite tel que rendu, en le rendant si nécessaire.
+
+        Args:
+            params (dict): Paramètres identifiant le sprite
+            render (Callable[[], np.ndarray]): Fonction de rendu retournant une image RGBA uint8 (alpha direct)
+
+        Returns:
+            np.ndarray: Sprite RGBA uint8 en alpha direct, en lecture seule
+        """
+        return self._get(params, render)[1]
+
+    def get_sprite(self, params: dict, render: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Récupère un sprite pour le compositeur NumPy, en le rendant si nécessaire.
+
+        Args:
+            params (dict): Paramètres identifiant le sprite
+            render (Callable[[], np.ndarray]): Fonction de rendu retournant une image RGBA uint8 (alpha direct)
+
+        Returns:
+            np.ndarray: Sprite RGBA uint8 en alpha prémultiplié
+        """
+        key, sprite = self._get(params, render)
+        if key not in self._premultiplied:
+            self._premultiplied[key] = rasterizer.premultiply(sprite)
+        return self._premultiplied[key]
+
+    def get_clip(self, params: dict, render: Callable[[], np.ndarray]) -> ImageClip:
+        """
+        Récupère un sprite sous forme de clip moviepy, avec les pixels exacts du rendu.
+
+        Args:
+            params (dict): Paramètres identifiant le sprite
+            render (Callable[[], np.ndarray]): Fonction de rendu retournant une image RGBA uint8 (alpha direct)
+
+        Returns:
+            ImageClip: Clip du sprite avec son masque
+        """
+        return ImageClip(self.get_rgba(params, render))
+
+    def reset_stats(self):
+        """Remet à zéro les statistiques (par exemple au début d'un lot de vidéos)."""
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def log_stats(self):
+        """Affiche les statistiques du cache, dont le nombre de rastérisations évitées."""
+        self.disk_cache.log_stats()
+        saved = self.stats["hits"] + self.stats["memory_hits"]
+        logger.info(f"Sprites de sous-titres: {saved} rastérisations évitées, {self.stats['writes']} sprites rendus")
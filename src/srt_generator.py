@@ -2,69 +2,33 @@
 import argparse
 import os
 import logging
-import whisperx
-import torch
 import sys
 import re
+import threading
 import unicodedata
 from pathlib import Path
 from moviepy import AudioFileClip, concatenate_audioclips
-from fugashi import Tagger
+from PIL import Image, ImageColor, ImageDraw
 
-logger = logging.getLogger(__name__)
+from src.font_registry import get_font_registry
+from src.japanese_tokenizer import get_japanese_tokenizer
+from src.speech_audio import get_speech_store
+from src.whisper_pool import get_whisper_pool
 
-# Initialiser le tagger Fugashi pour le japonais
-japanese_tagger = None
+logger = logging.getLogger(__name__)
 
 def get_japanese_tagger():
     """
-    Initialise le tagger japonais à la demande pour éviter de charger le modèle
+    Retourne le tagger japonais partagé, chargé à la demande pour éviter de charger le modèle
     si la langue japonaise n'est pas utilisée.
     """
-    global japanese_tagger
-    if japanese_tagger is None:
-        try:
-            # Vérifier d'abord si unidic est correctement installé
-            import unidic
-            dicdir = unidic.DICDIR
-            if not os.path.exists(dicdir):
-                logger.warning(f"Le dictionnaire unidic n'est pas trouvé à {dicdir}")
-                logger.info("Téléchargement du dictionnaire unidic...")
-                import subprocess
-                subprocess.run([sys.executable, "-m", "unidic", "download"], check=True)
-            
-            # Importer Fugashi après s'être assuré que unidic est correctement installé
-            from fugashi import Tagger
-            japanese_tagger = Tagger()
-            logger.info("Tagger japonais initialisé avec succès")
-        except Exception as e:
-            logger.error(f"Erreur lors de l'initialisation du tagger japonais: {str(e)}")
-            logger.info("Utilisation de la méthode alternative pour le découpage des mots japonais")
-            japanese_tagger = None
-    return japanese_tagger
+    return get_japanese_tokenizer().tagger
 
 def tokenize_japanese(text):
     """
-    Découpe un texte japonais en mots en utilisant Fugashi.
+    Découpe un texte japonais en mots avec le tokenizer partagé (résultats mémorisés).
     """
-    tagger = get_japanese_tagger()
-    if tagger is None:
-        # Méthode alternative si Fugashi n'est pas disponible
-        pattern = r'[\p{Han}\p{Hiragana}\p{Katakana}]+|[a-zA-Z0-9]+|[.,!?;]'
-        words = re.findall(pattern, text, re.UNICODE)
-        return [word for word in words if word.strip()]
-    
-    try:
-        tokens = []
-        for word in tagger(text):
-            tokens.append(word.surface)
-        return tokens
-    except Exception as e:
-        logger.error(f"Erreur lors de la tokenisation japonaise: {str(e)}")
-        # Fallback en cas d'erreur
-        pattern = r'[\p{Han}\p{Hiragana}\p{Katakana}]+|[a-zA-Z0-9]+|[.,!?;]'
-        words = re.findall(pattern, text, re.UNICODE)
-        return [word for word in words if word.strip()]
+    return get_japanese_tokenizer().words(text)
 
 class SRTGenerator:
     def __init__(self, config: dict):
@@ -75,6 +39,32 @@ class SRTGenerator:
         self.temp_dir = Path(config["path_assets"]["temp"])
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
+    def prewarm(self, background: bool = True):
+        """
+        Précharge les modèles WhisperX de la configuration (subtitles.model_size et langue)
+        dans le pool du processus.
+        
+        Args:
+            background (bool): Charger dans un thread, pendant la génération des questions
+                et la synthèse vocale ; la première transcription attend la fin du chargement
+            
+        Returns:
+            threading.Thread: Thread du préchargement, ou None s'il est synchrone
+        """
+        args = (
+            self.config["subtitles"].get("model_size", "medium"),
+            "cpu",
+            "int8",
+            self.config["subtitles"].get("language", "fr"),
+        )
+        pool = get_whisper_pool()
+        if not background:
+            pool.prewarm(*args)
+            return None
+        thread = threading.Thread(target=pool.prewarm, args=args, name="whisperx-prewarm", daemon=True)
+        thread.start()
+        return thread
+        
     def generate_srt(self, audio_infos: list) -> str:
         """
         Génère un fichier SRT à partir des informations audio, avec un sous-titre par mot.
@@ -132,6 +122,18 @@ class SRTGenerator:
                             info['start_time'] = expected_start
                             info['end_time'] += offset
                 
+                # Timing exact des mots fourni par le TTS (repères SSML)
+                if word_by_word and info.get('words'):
+                    for word in info['words']:
+                        all_words.append({
+                            'text': word['text'],
+                            'start_time': info['start_time'] + word['start'],
+                            'end_time': info['start_time'] + word['end'],
+                            'is_question': info.get('is_question', False),
+                            'is_answer': info.get('is_answer', False)
+                        })
+                    continue
+
                 # Diviser le texte en mots
                 if word_by_word:
                     language = self.config["subtitles"].get("language", "fr")
@@ -222,30 +224,34 @@ class SRTGenerator:
                         logger.warning(f"Fichier audio {audio_path} non trouvé, ignoré")
                         continue
                     
-                    # Paramètres de configuration
-                    model_size = self.config["subtitles"].get("model_size", "medium")
-                    language = self.config["subtitles"].get("language", "fr")
-                    device = "cpu"  # Utiliser CPU par défaut pour plus de compatibilité
-                    
-                    # Générer un fichier SRT temporaire pour ce segment
-                    temp_srt = str(self.temp_dir / f"temp_subtitles_{i}.srt")
-                    
-                    # Transcription du segment
-                    logger.info(f"Transcription du segment {i+1}/{len(audio_infos)}...")
-                    transcribe_with_timestamps(
-                        audio_file=audio_path,
-                        output_file=temp_srt,
-                        model_size=model_size,
-                        language=language,
-                        device=device
-                    )
-                    
-                    # Charger les sous-titres générés
-                    with open(temp_srt, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Extraire les segments et ajuster les timings
-                    segments = self._parse_srt_file(content)
+                    if info.get('words'):
+                        # Timing des mots fourni par le TTS (repères SSML) : pas de transcription
+                        segments = self._segments_from_words(info['words'])
+                    else:
+                        # Paramètres de configuration
+                        model_size = self.config["subtitles"].get("model_size", "medium")
+                        language = self.config["subtitles"].get("language", "fr")
+                        device = "cpu"  # Utiliser CPU par défaut pour plus de compatibilité
+                        
+                        # Générer un fichier SRT temporaire pour ce segment
+                        temp_srt = str(self.temp_dir / f"temp_subtitles_{i}.srt")
+                        
+                        # Transcription du segment
+                        logger.info(f"Transcription du segment {i+1}/{len(audio_infos)}...")
+                        transcribe_with_timestamps(
+                            audio_file=audio_path,
+                            output_file=temp_srt,
+                            model_size=model_size,
+                            language=language,
+                            device=device
+                        )
+                        
+                        # Charger les sous-titres générés
+                        with open(temp_srt, 'r', encoding='utf-8') as f:
+                            content = f.read()
+                        
+                        # Extraire les segments et ajuster les timings
+                        segments = self._parse_srt_file(content)
                     
                     # Ajouter les métadonnées du segment
                     for segment in segments:
@@ -279,6 +285,7 @@ class SRTGenerator:
                         srt_file.write(f"{segment['text']}\n\n")
                 
                 logger.info(f"Fichier SRT créé avec {len(all_segments)} segments: {srt_path}")
+                get_whisper_pool().log_stats()
             
             # Sinon, utiliser l'approche par défaut (répartition uniforme)
             else:
@@ -291,6 +298,18 @@ class SRTGenerator:
             logger.error(f"Erreur lors de la transcription: {str(e)}")
             raise
     
+    def _segments_from_words(self, words: list) -> list:
+        """
+        Convertit le timing des mots fourni par le TTS en segments de sous-titres.
+        
+        Args:
+            words (list): Mots [{'text', 'start', 'end'}], relatifs au début de l'audio
+            
+        Returns:
+            list: Liste des segments [{start, end, text}]
+        """
+        return [{'start': word['start'], 'end': word['end'], 'text': word['text']} for word in words]
+    
     def _combine_audio_files(self, audio_infos: list) -> str:
         """
         Combine plusieurs fichiers audio en un seul fichier temporaire.
@@ -459,20 +478,24 @@ class SRTGenerator:
                 global_offset += current_step["duration"]
                 continue
             
-            temp_srt = str(self.temp_dir / f"temp_subtitles_{i}.srt")
-            logger.info(f"Transcription du segment {i+1}/{len(steps)}...")
-            transcribe_with_timestamps(
-                audio_file=current_step["audio_path"],
-                output_file=temp_srt,
-                model_size=model_size,
-                language=language,
-                device=device
-            )
-            
-            # Charger les sous-titres générés
-            with open(temp_srt, 'r', encoding='utf-8') as f:
-                srt_content = f.read()
-            srt_object_list = self._parse_srt_file(srt_content)
+            if current_step.get("words"):
+                # Timing des mots fourni par le TTS (repères SSML) : pas de transcription
+                srt_object_list = self._segments_from_words(current_step["words"])
+            else:
+                temp_srt = str(self.temp_dir / f"temp_subtitles_{i}.srt")
+                logger.info(f"Transcription du segment {i+1}/{len(steps)}...")
+                transcribe_with_timestamps(
+                    audio_file=current_step["audio_path"],
+                    output_file=temp_srt,
+                    model_size=model_size,
+                    language=language,
+                    device=device
+                )
+                
+                # Charger les sous-titres générés
+                with open(temp_srt, 'r', encoding='utf-8') as f:
+                    srt_content = f.read()
+                srt_object_list = self._parse_srt_file(srt_content)
             for srt_object in srt_object_list:
                 srt_object["start"] += global_offset
                 srt_object["end"] += global_offset
@@ -491,15 +514,174 @@ class SRTGenerator:
                 # Écrire le texte
                 srt_file.write(f"{all_srt_object['text']}\n\n")
         logger.info(f"Fichier SRT créé avec {len(all_srt_object_list)} sous-titre: {srt_path}")
+        get_whisper_pool().log_stats()
             
         return srt_path
 
+    def generate_ass(self, srt_path: str, video_size: tuple, y: float, ass_path: str = None) -> str:
+        """
+        Convertit un fichier SRT en sous-titres ASS au style des sous-titres mot par mot
+        (bloc "subtitles" de la configuration), pour être incrustés par le filtre ass de FFmpeg.
+        
+        Chaque sous-titre donne deux événements : le fond (rectangle arrondi dessiné aux
+        dimensions du sprite équivalent) et, au-dessus, le texte avec son contour. Les deux
+        sont centrés horizontalement, le haut du fond à la position y.
+        
+        Args:
+            srt_path (str): Chemin du fichier SRT
+            video_size (tuple): Dimensions (largeur, hauteur) de la vidéo
+            y (float): Position verticale du haut des sous-titres
+            ass_path (str, optional): Chemin du fichier ASS (défaut: à côté du SRT)
+            
+        Returns:
+            str: Chemin du fichier ASS
+        """
+        width, height = video_size
+        subtitles_config = self.config["subtitles"]
+        font_path = self.config["video"]["font"]
+        font_size = subtitles_config.get("font_size", 70)
+        bg_color = subtitles_config.get("background_color", [220, 20, 20])
+        text_color = subtitles_config.get("text_color", "#ffffff")
+        stroke_color = subtitles_config.get("stroke_color", "#000000")
+        stroke_width = subtitles_config.get("stroke_width", 1)
+        corner_radius = subtitles_config.get("corner_radius", 15)
+        padding_x = subtitles_config.get("padding_x", 20)
+        padding_y = subtitles_config.get("padding_y", 10)
+        
+        if ass_path is None:
+            ass_path = str(Path(srt_path).with_suffix(".ass"))
+        
+        with open(srt_path, "r", encoding="utf-8") as f:
+            segments = self._parse_srt_file(f.read())
+        
+        fonts = get_font_registry()
+        def get_font(size):
+            return fonts.get(font_path, size)
+        
+        def ass_font_size(size):
+            # libass exprime la taille en hauteur de ligne (ascendante + descendante), PIL en em
+            ascent, descent = get_font(size).getmetrics()
+            return ascent + descent
+        
+        style_format = (
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+            "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+            "Alignment, MarginL, MarginR, MarginV, Encoding"
+        )
+        font_name = get_font(font_size).getname()[0]
+        background_style = (
+            f"Style: Fond,{font_name},{ass_font_size(font_size)},{_ass_color(bg_color)},{_ass_color(bg_color)},"
+            f"&HFF000000,&HFF000000,0,0,0,0,100,100,0,0,1,0,0,7,0,0,0,1"
+        )
+        text_style = (
+            f"Style: Texte,{font_name},{ass_font_size(font_size)},{_ass_color(text_color)},{_ass_color(text_color)},"
+            f"{_ass_color(stroke_color)},&HFF000000,0,0,0,0,100,100,0,0,1,{stroke_width},0,5,0,0,0,1"
+        )
+        
+        measure = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        events = []
+        for segment in segments:
+            text = segment["text"].strip().replace("{", "(").replace("}", ")")
+            if not text:
+                continue
+            # Même agrandissement des mots courts que les sprites de sous-titres
+            size = int(font_size * 1.3) if len(text) <= 3 else font_size
+            
+            # Dimensions du fond calculées comme celles du TextClip du sprite
+            left, top, right, bottom = measure.multiline_textbbox(
+                (0, 0), text, font=get_font(size), stroke_width=stroke_width, anchor="lm"
+            )
+            box_width = int(right - left) + 2 * padding_x
+            box_height = int(bottom - top) + 2 * padding_y
+            box_x = int((width - box_width) / 2)
+            box_y = int(y)
+            
+            start = _ass_time(segment["start"])
+            end = _ass_time(segment["end"])
+            box = _ass_rounded_rect(box_width, box_height, corner_radius)
+            events.append(f"Dialogue: 0,{start},{end},Fond,,0,0,0,,{{\\pos({box_x},{box_y})\\p1}}{box}{{\\p0}}")
+            # Le milieu de la ligne (ancrage "lm" de PIL, \an5 de libass) au centre du fond
+            center_x = box_x + box_width / 2
+            center_y = box_y + box_height / 2
+            events.append(
+                f"Dialogue: 1,{start},{end},Texte,,0,0,0,,{{\\pos({center_x:.1f},{center_y:.1f})\\fs{ass_font_size(size)}}}{text}"
+            )
+        
+        with open(ass_path, "w", encoding="utf-8") as ass_file:
+            ass_file.write("[Script Info]\n")
+            ass_file.write("ScriptType: v4.00+\n")
+            ass_file.write(f"PlayResX: {width}\n")
+            ass_file.write(f"PlayResY: {height}\n")
+            ass_file.write("WrapStyle: 2\n")
+            ass_file.write("ScaledBorderAndShadow: yes\n\n")
+            ass_file.write("[V4+ Styles]\n")
+            ass_file.write(f"{style_format}\n{background_style}\n{text_style}\n\n")
+            ass_file.write("[Events]\n")
+            ass_file.write("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+            ass_file.write("\n".join(events) + "\n")
+        
+        logger.info(f"Fichier ASS créé avec {len(events) // 2} sous-titres: {ass_path}")
+        return ass_path
+
+
+def _ass_color(color, alpha: int = 0) -> str:
+    """
+    Convertit une couleur (nom, "#rrggbb" ou [r, g, b]) au format ASS &HAABBGGRR.
+    """
+    if isinstance(color, str):
+        r, g, b = ImageColor.getrgb(color)[:3]
+    else:
+        r, g, b = color[:3]
+    return f"&H{alpha:02X}{b:02X}{g:02X}{r:02X}"
+
+def _ass_rounded_rect(width: int, height: int, radius: int) -> str:
+    """
+    Décrit un rectangle aux coins arrondis en commandes de dessin ASS (\\p1).
+    """
+    r = max(0, min(radius, width // 2, height // 2))
+    # Approximation d'un quart de cercle par une courbe de Bézier
+    k = round(r * 0.4477)
+    w, h = width, height
+    return (
+        f"m {r} 0 l {w - r} 0 b {w - k} 0 {w} {k} {w} {r} "
+        f"l {w} {h - r} b {w} {h - k} {w - k} {h} {w - r} {h} "
+        f"l {r} {h} b {k} {h} 0 {h - k} 0 {h - r} "
+        f"l 0 {r} b 0 {k} {k} 0 {r} 0"
+    )
+
+def _ass_time(seconds: float) -> str:
+    """
+    Convertit les secondes en format ASS: H:MM:SS.cc
+    """
+    centiseconds = int(round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    return f"{hours:d}:{minutes:02d}:{centiseconds // 100:02d}.{centiseconds % 100:02d}"
+
+# Fréquence d'échantillonnage attendue par WhisperX
+WHISPER_SAMPLE_RATE = 16000
+
+def load_speech_audio(audio_file):
+    """
+    Charge un audio en 16 kHz mono pour WhisperX : la vue 16 kHz de la voix en mémoire si
+    elle vient du TTS, sinon décodage du fichier par whisperx.load_audio (FFmpeg).
+    """
+    speech = get_speech_store().get(audio_file)
+    if speech is not None:
+        # Copie modifiable : la vue partagée est en lecture seule
+        return speech.view(WHISPER_SAMPLE_RATE).copy()
+    import whisperx
+    return whisperx.load_audio(audio_file)
 
 def transcribe_with_timestamps(audio_file, output_file, model_size="medium", language="fr", device="cpu"):
     """
     Transcrit un fichier audio et génère un fichier SRT avec un timing pour chaque mot
-    en utilisant WhisperX.
+    en utilisant WhisperX. Les modèles viennent du pool du processus : ils ne sont chargés
+    qu'une fois pour tous les segments.
     """
+    # Chargé seulement quand une transcription est nécessaire (inutile avec tts.timepoints)
+    import torch
+    
     # Vérifier que le fichier existe
     if not os.path.exists(audio_file):
         print(f"Le fichier {audio_file} n'existe pas.")
@@ -512,19 +694,12 @@ def transcribe_with_timestamps(audio_file, output_file, model_size="medium", lan
     # Déterminer le compute_type en fonction du device
     compute_type = "float16" if device == "cuda" else "int8"
     
-    print(f"Chargement du modèle (device: {device}, compute_type: {compute_type})...")
+    pool = get_whisper_pool()
     try:
-        # Charger le modèle Whisper et transcrire l'audio
-        model = whisperx.load_model(model_size, device=device, compute_type=compute_type)
+        # Transcription et alignement au niveau des mots
         print(f"Transcription en cours avec le modèle {model_size} sur {device}...")
-        
-        audio = whisperx.load_audio(audio_file)
-        result = model.transcribe(audio, language=language)
-        
-        # Alignement au niveau des mots
-        print("Alignement des mots...")
-        model_a, metadata = whisperx.load_align_model(language_code=language, device=device)
-        aligned = whisperx.align(result["segments"], model_a, metadata, audio, device=device)
+        audio = load_speech_audio(audio_file)
+        result, aligned = pool.transcribe(audio, model_size, device, compute_type, language)
         
         # Générer le fichier SRT
         print("Génération du fichier SRT...")
@@ -543,17 +718,12 @@ def transcribe_with_timestamps(audio_file, output_file, model_size="medium", lan
         if "float16 compute type" in str(e):
             print("Erreur de type de calcul détectée: le CPU ne supporte pas float16.")
             print("Réessai avec compute_type=int8...")
-            model = whisperx.load_model(model_size, device=device, compute_type="int8")
-            audio = whisperx.load_audio(audio_file)
-            result = model.transcribe(audio, language=language)
-            
-            print("Alignement des mots...")
-            model_a, metadata = whisperx.load_align_model(language_code=language, device=device)
-            aligned = whisperx.align(result["segments"], model_a, metadata, audio, device=device)
+            audio = load_speech_audio(audio_file)
+            result, aligned = pool.transcribe(audio, model_size, device, "int8", language)
             
             print("Génération du fichier SRT...")
             if language == "ja":
-                generate_japanese_srt_from_words(aligned["word_segments"], output_file)
+                generate_japanese_srt_from_words(aligned["word_segments"], output_file, result['segments'][0]['text'])
             else:
                 generate_srt_from_words(aligned["word_segments"], output_file)
             
@@ -0,0 +1,254 @@
+import re
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+from PIL import Image, ImageDraw
+
+from src.font_registry import FontRegistry, get_font_registry
+
+logger = logging.getLogger(__name__)
+
+# Kinsoku : caractères interdits en début de ligne (ponctuation fermante, petits kana, prolongation)
+NO_LINE_START = frozenset(
+    "、。，．,.・：；:;？！?!‼⁇⁈⁉ー…‥〜～」』）)］]｝}〕〉》】〙〗〟’”"
+    "ゝゞ々〻ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ"
+)
+# Kinsoku : caractères interdits en fin de ligne (ponctuation ouvrante)
+NO_LINE_END = frozenset("「『（(［[｛{〔〈《【〘〖〝‘“")
+
+# Français : espace insécable avant la ponctuation double et après le guillemet ouvrant
+FRENCH_NO_BREAK_BEFORE = frozenset("?!:;»%")
+FRENCH_NO_BREAK_AFTER = frozenset("«")
+
+class TextLayout:
+    def __init__(self, lines: List[str], size: Tuple[int, int], font_path: str, font_size: int,
+                 stroke_width: int, spacing: int):
+        """
+        Texte mis en page : lignes définitives et dimensions, sans aucun pixel rendu.
+
+        Args:
+            lines (List[str]): Lignes après coupure
+            size (tuple): Dimensions (largeur, hauteur) du bloc de texte, comme TextClip
+                en mode label sur le texte coupé
+            font_path (str): Police utilisée pour la mise en page
+            font_size (int): Taille de la police
+            stroke_width (int): Épaisseur du contour
+            spacing (int): Interligne en pixels
+        """
+        self.lines = lines
+        self.size = size
+        self.font_path = font_path
+        self.font_size = font_size
+        self.stroke_width = stroke_width
+        self.spacing = spacing
+
+    @property
+    def text(self) -> str:
+        """Texte avec ses retours à la ligne, prêt à être rastérisé."""
+        return "\n".join(self.lines)
+
+class TextLayoutEngine:
+    def __init__(self, fonts: Optional[FontRegistry] = None):
+        """
+        Moteur de mise en page du texte.
+
+        Les métriques de chaque glyphe (avance, approches gauche et droite) et le crénage
+        de chaque paire sont mesurés une fois par police et par taille, puis les coupures
+        de ligne sont calculées en une passe par simple addition : mots entiers pour le
+        français, unités du tokenizer (ou caractères) avec les règles kinsoku pour le japonais.
+
+        Args:
+            fonts (Optional[FontRegistry]): Registre des polices (défaut: celui du processus)
+        """
+        self.fonts = fonts or get_font_registry()
+        # Métriques : (police, taille) -> caractère -> (avance, gauche, droite)
+        self._glyphs: Dict[Tuple[str, int], Dict[str, Tuple[float, float, float]]] = {}
+        # Crénage : (police, taille) -> (caractère, caractère) -> ajustement
+        self._kerning: Dict[Tuple[str, int], Dict[Tuple[str, str], float]] = {}
+        # Surface de mesure partagée (aucun rendu)
+        self._draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        self.stats = {"glyph_hits": 0, "glyph_misses": 0, "layouts": 0}
+
+    def _glyph(self, key: Tuple[str, int], char: str) -> Tuple[float, float, float]:
+        glyphs = self._glyphs.setdefault(key, {})
+        metrics = glyphs.get(char)
+        if metrics is not None:
+            self.stats["glyph_hits"] += 1
+            return metrics
+        face = self.fonts.get(*key)
+        advance = face.getlength(char)
+        left, _, right, _ = face.getbbox(char)
+        if right <= left:
+            # Glyphe sans encre (espace) : l'avance sert d'étendue
+            left, right = 0, advance
+        metrics = (advance, left, right)
+        glyphs[char] = metrics
+        self.stats["glyph_misses"] += 1
+        return metrics
+
+    def _kern(self, key: Tuple[str, int], first: str, second: str) -> float:
+        kerning = self._kerning.setdefault(key, {})
+        pair = (first, second)
+        if pair not in kerning:
+            face = self.fonts.get(*key)
+            kerning[pair] = face.getlength(first + second) - self._glyph(key, first)[0] - self._glyph(key, second)[0]
+        return kerning[pair]
+
+    def _extend(self, key: Tuple[str, int], line: Optional[Tuple[float, float, str]], text: str):
+        """
+        Ajoute un texte à une ligne mesurée (avance, approche gauche du premier glyphe, dernier caractère).
+        """
+        advance, first_left, last = line if line else (0.0, None, None)
+        for char in text:
+            char_advance, char_left, _ = self._glyph(key, char)
+            if last is None:
+                first_left = char_left
+            else:
+                advance += self._kern(key, last, char)
+            advance += char_advance
+            last = char
+        return advance, first_left, last
+
+    def _ink_width(self, key: Tuple[str, int], line: Tuple[float, float, str], stroke_width: int) -> float:
+        advance, first_left, last = line
+        if last is None:
+            return 0
+        last_advance, _, last_right = self._glyph(key, last)
+        return advance - last_advance + last_right - first_left + 2 * stroke_width
+
+    def measure(self, text: str, font_path: str, font_size: int, stroke_width: int = 0) -> float:
+        """
+        Mesure la largeur d'encre d'une ligne à partir des métriques en cache.
+
+        Args:
+            text (str): Ligne de texte
+            font_path (str): Chemin de la police
+            font_size (int): Taille de la police
+            stroke_width (int): Épaisseur du contour
+
+        Returns:
+            float: Largeur en pixels
+        """
+        key = (font_path, int(font_size))
+        return self._ink_width(key, self._extend(key, None, text), stroke_width)
+
+    @staticmethod
+    def _units(paragraph: str, language: str, tokens: Optional[List[str]]) -> List[Tuple[str, str]]:
+        """
+        Découpe un paragraphe en unités insécables précédées de leur séparateur.
+        """
+        if language == "ja":
+            pieces = tokens if tokens is not None else list(paragraph)
+            units = []
+            for piece in pieces:
+                separator = piece[:len(piece) - len(piece.lstrip())]
+                if piece.strip():
+                    units.append((separator, piece.strip()))
+            merged = []
+            for separator, unit in units:
+                if merged and not separator and (unit[0] in NO_LINE_START or merged[-1][1][-1] in NO_LINE_END):
+                    merged[-1] = (merged[-1][0], merged[-1][1] + unit)
+                else:
+                    merged.append((separator, unit))
+            return merged
+
+        merged = []
+        for separator, word in re.findall(r"(\s*)(\S+)", paragraph):
+            if merged and (word[0] in FRENCH_NO_BREAK_BEFORE or merged[-1][1][-1] in FRENCH_NO_BREAK_AFTER):
+                merged[-1] = (merged[-1][0], merged[-1][1] + separator + word)
+            else:
+                merged.append((separator, word))
+        return merged
+
+    def _split_unit(self, key: Tuple[str, int], unit: str, max_width: float, stroke_width: int) -> List[str]:
+        """Coupe entre les caractères une unité plus large qu'une ligne, en respectant le kinsoku."""
+        pieces = []
+        current = ""
+        line = None
+        for char in unit:
+            candidate = self._extend(key, line, char)
+            if current and self._ink_width(key, candidate, stroke_width) > max_width and char not in NO_LINE_START:
+                carried = ""
+                if current[-1] in NO_LINE_END and len(current) > 1:
+                    # La ponctuation ouvrante suit le caractère sur la ligne suivante
+                    current, carried = current[:-1], current[-1]
+                pieces.append(current)
+                current = carried + char
+                line = self._extend(key, None, current)
+            else:
+                current += char
+                line = candidate
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def layout(self, text: str, font_path: str, font_size: int, max_width: Optional[float] = None,
+               language: str = "fr", stroke_width: int = 0, spacing: int = 4,
+               tokenize: Optional[Callable[[str], List[str]]] = None) -> TextLayout:
+        """
+        Coupe un texte en lignes d'au plus max_width pixels et mesure le bloc obtenu.
+
+        Les retours à la ligne du texte sont conservés. En français, une ligne ne se coupe
+        qu'entre deux mots, jamais avant ? ! : ; » ni après « ; en japonais, entre deux
+        unités du tokenizer (ou deux caractères) sans commencer une ligne par une ponctuation
+        fermante ni la finir par une ponctuation ouvrante. Une unité plus large qu'une ligne
+        est coupée entre ses caractères en japonais, laissée entière en français.
+
+        Les coupures françaises diffèrent volontairement de celles de TextClip en mode
+        caption, qui coupe sur chaque espace et peut laisser un « ? » seul en début de
+        ligne : ici, le dernier mot part avec sa ponctuation sur la ligne suivante.
+
+        Args:
+            text (str): Texte à mettre en page
+            font_path (str): Chemin de la police
+            font_size (int): Taille de la police
+            max_width (Optional[float]): Largeur maximale d'une ligne (None: pas de coupure)
+            language (str): Langue du texte ("fr", "ja"...)
+            stroke_width (int): Épaisseur du contour
+            spacing (int): Interligne en pixels (interline de TextClip)
+            tokenize (Optional[Callable]): Découpage d'un paragraphe japonais en mots, espaces
+                de tête compris (défaut: caractère par caractère)
+
+        Returns:
+            TextLayout: Lignes et dimensions du bloc de texte
+        """
+        key = (font_path, int(font_size))
+        lines = []
+        for paragraph in text.split("\n"):
+            tokens = tokenize(paragraph) if tokenize is not None and language == "ja" else None
+            current = ""
+            line = None
+            for separator, unit in self._units(paragraph, language, tokens):
+                if not current:
+                    candidate = self._extend(key, None, unit)
+                else:
+                    candidate = self._extend(key, line, separator + unit)
+                if max_width is None or self._ink_width(key, candidate, stroke_width) <= max_width:
+                    current = current + separator + unit if current else unit
+                    line = candidate
+                    continue
+
+                if current:
+                    lines.append(current)
+                pieces = [unit]
+                if language == "ja" and self.measure(unit, font_path, font_size, stroke_width) > max_width:
+                    pieces = self._split_unit(key, unit, max_width, stroke_width)
+                lines.extend(pieces[:-1])
+                current = pieces[-1]
+                line = self._extend(key, None, current)
+            lines.append(current)
+
+        # Mesure finale du bloc, identique à celle de TextClip
+        left, top, right, bottom = self._draw.multiline_textbbox(
+            (0, 0), "\n".join(lines), font=self.fonts.get(*key), spacing=spacing,
+            stroke_width=stroke_width, anchor="lm"
+        )
+        self.stats["layouts"] += 1
+        return TextLayout(lines, (int(right - left), int(bottom - top)), font_path, int(font_size),
+                          stroke_width, spacing)
+
+    def log_stats(self):
+        """Affiche les statistiques du cache des métriques dans les logs."""
+        logger.info(
+            f"Mise en page: {self.stats['layouts']} textes, {self.stats['glyph_misses']} glyphes mesurés, "
+            f"{self.stats['glyph_hits']} réutilisations"
+        )
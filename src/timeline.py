@@ -0,0 +1,64 @@
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Optional, Tuple
+from moviepy import CompositeVideoClip
+
+class Timeline:
+    def __init__(self, intervals: Iterable[Tuple[float, Optional[float], Any]]):
+        """
+        Index d'intervalles répondant à « quels éléments sont actifs à t » en O(log n + k).
+
+        Les débuts et fins des intervalles découpent la vidéo en segments élémentaires ;
+        la liste des éléments actifs est précalculée pour chaque segment. Les éléments
+        sont toujours retournés dans leur ordre d'insertion (ordre d'empilement).
+
+        Args:
+            intervals (Iterable[Tuple[float, Optional[float], Any]]): Triplets (début, fin exclue, élément),
+                une fin à None signifiant un élément actif jusqu'à la fin de la vidéo
+        """
+        self.intervals = [(start, math.inf if end is None else end, item) for start, end, item in intervals]
+        self.boundaries = sorted({start for start, _, _ in self.intervals} |
+                                 {end for _, end, _ in self.intervals if end != math.inf})
+        # Indices des intervalles actifs sur [boundaries[i], boundaries[i + 1])
+        self._segments: List[List[int]] = [[] for _ in self.boundaries]
+        for index, (start, end, _) in enumerate(self.intervals):
+            first = bisect_left(self.boundaries, start)
+            last = bisect_left(self.boundaries, end)
+            for segment in range(first, last):
+                self._segments[segment].append(index)
+
+    @classmethod
+    def from_clips(cls, clips: List) -> "Timeline":
+        """Construit la timeline de clips moviepy à partir de leurs attributs start et end."""
+        return cls((clip.start, clip.end, clip) for clip in clips)
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def _segment_index(self, t: float) -> int:
+        return bisect_right(self.boundaries, t) - 1
+
+    def at(self, t: float) -> List[Any]:
+        """
+        Retourne les éléments actifs à l'instant t.
+
+        Args:
+            t (float): Instant en secondes
+
+        Returns:
+            List[Any]: Éléments dont l'intervalle contient t, dans l'ordre d'insertion
+        """
+        segment = self._segment_index(t)
+        if segment < 0:
+            return []
+        return [self.intervals[index][2] for index in self._segments[segment]]
+
+class TimelineCompositeVideoClip(CompositeVideoClip):
+    """CompositeVideoClip dont les clips visibles à chaque frame sont trouvés via une Timeline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeline = Timeline.from_clips(self.clips)
+
+    def playing_clips(self, t=0):
+        return [clip for clip in self.timeline.at(t) if clip.is_playing(t)]
@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Tuple
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from moviepy import VideoClip
+
+from src.font_registry import get_font_registry
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le rendu du timer change, pour invalider les anciens fichiers
+TIMER_CACHE_VERSION = 1
+
+class TimerCache:
+    def __init__(self, cache_dir: str = "assets/cache/timers"):
+        """
+        Initialise le cache des animations du timer circulaire.
+
+        Les frames d'un timer sont rendues une seule fois, stockées dans un tableau
+        RGBA contigu (frames, hauteur, largeur, 4) sauvegardé en .npy, puis relues
+        en memmap lors des exécutions suivantes.
+
+        Args:
+            cache_dir (str): Répertoire de stockage des fichiers .npy
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Tableaux déjà chargés dans ce processus
+        self._frames = {}
+
+    def _cache_key(self, params: dict) -> str:
+        """
+        Calcule la clé du cache à partir des paramètres du timer.
+
+        Args:
+            params (dict): Paramètres de rendu du timer
+
+        Returns:
+            str: Empreinte hexadécimale des paramètres
+        """
+        payload = json.dumps(dict(params, version=TIMER_CACHE_VERSION), sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get_frames(self, duration: float, fps: int, radius: int, thickness: int,
+                   circle_color: Tuple, circle_bg_color: Tuple, text_color: Tuple,
+                   font: str, font_size: int = 80, stroke_width: int = 0,
+                   stroke_fill: str = None) -> np.ndarray:
+        """
+        Récupère les frames du timer, en les rendant si elles ne sont pas en cache.
+
+        Args:
+            duration (float): Durée du timer en secondes
+            fps (int): Images par seconde
+            radius (int): Rayon du cercle
+            thickness (int): Épaisseur du cercle
+            circle_color (Tuple): Couleur de l'arc de progression (RGBA)
+            circle_bg_color (Tuple): Couleur du cercle de fond (RGBA)
+            text_color (Tuple): Couleur du texte (RGBA)
+            font (str): Chemin de la police
+            font_size (int): Taille de la police
+            stroke_width (int): Épaisseur du contour du texte
+            stroke_fill (str): Couleur du contour du texte
+
+        Returns:
+            np.ndarray: Tableau uint8 (frames, hauteur, largeur, 4)
+        """
+        params = {
+            "duration": duration,
+            "fps": fps,
+            "radius": radius,
+            "thickness": thickness,
+            "circle_color": list(circle_color),
+            "circle_bg_color": list(circle_bg_color),
+            "text_color": list(text_color),
+            "font": font,
+            "font_size": font_size,
+            "stroke_width": stroke_width,
+            "stroke_fill": stroke_fill,
+        }
+        key = self._cache_key(params)
+        if key in self._frames:
+            return self._frames[key]
+
+        cache_path = self.cache_dir / f"timer_{key}.npy"
+        if cache_path.exists():
+            try:
+                frames = np.load(cache_path, mmap_mode="r")
+                self._frames[key] = frames
+                logger.info(f"Timer chargé depuis le cache: {cache_path}")
+                return frames
+            except Exception as e:
+                logger.warning(f"Fichier de cache du timer illisible, nouveau rendu: {str(e)}")
+
+        frames = self._render_frames(**params)
+
+        # Écriture atomique pour ne jamais laisser un fichier partiel dans le cache
+        temp_path = self.cache_dir / f"timer_{key}.{os.getpid()}.tmp.npy"
+        np.save(temp_path, frames)
+        os.replace(temp_path, cache_path)
+        logger.info(f"Timer rendu et mis en cache: {cache_path}")
+
+        frames = np.load(cache_path, mmap_mode="r")
+        self._frames[key] = frames
+        return frames
+
+    def get_clip(self, duration: float, fps: int, **style) -> VideoClip:
+        """
+        Crée un clip unique indexé par frame à partir des frames du timer.
+
+        Args:
+            duration (float): Durée du timer en secondes
+            fps (int): Images par seconde
+            **style: Paramètres de style transmis à get_frames
+
+        Returns:
+            VideoClip: Clip du timer avec son masque de transparence
+        """
+        frames = self.get_frames(duration, fps, **style)
+        last_index = len(frames) - 1
+
+        def frame_index(t):
+            return max(0, min(int(t * fps + 1e-6), last_index))
+
+        clip = VideoClip(
+            frame_function=lambda t: frames[frame_index(t), :, :, :3],
+            duration=duration
+        )
+        mask = VideoClip(
+            frame_function=lambda t: frames[frame_index(t), :, :, 3] / 255.0,
+            is_mask=True,
+            duration=duration
+        )
+        return clip.with_mask(mask)
+
+    def _render_frames(self, duration, fps, radius, thickness, circle_color, circle_bg_color,
+                       text_color, font, font_size, stroke_width, stroke_fill) -> np.ndarray:
+        """
+        Dessine toutes les frames du timer avec PIL.
+
+        Returns:
+            np.ndarray: Tableau uint8 (frames, hauteur, largeur, 4)
+        """
+        total_frames = int(duration * fps)
+        size = 2*radius + 40
+        frames = np.zeros((max(total_frames, 1), size, size, 4), dtype=np.uint8)
+
+        try:
+            pil_font = get_font_registry().get(font, font_size)
+        except Exception:
+            pil_font = ImageFont.load_default()
+
+        circle_box = [(20, 20), (20 + 2*radius, 20 + 2*radius)]
+        for frame in range(total_frames):
+            # Calculer le temps restant
+            progress = frame / total_frames
+            time_left = int(duration - (frame / fps)) + 1
+
+            img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+
+            # Dessiner le cercle de fond
+            draw.ellipse(circle_box, outline=tuple(circle_bg_color), width=thickness)
+
+            # Dessiner l'arc de progression (l'angle 0 est à droite)
+            angle = int(360 * (1 - progress))
+            draw.arc(
+                circle_box,
+                start=270,
+                end=(270 + angle) % 360,
+                fill=tuple(circle_color),
+                width=thickness
+            )
+
+            # Texte du temps restant au centre du cercle
+            text_options = {}
+            if stroke_width:
+                text_options = {"stroke_width": stroke_width, "stroke_fill": stroke_fill}
+            draw.text(
+                (radius + 20, radius + 20),
+                str(time_left),
+                fill=tuple(text_color),
+                font=pil_font,
+                anchor="mm",
+                **text_options
+            )
+            frames[frame] = np.asarray(img)
+
+        return frames
@@ -1,52 +1,411 @@
 import os
+import re
+import uuid
+import random
 import logging
 import time
-from typing import List, Dict
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
-from google.cloud import texttospeech
-from moviepy import AudioFileClip
+import requests
+from google.api_core import exceptions as google_exceptions
+from google.api_core.client_options import ClientOptions
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import texttospeech, texttospeech_v1beta1
+from src.audio_cache import decode_file
+from src.disk_cache import DiskCache
+from src.japanese_tokenizer import get_japanese_tokenizer
+from src.speech_audio import SPEECH_SAMPLE_RATE, get_speech_store, read_wav
 
 logger = logging.getLogger(__name__)
 
+# À incrémenter si la synthèse ou le stockage des audios change
+TTS_CACHE_VERSION = 1
+
+# Mots des sous-titres, ponctuation rattachée au mot précédent (comme SRTGenerator)
+WORD_PATTERN = re.compile(r'\w+(?:[.,!?;])?|\S')
+
+# Erreurs passagères pour lesquelles une synthèse est relancée
+TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Termes d'un refus de l'API signifiant que la voix n'accepte pas le SSML ou ses repères
+MARKS_TERMS = ("ssml", "mark", "timepoint", "time point", "time_point")
+UNSUPPORTED_TERMS = ("not support", "unsupported")
+
 class TTSEngine:
     def __init__(self, config: dict):
         """
         Initialise le moteur TTS avec Google Cloud Text-to-Speech.
+
+        Les textes d'une vidéo sont synthétisés en parallèle (tts.concurrency requêtes au
+        plus en même temps) ; les erreurs passagères sont relancées avec un délai croissant.
+        Si tts.endpoint est défini, les requêtes partent vers ce serveur (par exemple
+        scripts/tts_stub_server.py) sans credentials Google Cloud.
+
+        Avec tts.timepoints, chaque mot est précédé d'un repère SSML <mark> et l'API v1beta1
+        renvoie l'instant de chaque repère : les étapes reçoivent le timing de leurs mots
+        ("words") et les sous-titres n'ont plus besoin de WhisperX. Pour les voix qui
+        refusent le SSML, la synthèse se fait sans repères et WhisperX reste utilisé.
+
+        Chaque voix est gardée en mémoire en PCM (registre des voix) : demandée en LINEAR16
+        (tts.encoding), elle est lue sans décodage et sa durée vient du nombre d'échantillons ;
+        le mixeur et l'alignement réutilisent le même tampon.
+
+        Les audios synthétisés sont gardés dans un cache disque adressé par contenu (texte,
+        voix, langue, débit, hauteur, encodage) avec leur durée exacte : une phrase déjà lue
+        ne coûte ni requête ni décodage.
         """
         self.config = config
         load_dotenv(override=True)
-        
-        # Vérification des credentials Google Cloud
-        if not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
-            raise ValueError("Les credentials Google Cloud ne sont pas définis. Veuillez définir la variable d'environnement GOOGLE_APPLICATION_CREDENTIALS")
-        
-        self.client = texttospeech.TextToSpeechClient()
+        tts_config = config["tts"]
+        self.concurrency = max(1, int(tts_config.get("concurrency", 8)))
+        self.max_retries = int(tts_config.get("max_retries", 3))
+        self.retry_backoff = float(tts_config.get("retry_backoff", 0.5))
+        self.timeout = float(tts_config.get("timeout", 60))
+        endpoint = tts_config.get("endpoint")
+        self.timepoints = bool(tts_config.get("timepoints", False))
+        self._marks_supported = self.timepoints
+        # Les repères SSML ne sont renvoyés que par l'API v1beta1
+        self.api = texttospeech_v1beta1 if self.timepoints else texttospeech
+        self.language = config["subtitles"].get("language", "fr")
+
+        if endpoint:
+            # Serveur local (API REST), sans authentification
+            self.client = self.api.TextToSpeechClient(
+                credentials=AnonymousCredentials(),
+                transport="rest",
+                client_options=ClientOptions(api_endpoint=endpoint)
+            )
+            logger.info(f"Synthèse vocale via {endpoint}")
+        else:
+            # Vérification des credentials Google Cloud
+            if not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+                raise ValueError("Les credentials Google Cloud ne sont pas définis. Veuillez définir la variable d'environnement GOOGLE_APPLICATION_CREDENTIALS")
+            self.client = self.api.TextToSpeechClient()
         self.temp_dir = Path("assets/temp")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
-        
+
         # Configuration de la voix française
-        ssml_gender = (config["tts"]["gender"] == "female") if texttospeech.SsmlVoiceGender.FEMALE else texttospeech.SsmlVoiceGender.MALE 
-        self.voice = texttospeech.VoiceSelectionParams(
+        ssml_gender = self.api.SsmlVoiceGender.FEMALE if config["tts"]["gender"] == "female" else self.api.SsmlVoiceGender.MALE
+        self.voice = self.api.VoiceSelectionParams(
             language_code=config["tts"]["language"],
             name=config["tts"]["voice"],
             ssml_gender=ssml_gender
         )
-        
+
         # Configuration de l'audio
-        self.audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
+        self.audio_config = self.api.AudioConfig(
+            audio_encoding=self.api.AudioEncoding[tts_config.get("encoding", "LINEAR16")],
             speaking_rate=1.0,
             pitch=0.0
         )
-        
+        self.audio_cache = None
+        if tts_config.get("cache", True):
+            cache_dir = Path(config["path_assets"].get("cache", "assets/cache")) / "tts"
+            self.audio_cache = DiskCache(
+                str(cache_dir),
+                max_bytes=int(tts_config.get("cache_mb", 256) * 1024 * 1024),
+                suffix=self._audio_suffix(),
+                name="tts"
+            )
+        self.speech_store = get_speech_store()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "seconds": 0.0}
+
+    def _audio_suffix(self) -> str:
+        encoding = self.audio_config.audio_encoding
+        if encoding == self.api.AudioEncoding.LINEAR16:
+            return ".wav"
+        if encoding == self.api.AudioEncoding.OGG_OPUS:
+            return ".ogg"
+        return ".mp3"
+
+    def _cache_key(self, text: str, with_marks: bool) -> str:
+        """
+        Calcule la clé de cache d'un texte pour la voix et les réglages audio courants.
+
+        Args:
+            text (str): Texte à lire
+            with_marks (bool): Audio demandé avec les repères SSML (timing des mots)
+
+        Returns:
+            str: Clé du cache
+        """
+        params = {
+            "text": text,
+            "voice": self.voice.name,
+            "language": self.voice.language_code,
+            "speaking_rate": self.audio_config.speaking_rate,
+            "pitch": self.audio_config.pitch,
+            "encoding": self.api.AudioEncoding(self.audio_config.audio_encoding).name,
+            "version": TTS_CACHE_VERSION,
+        }
+        if with_marks:
+            params["timepoints"] = True
+        return DiskCache.make_key(params)
+
+    def _words(self, text: str) -> List[str]:
+        """Découpe un texte en mots comme les sous-titres."""
+        if self.language == "ja":
+            return get_japanese_tokenizer().words(text)
+        return [word for word in WORD_PATTERN.findall(text) if word.strip()]
+
+    def _ssml_with_marks(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Construit le SSML d'un texte avec un repère <mark> avant chaque mot (nommé par son
+        indice) et un repère "end" après le dernier. Le texte lu reste identique.
+
+        Args:
+            text (str): Texte à lire
+
+        Returns:
+            Tuple[str, List[str]]: SSML et mots repérés, dans l'ordre
+        """
+        parts = []
+        words = []
+        cursor = 0
+        for word in self._words(text):
+            index = text.find(word, cursor)
+            if index < 0:
+                continue
+            parts.append(escape(text[cursor:index]))
+            parts.append(f'<mark name="{len(words)}"/>{escape(word)}')
+            words.append(word)
+            cursor = index + len(word)
+        parts.append(escape(text[cursor:]))
+        parts.append('<mark name="end"/>')
+        return f"<speak>{''.join(parts)}</speak>", words
+
+    @staticmethod
+    def _word_timings(words: List[str], timepoints: Dict[str, float], duration: float) -> Optional[List[Dict]]:
+        """
+        Convertit les instants des repères en timing des mots : chaque mot dure jusqu'au
+        repère suivant.
+
+        Returns:
+            Optional[List[Dict]]: [{'text', 'start', 'end'}], ou None s'il manque des repères
+        """
+        if not words or any(str(i) not in timepoints for i in range(len(words))):
+            return None
+        starts = [timepoints[str(i)] for i in range(len(words))]
+        ends = starts[1:] + [timepoints.get("end", duration)]
+        return [
+            {"text": word, "start": start, "end": min(max(end, start), duration)}
+            for word, start, end in zip(words, starts, ends)
+        ]
+
+    def _request(self, text: str, with_marks: bool):
+        if with_marks:
+            ssml, words = self._ssml_with_marks(text)
+            request = self.api.SynthesizeSpeechRequest(
+                input=self.api.SynthesisInput(ssml=ssml),
+                voice=self.voice,
+                audio_config=self.audio_config,
+                enable_time_pointing=[self.api.SynthesizeSpeechRequest.TimepointType.SSML_MARK]
+            )
+            return request, words
+        request = self.api.SynthesizeSpeechRequest(
+            input=self.api.SynthesisInput(text=text),
+            voice=self.voice,
+            audio_config=self.audio_config
+        )
+        return request, None
+
+    @staticmethod
+    def _marks_unsupported(error: Exception) -> bool:
+        """Indique si un refus de l'API signifie que la voix n'accepte pas le SSML ou ses repères."""
+        message = str(error).lower()
+        return any(term in message for term in MARKS_TERMS) and any(term in message for term in UNSUPPORTED_TERMS)
+
+    def _synthesize(self, text: str) -> Tuple[bytes, Optional[List[str]], Dict[str, float]]:
+        """
+        Synthétise un texte, en relançant la requête sur les erreurs passagères.
+
+        Args:
+            text (str): Texte à lire
+
+        Returns:
+            Tuple: Contenu audio encodé, mots repérés (None sans repères) et instant de
+                chaque repère en secondes
+        """
+        attempt = 0
+        marks_allowed = True
+        while True:
+            with_marks = marks_allowed and self._marks_supported
+            request, words = self._request(text, with_marks)
+            try:
+                response = self.client.synthesize_speech(request=request, timeout=self.timeout)
+                timepoints = {point.mark_name: point.time_seconds for point in getattr(response, "timepoints", [])}
+                return response.audio_content, words, timepoints
+            except google_exceptions.InvalidArgument as e:
+                if not with_marks:
+                    raise
+                # Ce texte est relu en texte brut, ses sous-titres passeront par WhisperX
+                marks_allowed = False
+                if self._marks_unsupported(e):
+                    # Voix sans SSML : plus de repères pour les textes suivants
+                    logger.warning(f"Repères SSML refusés pour la voix {self.voice.name}, synthèse sans timing des mots: {str(e)}")
+                    self._marks_supported = False
+                else:
+                    # Refus propre à ce texte (SSML trop long par exemple)
+                    logger.warning(f"SSML refusé pour le texte \"{text.strip()[:40]}\", synthèse sans timing des mots: {str(e)}")
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                # Délai exponentiel avec gigue, pour ne pas relancer toutes les requêtes ensemble
+                delay = self.retry_backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"Erreur passagère du TTS ({type(e).__name__}), nouvel essai dans {delay:.2f}s")
+                with self._stats_lock:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+                attempt += 1
+
+    def _synthesize_to_file(self, text: str) -> Tuple[str, float, Optional[List[Dict]]]:
+        """
+        Synthétise un texte dans un fichier et mesure sa durée, ou reprend l'audio du cache.
+
+        Args:
+            text (str): Texte à lire
+
+        Returns:
+            Tuple: Chemin du fichier audio, durée en secondes et timing des mots
+                ([{'text', 'start', 'end'}], None sans repères SSML)
+        """
+        # Audio demandé : avec repères tant que la voix les accepte
+        with_marks = self._marks_supported
+        if self.audio_cache is not None:
+            key = self._cache_key(text, with_marks)
+            cached_path = self.audio_cache.get(key)
+            metadata = self.audio_cache.get_metadata(key) if cached_path is not None else None
+            if metadata is not None and "duration" in metadata:
+                # PCM lu à la première utilisation par le mixeur ou l'alignement
+                self.speech_store.add(str(cached_path))
+                return str(cached_path), metadata["duration"], metadata.get("words")
+
+        audio_content, words, timepoints = self._synthesize(text)
+
+        # Sauvegarde de l'audio (nom unique : plusieurs synthèses se terminent en même temps)
+        audio_path = self.temp_dir / f"tts_{uuid.uuid4().hex}{self._audio_suffix()}"
+        with open(audio_path, "wb") as out:
+            out.write(audio_content)
+
+        # PCM de la voix, décodé une seule fois ; la durée vient du nombre d'échantillons
+        if audio_content[:4] == b"RIFF":
+            pcm, sample_rate = read_wav(audio_content)
+        else:
+            pcm, sample_rate = decode_file(str(audio_path), SPEECH_SAMPLE_RATE, 1)[:, 0], SPEECH_SAMPLE_RATE
+        duration = len(pcm) / sample_rate
+        with self._stats_lock:
+            self.stats["requests"] += 1
+        word_timings = self._word_timings(words, timepoints, duration) if words is not None else None
+        if words is not None and word_timings is None:
+            logger.warning(f"Repères SSML manquants dans la réponse du TTS pour: {text.strip()[:40]}")
+
+        if self.audio_cache is not None:
+            metadata = {"duration": duration, "text": text, "words": word_timings}
+            if with_marks and words is None:
+                # SSML refusé pour ce texte : l'audio sans repères est gardé sous la clé demandée,
+                # les rendus suivants ne renvoient pas la requête refusée
+                metadata["ssml_refused"] = True
+            try:
+                cached_path = self.audio_cache.put(
+                    key,
+                    lambda path: shutil.move(str(audio_path), str(path)),
+                    metadata=metadata
+                )
+                audio_path = cached_path
+            except OSError as e:
+                logger.error(f"Erreur lors de l'écriture dans le cache TTS: {str(e)}")
+        self.speech_store.add(str(audio_path), pcm, sample_rate)
+        return str(audio_path), duration, word_timings
+
+    def synthesize_batch(self, texts: List[str]) -> List[Tuple[str, float, Optional[List[Dict]]]]:
+        """
+        Synthétise plusieurs textes en parallèle. Un texte présent plusieurs fois n'est
+        synthétisé qu'une fois.
+
+        Args:
+            texts (List[str]): Textes à lire
+
+        Returns:
+            List[Tuple]: Chemin, durée et timing des mots de chaque audio, dans l'ordre des textes
+        """
+        if not texts:
+            return []
+        start_time = time.perf_counter()
+        requests_before = self.stats["requests"]
+        unique_texts = list(dict.fromkeys(texts))
+        workers = min(self.concurrency, len(unique_texts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts") as executor:
+            results = dict(zip(unique_texts, executor.map(self._synthesize_to_file, unique_texts)))
+        elapsed = time.perf_counter() - start_time
+        self.stats["seconds"] += elapsed
+        logger.info(
+            f"Synthèse vocale: {len(texts)} textes en {elapsed:.2f}s, "
+            f"{self.stats['requests'] - requests_before} requêtes ({workers} simultanées au plus)"
+        )
+        return [results[text] for text in texts]
+
+    def generate_questions_audio(self, questions: List[Dict]) -> List[List[Dict]]:
+        """
+        Génère en une fois les fichiers audio de toutes les questions.
+
+        Args:
+            questions (List[Dict]): Les données des questions
+
+        Returns:
+            List[List[Dict]]: Informations audio de chaque question (voir generate_question_audio)
+        """
+        entries = []
+        for question_data in questions:
+            # Construction du texte complet
+            text_question_and_choices = f"{question_data['question']}\n\n"
+            text_answer = f"\n{question_data['choices'][question_data['answer']]}"
+            entries.append([
+                (text_question_and_choices, True, False),  # Question
+                (text_answer, False, True)  # Réponse
+            ])
+
+        results = iter(self.synthesize_batch([text for parts in entries for text, _, _ in parts]))
+        output = []
+        for parts in entries:
+            output_info = []
+            for text, is_question, is_answer in parts:
+                audio_path, duration, words = next(results)
+                info = {
+                    'path': audio_path,
+                    'text': text,
+                    'duration': duration,
+                    'is_question': is_question,
+                    'is_answer': is_answer
+                }
+                if words:
+                    info['words'] = words
+                output_info.append(info)
+            output.append(output_info)
+        return output
+
     def generate_question_audio(self, question_data: Dict) -> List[Dict]:
         """
         Génère les fichiers audio pour une question.
-        
+
         Args:
             question_data (Dict): Les données de la question
-            
+
         Returns:
             List[Dict]: Liste des informations audio [
                 {
@@ -55,78 +414,35 @@ class TTSEngine:
                     'duration': float  # Durée en secondes
                     'is_question': bool,  # Indique si c'est une question
                     'is_answer': bool,  # Indique si c'est une réponse
+                    'words': List[Dict],  # Optionnel, timing des mots (tts.timepoints)
                 }
             ]
         """
-        # Construction du texte complet
-        text_question_and_choices = f"{question_data['question']}\n\n"
-            
-        text_answer = f"\n{question_data['choices'][question_data['answer']]}"
-        
-        # Génération de l'audio
-        synthesis_input_question_and_choices = texttospeech.SynthesisInput(text=text_question_and_choices)
-        synthesis_input_answer = texttospeech.SynthesisInput(text=text_answer)
-        synthesis_inputs = [
-            (synthesis_input_question_and_choices, text_question_and_choices, True, False),  # Question
-            (synthesis_input_answer, text_answer, False, True)  # Réponse
-        ]
-        
-        output_info = []
-        for synthesis_input, text, is_question, is_answer in synthesis_inputs:
-            response = self.client.synthesize_speech(
-                input=synthesis_input,
-                voice=self.voice,
-                audio_config=self.audio_config
-            )
-            
-            # Sauvegarde de l'audio
-            audio_path = self.temp_dir / f"tts_{str(time.time()*1000).replace('.', '')}.mp3"
-            with open(audio_path, "wb") as out:
-                out.write(response.audio_content)
-            
-            # Obtenir la durée de l'audio
-            audio = AudioFileClip(str(audio_path))
-            duration = audio.duration
-            audio.close()
-            
-            output_info.append({
-                'path': str(audio_path),
-                'text': text,
-                'duration': duration,
-                'is_question': is_question,
-                'is_answer': is_answer
-            })
-        
-        return output_info
-      
+        return self.generate_questions_audio([question_data])[0]
+
     def generate_question_audio_v2(self, steps: List[Dict]) -> List[Dict]:
-        for step in steps:
-            if step["type"] not in ["question", "answer", "phase"]:
-                continue
-            response = self.client.synthesize_speech(
-                input=texttospeech.SynthesisInput(text=step["text"]),
-                voice=self.voice,
-                audio_config=self.audio_config
-            )
-            # Sauvegarde de l'audio
-            audio_path = self.temp_dir / f"tts_{str(time.time()*1000).replace('.', '')}.mp3"
-            with open(audio_path, "wb") as out:
-                out.write(response.audio_content)
-            
-            # Obtenir la durée de l'audio
-            audio = AudioFileClip(str(audio_path))
-            duration = audio.duration
-            audio.close()
-            step["audio_path"] = str(audio_path)
+        spoken_steps = [step for step in steps if step["type"] in ["question", "answer", "phase"]]
+        results = self.synthesize_batch([step["text"] for step in spoken_steps])
+        for step, (audio_path, duration, words) in zip(spoken_steps, results):
+            step["audio_path"] = audio_path
             step["duration"] = duration
+            if words:
+                step["words"] = words
         return steps
-              
+
     def cleanup(self):
         """Nettoie les fichiers temporaires"""
+        logger.info(
+            f"TTS: {self.stats['requests']} synthèses, {self.stats['retries']} nouveaux essais, "
+            f"{self.stats['seconds']:.2f}s au total"
+        )
+        if self.audio_cache is not None:
+            self.audio_cache.log_stats()
+        self.speech_store.clear()
         try:
-            for file in self.temp_dir.glob("*.mp3"):
+            for file in self.temp_dir.glob(f"*{self._audio_suffix()}"):
                 file.unlink()
         except Exception as e:
-            logger.error(f"Erreur lors du nettoyage des fichiers temporaires: {str(e)}") 
-            
-        
\ No newline at end of file
+            logger.error(f"Erreur lors du nettoyage des fichiers temporaires: {str(e)}")
+
+
@@ -7,13 +7,71 @@ import time
 from PIL import Image, ImageDraw, ImageFont
 from matplotlib import pyplot as plt
 from moviepy import AudioClip, AudioFileClip, ColorClip, CompositeAudioClip, CompositeVideoClip, ImageClip, TextClip, VideoFileClip, VideoClip, concatenate_audioclips, concatenate_videoclips
-from moviepy.video.tools.subtitles import SubtitlesClip
+from moviepy.video.tools.subtitles import SubtitlesClip, file_to_subtitles
 import numpy as np
 import ast
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from moviepy.video.fx.Loop import Loop as loop
+from moviepy.audio.AudioClip import AudioArrayClip
+
+from src import rasterizer
+from src.audio_cache import get_audio_asset_cache
+from src.audio_mixer import AudioCue, AudioMixer
+from src.background_cache import BackgroundCache
+from src.compositor import Layer, QuizCompositor, Scene, flatten_static_layers
+from src.ffmpeg_backend import FfmpegOverlayRenderer, ass_filter
+from src.font_registry import get_font_registry
+from src.japanese_tokenizer import get_japanese_tokenizer
+from src.parallel_render import concat_chunks, split_frames, write_frames
+from src.render_engine import RenderEngine
+from src.speech_audio import get_speech_store
+from src.sprite_cache import SpriteCache
+from src.text_layout import TextLayout, TextLayoutEngine
+from src.timeline import TimelineCompositeVideoClip
+from src.timer_cache import TimerCache
 
 logger = logging.getLogger(__name__)
 
+class V2FrameFactory:
+    def __init__(self, config: dict, theme: str, steps: List, total_duration: float, background=None):
+        """
+        Recette sérialisable de la vidéo v2, pour produire ses frames dans un autre processus.
+        
+        La vidéo est reconstruite à partir de la configuration et des étapes (les clips
+        moviepy ne passent pas d'un processus à l'autre) ; les caches disque des sprites,
+        du timer et des fonds rendent cette reconstruction peu coûteuse. Le fond est
+        résolu une seule fois par le processus principal : les processus de rendu ne
+        génèrent ni image ni vidéo de fond.
+        
+        Args:
+            config (dict): Configuration
+            theme (str): Thème de la vidéo
+            steps (List): Étapes calculées par calculate_duration_start_end
+            total_duration (float): Durée totale de la vidéo
+            background (str | ZoomFrameSource): Fond retourné par _get_background
+        """
+        self.config = config
+        self.theme = theme
+        self.steps = steps
+        self.total_duration = total_duration
+        self.background = background
+
+    def build(self) -> VideoClip:
+        video_creator = VideoCreator(config=self.config, theme=self.theme)
+        video, _ = video_creator._build_video_v2(self.steps, self.total_duration, background=self.background)
+        return video
+
+    def __call__(self):
+        """Retourne la fonction t -> frame RGB de la vidéo."""
+        return self.build().get_frame
+
+def _render_v2_chunk(factory: V2FrameFactory, first_frame: int, last_frame: int, output_path: str, threads: int):
+    """Rend un morceau de la vidéo v2 dans un processus de rendu parallèle."""
+    video = factory.build()
+    write_frames(video, output_path, first_frame, last_frame, factory.config["video"]["fps"],
+                 preset=factory.config.get("render", {}).get("preset", "ultrafast"), threads=threads)
+
 class VideoCreator:
     def __init__(self, config: dict, theme: str):
         """
@@ -46,9 +104,11 @@ class VideoCreator:
         # Dimensions TikTok (9:16)
         self.width = self.config["video"]["width"]
         self.height = self.config["video"]["height"]
+        # Facteur appliqué aux longueurs de la mise en page (mode brouillon, voir draft_config)
+        self.scale = self.config["video"].get("scale", 1.0)
         
         # Sélection de la musique qui sera utilisée pour toutes les vidéos
-        self.music = AudioFileClip(str(self.music_dir) + '/' + self.config["music"]["background"])
+        self.music_path = str(self.music_dir) + '/' + self.config["music"]["background"]
         
         # Position Y du bas du dernier choix
         self.lowest_choices_y = 0
@@ -63,6 +123,52 @@ class VideoCreator:
             self.background_manager = None
         
     
+        # Cache des animations du timer
+        self.cache_dir = Path(config["path_assets"].get("cache", "assets/cache"))
+        self.timer_cache = TimerCache(cache_dir=str(self.cache_dir / "timers"))
+        
+        # Cache disque des sprites de sous-titres (un rendu par mot et par style)
+        self.sprite_cache = SpriteCache(
+            cache_dir=str(self.cache_dir / "sprites"),
+            max_bytes=int(self.config["subtitles"].get("sprite_cache_mb", 256) * 1024 * 1024)
+        )
+        
+        # Musiques et effets sonores décodés une fois pour tout le processus
+        self.audio_assets = get_audio_asset_cache(
+            str(self.cache_dir / "audio"),
+            max_bytes=int(self.config.get("render", {}).get("audio_cache_mb", 512) * 1024 * 1024)
+        )
+        
+        # Polices chargées une fois pour tout le processus, réduites en option aux glyphes utilisés
+        self.fonts = get_font_registry(
+            str(self.cache_dir / "fonts") if self.config.get("render", {}).get("font_subset", False) else None
+        )
+        
+        # Mise en page du texte (métriques des glyphes en cache), indépendante du rendu
+        self.text_layout = TextLayoutEngine(self.fonts)
+        
+        # Mixeur audio : voix, effets et musique mixés en une passe
+        self.audio_mixer = AudioMixer(asset_cache=self.audio_assets)
+        
+        # Vidéos de fond transcodées une fois aux dimensions et fps de sortie
+        self.background_cache = BackgroundCache(
+            cache_dir=str(self.cache_dir / "backgrounds"),
+            size=(self.width, self.height),
+            fps=self.config["video"]["fps"],
+            max_bytes=int(self.config.get("render", {}).get("background_cache_mb", 2048) * 1024 * 1024)
+        )
+    
+        # Preset x264 de l'encodage final
+        self.preset = self.config.get("render", {}).get("preset", "ultrafast")
+        
+        # Backend de rendu ("moviepy", "numpy" ou "ffmpeg")
+        self.render_backend = self.config.get("render", {}).get("backend", "moviepy")
+        # Les backends "numpy" et "ffmpeg" travaillent sur des scènes de calques à plat
+        self.uses_scenes = self.render_backend in ("numpy", "ffmpeg")
+        
+        # Rendu des sous-titres ("clips" : un clip par mot, "ass" : incrustés par FFmpeg avec libass)
+        self.subtitles_renderer = self.config["subtitles"].get("renderer", "clips")
+        
         # Couleurs et styles
         self.colors = {
             'text': self.config["video"]["text_color"],
@@ -74,6 +180,20 @@ class VideoCreator:
         }
         
             
+    def _px(self, value: float) -> int:
+        """
+        Met à l'échelle une longueur de la mise en page (1 pixel au minimum).
+        
+        Args:
+            value (float): Longueur en pixels pour une vidéo 1080x1920
+            
+        Returns:
+            int: Longueur en pixels pour la vidéo rendue
+        """
+        if self.scale == 1.0:
+            return value
+        return max(1, int(round(value * self.scale))) if value else 0
+
     def _get_unique_filename(self, prefix: str = "video") -> str:
         """
         Génère un nom de fichier unique basé sur le timestamp.
@@ -87,61 +207,82 @@ class VideoCreator:
         timestamp = int(time.time() * 1000)
         return f"{prefix}_{timestamp}.mp4"
             
-    def _calculate_text_positions(self, question_clip: TextClip, choices_clips: List[TextClip]):
+    def _calculate_text_positions(self, question_height: int, choices_heights: List[int]):
         """
         Calcule les positions optimales pour éviter le chevauchement des textes.
+        Seules les hauteurs des boîtes sont nécessaires : le calcul se fait avant tout rendu.
         
         Args:
-            question_clip (TextClip): Clip de la question
-            choices_clips (List[TextClip]): Liste des clips des choix
+            question_height (int): Hauteur de la boîte de la question
+            choices_heights (List[int]): Hauteurs des boîtes des choix
+            
+        Returns:
+            tuple: (position Y de la question, positions Y des choix)
         """
         # Position de la question en haut
         question_y = self.height * 0.15
-        question_clip_with_position = question_clip.with_position(('center', question_y))
         
         # Espacement entre les options
         spacing = self.config["video"]["spacing"]
-        question_clip_height = question_clip.size[1]
         
-        current_y = question_clip_height + question_y + spacing 
+        current_y = question_height + question_y + spacing 
         
-        choices_clips_with_position = []
+        choices_y = []
         # Calculer les positions pour chaque choix
-        for i, choice_clip in enumerate(choices_clips):
-            choices_clips_with_position.append(choice_clip.with_position(('center', current_y)))
-            current_y += choice_clip.size[1] + spacing
+        for choice_height in choices_heights:
+            choices_y.append(current_y)
+            current_y += choice_height + spacing
         if current_y > self.lowest_choices_y:
             self.lowest_choices_y = current_y
         # Stocker la position Y du bas du dernier choix pour les sous-titres
-        if choices_clips:
-            last_choice = choices_clips[-1]
+        if choices_heights:
             self.last_choice_bottom_y = current_y - spacing  # Position après le dernier choix
         else:
-            self.last_choice_bottom_y = question_clip_height + question_y + spacing
+            self.last_choice_bottom_y = question_height + question_y + spacing
             
-        return question_clip_with_position, choices_clips_with_position
+        return question_y, choices_y
 
-    def _wrap_japanese_text(self, text, max_chars=9):
-        from fugashi import Tagger
-        tagger = Tagger()
-        tokens = [word.surface for word in tagger(text)]
-       
-        lines = []
-        current_line = ''
-       
-        for token in tokens:
-            if len(current_line) + len(token) > max_chars:
-               lines.append(current_line)
-               current_line = token
-            else:
-               current_line += token
-       
-        if current_line:
-            lines.append(current_line)
-       
-        return '\n'.join(lines)
+    def _layout_text(self, text: str, fontsize: int) -> TextLayout:
+        """
+        Met en page le texte d'une boîte sur 80% de la largeur, sans le rastériser.
+        
+        Args:
+            text (str): Le texte à afficher
+            fontsize (int): Taille de la police
+            
+        Returns:
+            TextLayout: Lignes et dimensions du texte
+        """
+        language = self.config["subtitles"]["language"]
+        return self.text_layout.layout(
+            text,
+            self.config["video"]["font"],
+            fontsize,
+            max_width=int(self.width * 0.8),
+            language=language,
+            stroke_width=self._px(2),
+            tokenize=get_japanese_tokenizer().words_with_spaces if language == "ja" else None
+        )
+
+    def _text_box_size(self, layout: TextLayout) -> tuple:
+        """
+        Calcule les dimensions d'une boîte de texte à partir de sa mise en page.
+        
+        Args:
+            layout (TextLayout): Mise en page du texte
+            
+        Returns:
+            tuple: (largeur, hauteur) de la boîte, padding compris
+        """
+        # Les boîtes françaises gardent la largeur de coupure, les japonaises s'ajustent au texte
+        text_width = layout.size[0]
+        if self.config["subtitles"]["language"] != "ja":
+            text_width = max(text_width, int(self.width * 0.8))
+        padding = self._px(30)
+        return text_width + padding * 2, layout.size[1] + padding * 2
     
-    def _create_text_box(self, text: str, fontsize: int, color: str, is_correct: bool = False) -> CompositeVideoClip:
+    def _create_text_box(self, text: str, fontsize: int, color: str, is_correct: bool = False,
+                         layout: TextLayout = None) -> CompositeVideoClip:
         """
         Crée une boîte design contenant du texte.
         
@@ -150,34 +291,29 @@ class VideoCreator:
             fontsize (int): Taille de la police
             color (str): Couleur du texte
             is_correct (bool): Si c'est la bonne réponse
+            layout (TextLayout): Mise en page déjà calculée (défaut: calculée ici)
             
         Returns:
             CompositeVideoClip: La boîte avec le texte
         """
-        method = 'caption'
-        if self.config["subtitles"]["language"] == "ja":
-            text = self._wrap_japanese_text(text)
-            method = 'label'
-        # Création du texte avec une police système standard
+        if layout is None:
+            layout = self._layout_text(text, fontsize)
+        
+        # Dimensions de la boîte avec padding
+        box_width, box_height = self._text_box_size(layout)
+        padding = self._px(30)
+        
+        # Le texte est rastérisé une seule fois, déjà coupé en lignes
         text_clip = TextClip(
-            text=text,
+            text=layout.text,
             font_size=fontsize,
             color=color,
-            size=(int(self.width * 0.8), None),
-            method=method,
+            size=(box_width - padding * 2, None),
+            method='label',
             stroke_color=self.colors['highlight'],
-            stroke_width=2,
-            font=self.config["video"]["font"]
+            stroke_width=self._px(2),
+            font=self._font(layout.text)
         )
-            
-        # Dimensions de la boîte avec padding
-        padding = 30
-        box_width = text_clip.size[0] + padding * 2
-        box_height = text_clip.size[1] + padding * 2
-        
-        # Création d'une image PIL pour la boîte
-        box_image = Image.new('RGBA', (box_width, box_height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(box_image)
         
         # Couleurs de la boîte
         if is_correct:
@@ -187,22 +323,9 @@ class VideoCreator:
             fill_color = self.colors['choice_background']
             border_color = self.colors['choice_highlight']
         
-        # Dessin du fond
-        draw.rectangle(
-            [(0, 0), (box_width, box_height)],
-            fill=fill_color
-        )
-        
-        # Dessin de la bordure
-        border_width = 4
-        draw.rectangle(
-            [(0, 0), (box_width, box_height)],
-            outline=border_color,
-            width=border_width
-        )
-        
-        # Création du clip à partir de l'image PIL
-        box_clip = ImageClip(np.array(box_image))
+        # Création du clip à partir de la boîte rastérisée (fond et bordure)
+        border_width = self._px(4)
+        box_clip = ImageClip(rasterizer.bordered_box((box_width, box_height), fill_color, border_color, border_width))
         
         # Positionnement du texte au centre de la boîte
         text_clip = text_clip.with_position(('center', 'center'))
@@ -215,6 +338,90 @@ class VideoCreator:
         
         return final_clip
 
+    def _question_box_texts(self, question_data: Dict) -> tuple:
+        """
+        Retourne les textes affichés dans les boîtes d'une question.
+        
+        Args:
+            question_data (Dict): Données de la question
+            
+        Returns:
+            tuple: (texte de la question, textes numérotés des choix, texte de la bonne réponse)
+        """
+        choices = question_data['choices']
+        choices_texts = [f"{i}. {choices[str(i)]}" for i in range(1, self.config["prompt"]["num_choices"] + 1)]
+        return question_data['question'], choices_texts, choices[str(int(question_data['answer']))]
+
+    def _create_question_boxes(self, question_data: Dict):
+        """
+        Crée et positionne les boîtes de la question et des choix.
+        
+        Args:
+            question_data (Dict): Données de la question
+            
+        Returns:
+            tuple: (boîte de la question, boîtes des choix, boîtes des choix avec la bonne réponse en vert)
+        """
+        question_font_size = self.config["video"]["question_font_size"]
+        choices_font_size = self.config["video"]["choices_font_size"]
+        correct_answer_index = int(question_data['answer'])
+        question_text, choices_texts, correct_text = self._question_box_texts(question_data)
+        
+        # Mise en page de tous les textes avant le moindre rendu
+        question_layout = self._layout_text(question_text, question_font_size)
+        choices_layouts = [self._layout_text(text, choices_font_size) for text in choices_texts]
+        correct_layout = self._layout_text(correct_text, choices_font_size)
+        
+        # Calcul des positions optimales à partir des seules dimensions
+        question_height = self._text_box_size(question_layout)[1]
+        question_y, choices_y = self._calculate_text_positions(
+            question_height, [self._text_box_size(layout)[1] for layout in choices_layouts]
+        )
+        # Partie 2 : la bonne réponse en vert
+        choices_layouts_part2 = [
+            correct_layout if i == correct_answer_index else choices_layouts[i-1]
+            for i in range(1, len(question_data['choices']) + 1)
+        ]
+        _, choices_y_part2 = self._calculate_text_positions(
+            question_height, [self._text_box_size(layout)[1] for layout in choices_layouts_part2]
+        )
+        
+        # Rendu de chaque boîte, une seule fois
+        question_box = self._create_text_box(
+            question_data['question'],
+            fontsize=question_font_size,
+            color=self.colors['text'],
+            layout=question_layout
+        ).with_position(('center', question_y))
+        
+        # Création des boîtes pour les choix (tous en style normal)
+        choices_boxes = []
+        for layout in choices_layouts:
+            choices_boxes.append(self._create_text_box(
+                layout.text,
+                fontsize=choices_font_size,
+                color=self.colors['text'],
+                is_correct=False,  # Tous les choix sont en style normal
+                layout=layout
+            ))
+        
+        choices_boxes_part2 = []
+        for i, y in enumerate(choices_y_part2, start=1):
+            if i == correct_answer_index:
+                choice_box = self._create_text_box(
+                    question_data['choices'][str(i)],
+                    fontsize=choices_font_size,
+                    color=self.colors['text'],
+                    is_correct=True,
+                    layout=correct_layout
+                )
+            else:
+                choice_box = choices_boxes[i-1]
+            choices_boxes_part2.append(choice_box.with_position(('center', y)))
+        choices_boxes = [box.with_position(('center', y)) for box, y in zip(choices_boxes, choices_y)]
+        
+        return question_box, choices_boxes, choices_boxes_part2
+
     def create_video(self, question_data: Dict, audio_info: List[Dict]) -> CompositeVideoClip:
         """
         Crée une vidéo à partir des données de la question et des informations audio.
@@ -240,8 +447,8 @@ class VideoCreator:
                     raise FileNotFoundError(f"Le fichier audio {audio_path} n'existe pas")
             
             # --- Création des clips audio ---
-            question_audio = AudioFileClip(audio_info[0]['path'])
-            answer_audio = AudioFileClip(audio_info[1]['path'])
+            question_audio = self._speech_clip(audio_info[0]['path'])
+            answer_audio = self._speech_clip(audio_info[1]['path'])
             
             # Calcul des durées
             part1_duration = audio_info[0]['duration']
@@ -249,29 +456,8 @@ class VideoCreator:
             part2_duration = audio_info[1]['duration']
             
             # --- Création des clips vidéo ---
-            # Partie 1 : Question et choix
-            # Création de la boîte pour la question
-            question_box = self._create_text_box(
-                question_data['question'],
-                fontsize=self.config["video"]["question_font_size"],
-                color=self.colors['text']
-            )
-        
-            # Création des boîtes pour les choix (tous en style normal)
-            choices_boxes = []
-            
-            for i in range(1, self.config["prompt"]["num_choices"] + 1):
-                choice_text = f"{i}. {question_data['choices'][str(i)]}"
-                choice_box = self._create_text_box(
-                    choice_text,
-                    fontsize=self.config["video"]["choices_font_size"],
-                    color=self.colors['text'],
-                    is_correct=False  # Tous les choix sont en style normal
-                )
-                choices_boxes.append(choice_box)
-            
-            # Calcul des positions optimales
-            question_box, choices_boxes = self._calculate_text_positions(question_box, choices_boxes)
+            # Boîtes de la question et des choix, déjà positionnées
+            question_box, choices_boxes, choices_boxes_part2 = self._create_question_boxes(question_data)
             
             # Création de la première partie
             part1 = CompositeVideoClip(
@@ -286,24 +472,7 @@ class VideoCreator:
             timer_clip = self._create_progress_bar_timer(timer_duration, question_box, choices_boxes)
             
             # --- Partie 2 : Réponse ---
-            # Création des boîtes pour la partie 2 (avec la bonne réponse en vert)
-            choices_boxes_part2 = []
-            correct_answer_index = int(question_data['answer'])
-            for i in range(1, len(question_data['choices']) + 1):
-                if i == correct_answer_index:
-                    choice_box = self._create_text_box(
-                        question_data['choices'][str(i)],
-                        fontsize=self.config["video"]["choices_font_size"],
-                        color=self.colors['text'],
-                        is_correct=True
-                    )
-                    choices_boxes_part2.append(choice_box)
-                else:
-                    choices_boxes_part2.append(choices_boxes[i-1])
-            
             question_box2 = question_box.with_duration(part2_duration)
-            # Calcul des positions optimales
-            question_box2, choices_boxes_part2 = self._calculate_text_positions(question_box2, choices_boxes_part2)
             
             # Création de la deuxième partie
             part2 = CompositeVideoClip(
@@ -337,40 +506,139 @@ class VideoCreator:
     
     
     def create_video_v2(self, steps: List, total_duration: float) -> CompositeVideoClip:
+        output_path = str(self.temp_dir / self._get_unique_filename(prefix="final"))
+        if self.render_backend == "ffmpeg":
+            # Composition entièrement déléguée à FFmpeg
+            scene = self._build_scene_v2(steps, total_duration)
+            self._write_video_ffmpeg(scene, self._get_background(steps[1]["text"], total_duration), output_path)
+            return
+
+        # --- Export
+        render_config = self.config.get("render", {})
+        chunks = int(render_config.get("chunks", 1))
+        producers = int(render_config.get("producers", 0))
+        # En rendu parallèle, les images sont construites par les processus de rendu : ici, seulement les sons et le fond
+        if producers > 0:
+            background = self._get_background(steps[1]["text"], total_duration)
+            self._write_video_engine(self._audio_cues_v2(steps), steps, total_duration, output_path, producers, background)
+        elif chunks > 1:
+            background = self._get_background(steps[1]["text"], total_duration)
+            self._write_video_chunked(self._audio_cues_v2(steps), steps, total_duration, output_path, chunks, background)
+        else:
+            video, audio_cues = self._build_video_v2(steps, total_duration)
+            self._write_video(video.with_duration(total_duration), output_path, audio_cues=audio_cues)
+        self.fonts.log_stats()
+
+    def _build_video_v2(self, steps: List, total_duration: float, background=None):
+        """
+        Construit la vidéo v2 complète (image et sons), sans l'exporter.
+        
+        Args:
+            steps (List): Étapes calculées par calculate_duration_start_end
+            total_duration (float): Durée totale de la vidéo
+            background (str | ZoomFrameSource): Fond déjà résolu (défaut: résolu ici)
+            
+        Returns:
+            tuple: (vidéo sans audio, sons à mixer)
+        """
+        static_clips, dynamic_clips, animated_clip_ids = self._build_clips_v2(steps, total_duration)
+        audio_cues = self._audio_cues_v2(steps)
+        
+        #Charger la video de fond
+        if background is None:
+            background = self._get_background(steps[1]["text"], total_duration)
+        background_video_clip = self._load_background_clip(background, total_duration)
+        
+        # --- Créer la vidéo finale
+        if self.render_backend == "numpy":
+            # Calques à plat composés par le compositeur NumPy
+            compositor = QuizCompositor((self.width, self.height), background=background_video_clip.get_frame)
+            compositor.add_layers(self._layers_from_clips_v2(static_clips, dynamic_clips, animated_clip_ids, total_duration))
+            # Badge, numéros et réponses fusionnés en un overlay par intervalle de temps
+            compositor.flatten_static()
+            video = compositor.to_clip(total_duration)
+        else:
+            # Le badge et les numéros ne changent jamais : un seul overlay pré-aplati
+            static_clips = self._flatten_static_clips(static_clips, total_duration)
+            all_video_clips = [background_video_clip] + static_clips + dynamic_clips
+            video = TimelineCompositeVideoClip(all_video_clips, size=(self.width, self.height))
+
+        # frame = video.get_frame(30)
+        # plt.imshow(frame)
+        # plt.axis('off')  # Supprime les axes
+        # plt.show()
+        # exit()
+
+        return video, audio_cues
+
+    def _build_scene_v2(self, steps: List, total_duration: float) -> Scene:
+        """
+        Construit la vidéo v2 sous forme de calques à plat (sans le fond), pour le backend FFmpeg.
+        
+        Args:
+            steps (List): Étapes calculées par calculate_duration_start_end
+            total_duration (float): Durée totale de la vidéo
+            
+        Returns:
+            Scene: Calques et audios de la vidéo
+        """
+        static_clips, dynamic_clips, animated_clip_ids = self._build_clips_v2(steps, total_duration)
+        layers = self._layers_from_clips_v2(static_clips, dynamic_clips, animated_clip_ids, total_duration)
+        return Scene(layers, self._audio_cues_v2(steps), total_duration)
+
+    def _layers_from_clips_v2(self, static_clips: List, dynamic_clips: List, animated_clip_ids: set,
+                              total_duration: float) -> List[Layer]:
+        """Rastérise les clips de la vidéo v2 en calques, dans l'ordre d'empilement."""
+        layers = [self._layer_from_clip(clip, 0, total_duration) for clip in static_clips]
+        for clip in dynamic_clips:
+            layers.append(self._layer_from_clip(clip, clip.start, clip.end, animated=id(clip) in animated_clip_ids))
+        return layers
+
+    def _build_clips_v2(self, steps: List, total_duration: float):
+        """
+        Crée les clips de la vidéo v2 : badge et numéros (fixes), réponses et timers
+        (positionnés dans le temps). Les sons sont décrits à part par _audio_cues_v2.
+        
+        Args:
+            steps (List): Étapes calculées par calculate_duration_start_end
+            total_duration (float): Durée totale de la vidéo
+            
+        Returns:
+            tuple: (clips fixes, clips dynamiques, ids des clips animés)
+        """
         nb_question = self.config["prompt"]["num_questions"]
-        padding = 110
+        padding = self._px(110)
         first_question_y = self.height * 0.27
-        first_question_text = steps[1]["text"]
         static_clips = []
         dynamic_clips = []
-        audio_clips = []
+        animated_clip_ids = set()
         
         # Création d'un TextClip avec fond rouge
         text_clip = TextClip(
             text=f"クイズ",
-            font_size=80,
-            font=self.config["video"]["font"],
+            font_size=self._px(80),
+            font=self._font("クイズ"),
             color="white",
             stroke_color="black", 
-            stroke_width=2,
+            stroke_width=self._px(2),
             method="label"
         )
         
         # Dimensions du texte avec padding
-        padding_x = 20
-        padding_y = 10
+        padding_x = self._px(20)
+        padding_y = self._px(10)
         text_w, text_h = text_clip.size
         bg_w = text_w + 2*padding_x
         bg_h = text_h + 2*padding_y
         
         # Rayon des coins arrondis
-        corner_radius = 15
+        corner_radius = self._px(15)
         
         # Création du fond avec coins arrondis
         bg_img, mask_img = self._make_background((bg_w, bg_h), (220, 20, 20), corner_radius)
         
-        # Création d'un clip de couleur pour le fond
-        bg_clip = ColorClip(size=(bg_w, bg_h), color=(220, 20, 20))
+        # Création d'un clip image pour le fond
+        bg_clip = ImageClip(bg_img)
         
         # Création d'un clip image pour le masque
         mask_clip = ImageClip(mask_img, is_mask=True)
@@ -385,7 +653,7 @@ class VideoCreator:
         final_text = CompositeVideoClip(
             [bg_clip, text_clip],
             size=(bg_w, bg_h)
-        ).with_position(('center', 150)).with_duration(total_duration)
+        ).with_position(('center', self._px(150))).with_duration(total_duration)
         
         # Ajout aux clips statiques
         static_clips.append(final_text)
@@ -395,99 +663,67 @@ class VideoCreator:
             y = first_question_y + i * padding
             dash_clip = TextClip(
                 text=f"{str(i+1)})",
-                font_size=60,
-                font=self.config["video"]["font"],
+                font_size=self._px(60),
+                font=self._font(f"{str(i+1)})"),
                 color=self.colors['text'],
                 stroke_color=self.colors['highlight'],
-                stroke_width=5,
+                stroke_width=self._px(5),
                 method="label"
-            ).with_position((130, y)).with_duration(total_duration)
+            ).with_position((self._px(130), y)).with_duration(total_duration)
             static_clips.append(dash_clip)
 
         # --- Ajouter les textes et audios dynamiquement
         i = 0
         for step in steps:
             if step["type"] == "answer":
-                y = first_question_y + i * padding + 2
-                x = 210
+                y = first_question_y + i * padding + self._px(2)
+                x = self._px(210)
                 if i >= 9:
-                    x+= 15
+                    x+= self._px(15)
                 text_clip = TextClip(
                     text=step["text"],
-                    font_size=80,
-                    font=self.config["video"]["font"],
+                    font_size=self._px(80),
+                    font=self._font(step["text"]),
                     color=self.colors['text'],
                     stroke_color=self.colors['highlight'],
-                    stroke_width=5,
+                    stroke_width=self._px(5),
                     method="label"
                 ).with_position((x, y)).with_start(step["start"]).with_duration(total_duration - step["duration"])
                 dynamic_clips.append(text_clip)
                 i += 1
 
             elif step["type"] == "timer":
-                timer_clip, timer_audio = self._create_progress_bar_timer_v2(step["duration"])
-                timer_clip = timer_clip.with_start(step["start"])
-                timer_audio = timer_audio.with_start(step["start"])
+                timer_clip = self._create_progress_bar_timer_v2(step["duration"]).with_start(step["start"])
                 dynamic_clips.append(timer_clip)
-                audio_clips.append(timer_audio)
-
-            if (step["type"] != "timer"):
-                audio_clip = AudioFileClip(step["audio_path"]).with_start(step["start"]).with_duration(step["duration"])
-                audio_clips.append(audio_clip)
-
-
-        # Définir la position des sous-titres.
-        subtitle_position = ('center', self.height * 0.2)  # Position par défaut
-                    
-        # Créer le générateur de sous-titres
-        make_textclip = lambda txt: self._create_subtitle_clip(txt, self.height)
-        
-        # Charger les sous-titres avec la position calculée
-        srt_file = 'temp/subtitles.srt'
-        subtitles = SubtitlesClip(srt_file, make_textclip=make_textclip).with_position(subtitle_position)
-        
-        #Charger la video de fond
-        background_video_file = self.config["video"]["background"];
-        background_video_path = self.config["path_assets"]["backgrounds"] + '/' + background_video_file
-        if background_video_file == "":
-            background_video_path = self.background_manager.get_background(first_question_text)
-        background_video_clip = VideoFileClip(background_video_path)
-        background_video_clip = background_video_clip.resized((self.width, self.height))
-        
-        if background_video_clip.duration < total_duration:
-            n_loops = int(total_duration / background_video_clip.duration) + 1
-            background_video_clip = loop(background_video_clip, n=n_loops)
+                animated_clip_ids.add(id(timer_clip))
         
-        background_video_clip = background_video_clip.subclipped(0, total_duration)
-        
-        # --- Créer la vidéo finale
-        # all_video_clips = [background_video_clip] + static_clips + dynamic_clips + [subtitles]
-        all_video_clips = [background_video_clip] + static_clips + dynamic_clips
-        video = CompositeVideoClip(all_video_clips, size=(self.width, self.height))
+        return static_clips, dynamic_clips, animated_clip_ids
 
-        # frame = video.get_frame(30)
-        # plt.imshow(frame)
-        # plt.axis('off')  # Supprime les axes
-        # plt.show()
-        # exit()
-
-                    
-        if audio_clips:
-            audio_clips.append(AudioFileClip(self.config["path_assets"]["music"] + '/' + self.config["music"]["background"]))
-            final_audio = CompositeAudioClip(audio_clips)
-            video = video.with_audio(final_audio)
-
-        # --- Export
-        output_path = str(self.temp_dir / self._get_unique_filename(prefix="final"))
-        video.with_duration(total_duration).write_videofile(
-            str(output_path),
-            fps=self.config["video"]["fps"],  # 24 ou + recommandé
-            codec='libx264',
-            audio_codec='aac',
-            preset='ultrafast',
-            threads=16,
-            logger="bar"
-        )
+    def _audio_cues_v2(self, steps: List) -> List[AudioCue]:
+        """
+        Décrit les sons de la vidéo v2 (voix, tic-tac des timers, musique de fond) sans
+        créer aucun clip : le rendu parallèle n'a besoin que de cela dans le processus principal.
+        
+        Args:
+            steps (List): Étapes calculées par calculate_duration_start_end
+            
+        Returns:
+            List[AudioCue]: Sons à mixer
+        """
+        fps = self.config["video"]["fps"]
+        audio_cues = []
+        for step in steps:
+            if step["type"] != "timer":
+                audio_cues.append(AudioCue(step["audio_path"], step["start"], step["duration"]))
+            elif int(step["duration"] * fps) > 0:
+                # Même condition que l'affichage du timer
+                timer_audio = self._timer_audio_cue(step["duration"], step["start"])
+                if timer_audio:
+                    audio_cues.append(timer_audio)
+        
+        if audio_cues:
+            audio_cues.append(self._music_cue())
+        return audio_cues
 
     def create_labeled_text(self, text, dash_fontsize, text_fontsize, y, width, colors, font):
         # Clip pour le tiret '-'
@@ -525,124 +761,15 @@ class VideoCreator:
 
         return labeled_clip
     def _create_progress_bar_timer(self, timer_duration: float, question_box: CompositeVideoClip, choices_boxes: List[CompositeVideoClip]) -> CompositeVideoClip:
-        # Paramètres du timer circulaire
-        circle_radius = 100  # Deux fois plus grand
-        circle_thickness = 20  # Épaisseur proportionnelle
-        circle_color = (255, 165, 0, 255)  # Orange
-        circle_bg_color = (40, 44, 52, 180)  # Fond gris foncé semi-transparent
-        text_color = (248, 248, 242, 255)    # Texte blanc
+        timer_sequence, timer_pos = self._create_timer_sequence(timer_duration, question_box, choices_boxes)
         
-        frames_per_second = self.config["video"]["fps"]
-        total_frames = int(timer_duration * frames_per_second)
-        
-        # Calcul de la position du timer
-        spacing = self.config["video"]["spacing"]
-        question_height = question_box.size[1]
-        question_y = self.height * 0.1
-        choices_total_height = sum(choice.size[1] for choice in choices_boxes)
-        total_spacing = spacing * len(choices_boxes)
-        
-        # Position au centre de l'écran sous les choix
-        timer_y = question_y + question_height + choices_total_height + total_spacing + 80  # Plus d'espace pour un timer plus grand
-        timer_y = min(timer_y, self.height * 0.8)
-        
-        # Créer les images pour chaque frame
-        frames = []
-        for frame in range(total_frames):
-            # Calculer le temps restant
-            progress = frame / total_frames
-            time_left = int(timer_duration - (frame / frames_per_second)) + 1
-            
-            # Créer une image pour le timer - plus grande
-            img = Image.new("RGBA", (2*circle_radius + 40, 2*circle_radius + 40), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(img)
-            
-            # Dessiner le cercle de fond
-            draw.ellipse(
-                [(20, 20), (20 + 2*circle_radius, 20 + 2*circle_radius)], 
-                outline=circle_bg_color, 
-                width=circle_thickness
-            )
-            
-            # Calculer l'angle pour l'arc de progression (360 degrés = cercle complet)
-            angle = int(360 * (1 - progress))
-            
-            # Dessiner l'arc de progression
-            # L'angle 0 est à droite (Est) et tourne dans le sens anti-horaire
-            draw.arc(
-                [(20, 20), (20 + 2*circle_radius, 20 + 2*circle_radius)],
-                start=270, 
-                end=(270 + angle) % 360,
-                fill=circle_color, 
-                width=circle_thickness
-            )
-            
-            # Ajouter le texte du temps restant
-            try:
-                font = ImageFont.truetype(self.config["video"]["font"], 80)  # Police plus grande
-            except:
-                font = ImageFont.load_default()
-                
-            # Position texte au centre du cercle
-            text_x = circle_radius + 20
-            text_y = circle_radius + 20
-            draw.text(
-                (text_x, text_y), 
-                str(time_left), 
-                fill=text_color, 
-                font=font, 
-                anchor="mm"
-            )
-            
-            # Convertir en array pour moviepy
-            frame_array = np.array(img)
-            frames.append(frame_array)
-        
-        # Créer les clips pour chaque image
-        timer_clips = []
-        for i, frame in enumerate(frames):
-            clip = ImageClip(frame)
-            clip = clip.with_duration(1/frames_per_second)
-            timer_clips.append(clip)
-        
-        # Créer un clip combinant toutes les images du timer
-        if timer_clips:
-            timer_sequence = concatenate_videoclips(timer_clips, method="compose")
-            timer_sequence = timer_sequence.with_duration(timer_duration)
-            
+        if timer_sequence is not None:
             # Préparer la question et les choix
             question_clip = question_box.with_duration(timer_duration)
             choices_clips = [choice.with_duration(timer_duration) for choice in choices_boxes]
             
-            # Positionner le timer au centre
-            timer_pos = ("center", timer_y)
-            
             # Ajouter le son beep_10
-            beep_path = os.path.join(self.config["path_assets"]["sound_effects"] + '/' + self.config["sound_effects"]["tick"])
-            
-            # Vérifier si le fichier audio existe
-            audio_clip = None
-            if os.path.exists(beep_path):
-                try:
-                    beep_audio = AudioFileClip(beep_path)
-                    
-                    # Si l'audio est plus court que le timer, créer une boucle
-                    if beep_audio.duration < timer_duration:
-                        # Calculer combien de fois il faut répéter l'audio
-                        repeats = int(timer_duration / beep_audio.duration) + 1
-                        # Créer une liste d'audio clips à concaténer
-                        beep_clips = [beep_audio] * repeats
-                        # Concaténer et couper à la durée exacte
-                        audio_clip = concatenate_audioclips(beep_clips).subclipped(0, timer_duration)
-                    else:
-                        # Sinon, couper l'audio à la durée du timer
-                        audio_clip = beep_audio.subclipped(0, timer_duration)
-                        
-                    logger.info(f"Son beep_10 ajouté au timer")
-                except Exception as e:
-                    logger.error(f"Erreur lors du chargement du son beep_10: {str(e)}")
-            else:
-                logger.warning(f"Fichier son beep_10 introuvable: {beep_path}")
+            audio_clip = self._create_timer_audio(timer_duration)
             
             # Créer le clip final avec question, choix et timer
             timer_clip = CompositeVideoClip(
@@ -662,6 +789,119 @@ class VideoCreator:
             blank = ColorClip(size=(self.width, self.height), color=(0, 0, 0, 0))
             return blank.with_duration(timer_duration)
 
+    def _create_timer_sequence(self, timer_duration: float, question_box: CompositeVideoClip, choices_boxes: List[CompositeVideoClip]):
+        """
+        Crée l'animation du timer circulaire placée sous les choix.
+        
+        Args:
+            timer_duration (float): Durée du timer en secondes
+            question_box (CompositeVideoClip): Boîte de la question
+            choices_boxes (List[CompositeVideoClip]): Boîtes des choix
+            
+        Returns:
+            tuple: (clip du timer, position) ou (None, None) si aucune frame
+        """
+        # Paramètres du timer circulaire
+        circle_radius = self._px(100)  # Deux fois plus grand
+        circle_thickness = self._px(20)  # Épaisseur proportionnelle
+        circle_color = (255, 165, 0, 255)  # Orange
+        circle_bg_color = (40, 44, 52, 180)  # Fond gris foncé semi-transparent
+        text_color = (248, 248, 242, 255)    # Texte blanc
+        
+        frames_per_second = self.config["video"]["fps"]
+        total_frames = int(timer_duration * frames_per_second)
+        
+        # Calcul de la position du timer
+        spacing = self.config["video"]["spacing"]
+        question_height = question_box.size[1]
+        question_y = self.height * 0.1
+        choices_total_height = sum(choice.size[1] for choice in choices_boxes)
+        total_spacing = spacing * len(choices_boxes)
+        
+        # Position au centre de l'écran sous les choix
+        timer_y = question_y + question_height + choices_total_height + total_spacing + self._px(80)  # Plus d'espace pour un timer plus grand
+        timer_y = min(timer_y, self.height * 0.8)
+        
+        if total_frames <= 0:
+            return None, None
+        
+        # Créer un clip combinant toutes les images du timer (rendues une seule fois puis mises en cache)
+        timer_sequence = self.timer_cache.get_clip(
+            timer_duration,
+            frames_per_second,
+            radius=circle_radius,
+            thickness=circle_thickness,
+            circle_color=circle_color,
+            circle_bg_color=circle_bg_color,
+            text_color=text_color,
+            font=self.config["video"]["font"],
+            font_size=self._px(80)
+        )
+        
+        # Positionner le timer au centre
+        return timer_sequence, ("center", timer_y)
+
+    def _create_timer_audio(self, timer_duration: float):
+        """
+        Crée le son du timer (beep_10) à la durée exacte du timer.
+        
+        Args:
+            timer_duration (float): Durée du timer en secondes
+            
+        Returns:
+            AudioClip: Son du timer, ou None si le fichier est introuvable
+        """
+        beep_path = os.path.join(self.config["path_assets"]["sound_effects"] + '/' + self.config["sound_effects"]["tick"])
+        
+        # Vérifier si le fichier audio existe
+        audio_clip = None
+        if os.path.exists(beep_path):
+            try:
+                # Son décodé une fois pour tout le processus, répété ou coupé à la durée du timer
+                audio_clip = self.audio_assets.get_clip(beep_path, timer_duration)
+                    
+                logger.info(f"Son beep_10 ajouté au timer")
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du son beep_10: {str(e)}")
+        else:
+            logger.warning(f"Fichier son beep_10 introuvable: {beep_path}")
+        return audio_clip
+
+    def _timer_audio_cue(self, timer_duration: float, start: float = 0):
+        """
+        Son du timer (beep_10) répété sur la durée exacte du timer, pour le mixeur audio.
+        
+        Args:
+            timer_duration (float): Durée du timer en secondes
+            start (float): Début du timer sur la timeline
+            
+        Returns:
+            AudioCue: Son du timer, ou None si le fichier est introuvable
+        """
+        beep_path = os.path.join(self.config["path_assets"]["sound_effects"] + '/' + self.config["sound_effects"]["tick"])
+        if not os.path.exists(beep_path):
+            logger.warning(f"Fichier son beep_10 introuvable: {beep_path}")
+            return None
+        return AudioCue(beep_path, start, duration=timer_duration, loop=True, asset=True)
+
+    def _speech_clip(self, path: str):
+        """
+        Clip audio d'une voix synthétisée, pris en mémoire dans le registre des voix
+        (sans lecteur FFmpeg) ; les autres fichiers sont ouverts avec AudioFileClip.
+
+        Args:
+            path (str): Chemin du fichier audio
+
+        Returns:
+            AudioClip: Clip audio de la voix
+        """
+        speech = get_speech_store().get(path)
+        if speech is None:
+            return AudioFileClip(path)
+        fps = self.audio_mixer.fps
+        pcm = np.repeat(speech.view(fps)[:, None], self.audio_mixer.channels, axis=1)
+        return AudioArrayClip(pcm, fps=fps)
+
     def concatenate_videos(self, video_clips: List[CompositeVideoClip], srt_file: str = None, audio_info: List[Dict] = None) -> str:
         """
         Concatène plusieurs clips vidéo en une seule vidéo.
@@ -705,7 +945,12 @@ class VideoCreator:
             total_duration = final_clip.duration
             
             # Gestion des sous-titres si fournis et activés dans la configuration
-            if self.config["subtitles"]["enabled"] and srt_file and os.path.exists(srt_file):
+            subtitles_path = None
+            if self.config["subtitles"]["enabled"] and srt_file and os.path.exists(srt_file) and self.subtitles_renderer == "ass":
+                # Incrustés par FFmpeg pendant l'encodage final
+                extra_spacing = self.config["subtitles"].get("extra_spacing", 30)
+                subtitles_path = self._create_subtitles_ass(srt_file, self.lowest_choices_y + extra_spacing)
+            elif self.config["subtitles"]["enabled"] and srt_file and os.path.exists(srt_file):
                 try:
                     logger.info(f"Ajout des sous-titres depuis {srt_file}")
                     
@@ -729,31 +974,14 @@ class VideoCreator:
                 except Exception as e:
                     logger.error(f"Erreur lors de l'ajout des sous-titres: {str(e)}")
             
-            # Vérification de la durée de la musique
-            music_duration = self.music.duration
-            if total_duration > music_duration:
-                # Si la vidéo est plus longue que la musique, on répète la musique
-                n_repeats = int(total_duration / music_duration) + 1
-                music_clips = [self.music] * n_repeats
-                music_clip = concatenate_audioclips(music_clips).subclipped(0, total_duration)
-            else:
-                # Sinon on prend juste la partie nécessaire
-                music_clip = self.music.subclipped(0, total_duration)
-            
-            # On s'assure que l'audio de la vidéo est valide
+            # Audio des vidéos et musique de fond mixés en une passe à l'export
+            audio_cues = [self._music_cue(total_duration)]
             if hasattr(final_clip, 'audio') and final_clip.audio is not None:
-                # Mixage de l'audio des vidéos avec la musique
-                final_audio = CompositeAudioClip([final_clip.audio, music_clip])
-                final_clip = final_clip.with_audio(final_audio)
-            else:
-                # Si pas d'audio, on utilise juste la musique
-                final_clip = final_clip.with_audio(music_clip)
+                audio_cues.insert(0, AudioCue(final_clip.audio, 0))
+                final_clip = final_clip.without_audio()
             
             # Récupération du fond vidéo, si aucun fond vidéo n'est défini, on génère un fond vidéo depuis une image génré par ia.
-            background_video_file = self.config["video"]["background"];
-            background_video_path = self.config["path_assets"]["backgrounds"] + '/' + background_video_file
-            if background_video_file == "":
-                background_video_path = self.background_manager.get_background(self.theme)
+            background_video_path = self._get_background(self.theme, total_duration)
             
             logger.info(f"Chemin de la vidéo de fond: {background_video_path}")
             output_path = str(self.temp_dir) + '/' + self._get_unique_filename(prefix="final")
@@ -761,55 +989,514 @@ class VideoCreator:
             if background_video_path:
                 try:
                     logger.info("Chargement de la vidéo de fond...")
-                    background_video_path = VideoFileClip(background_video_path)
-                    background_video_path = background_video_path.resized((self.width, self.height))
-                    
-                    if background_video_path.duration < total_duration:
-                        n_loops = int(total_duration / background_video_path.duration) + 1
-                        background_video_path = background_video_path.loop(n=n_loops)
-                    
-                    background_video_path = background_video_path.subclipped(0, total_duration)
+                    background_video_clip = self._load_background_clip(background_video_path, total_duration)
                     
                     # Création du clip composite final
                     final_clip = CompositeVideoClip(
-                        [background_video_path.with_position(('center', 'center')), final_clip.with_position(('center', 'center'))],
+                        [background_video_clip.with_position(('center', 'center')), final_clip.with_position(('center', 'center'))],
                         size=(self.width, self.height)
                     )
                     final_clip.fps = self.config["video"]["fps"]
                     
-                    if hasattr(final_clip, 'audio') and final_clip.audio is not None:
-                        final_clip = final_clip.with_audio(final_clip.audio)
-                    
                 except Exception as e:
                     logger.error(f"Erreur lors de la préparation du background: {str(e)}")
                     logger.error("Utilisation de la vidéo sans background")
                     
-            final_clip.write_videofile(
+            self._write_video(final_clip, output_path, audio_cues=audio_cues, subtitles_path=subtitles_path)
+            final_clip.close()
+            # Les sprites des sous-titres ne sont demandés qu'à l'encodage
+            self.sprite_cache.log_stats()
+            return str(output_path)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la concaténation des vidéos: {str(e)}")
+            raise
+
+    def create_scene(self, question_data: Dict, audio_info: List[Dict]) -> Scene:
+        """
+        Crée la scène d'une question sous forme de calques à plat pour le compositeur NumPy.
+        Même contenu et mêmes timings que create_video.
+        
+        Args:
+            question_data (Dict): Données de la question
+            audio_info (List[Dict]): Liste des informations audio (question puis réponse)
+            
+        Returns:
+            Scene: Calques, clips audio et durée de la question
+        """
+        try:
+            # Vérification que les fichiers audio existent
+            for info in audio_info:
+                audio_path = info['path']
+                if not os.path.exists(audio_path):
+                    raise FileNotFoundError(f"Le fichier audio {audio_path} n'existe pas")
+            
+            # Calcul des durées
+            part1_duration = audio_info[0]['duration']
+            timer_duration = 3.0  # Durée du timer
+            part2_duration = audio_info[1]['duration']
+            timer_start = part1_duration
+            answer_start = part1_duration + timer_duration
+            duration = answer_start + part2_duration
+            
+            question_box, choices_boxes, choices_boxes_part2 = self._create_question_boxes(question_data)
+            
+            # La question reste à la même place pendant toute la scène
+            layers = [self._layer_from_clip(question_box, 0, duration)]
+            # Choix pendant la question et le timer
+            layers += [self._layer_from_clip(box, 0, answer_start) for box in choices_boxes]
+            # Choix avec la bonne réponse en vert
+            layers += [self._layer_from_clip(box, answer_start, duration) for box in choices_boxes_part2]
+            
+            audio_cues = [
+                AudioCue(audio_info[0]['path'], 0),
+                AudioCue(audio_info[1]['path'], answer_start)
+            ]
+            
+            timer_sequence, timer_pos = self._create_timer_sequence(timer_duration, question_box, choices_boxes)
+            if timer_sequence is not None:
+                layers.append(self._layer_from_clip(timer_sequence.with_position(timer_pos), timer_start, answer_start, animated=True))
+                timer_audio = self._timer_audio_cue(timer_duration, timer_start)
+                if timer_audio:
+                    audio_cues.append(timer_audio)
+            
+            return Scene(layers, audio_cues, duration)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la création de la scène: {str(e)}")
+            raise
+
+    def concatenate_scenes(self, scenes: List[Scene], srt_file: str = None, audio_info: List[Dict] = None) -> str:
+        """
+        Assemble les scènes et exporte la vidéo finale avec le compositeur NumPy
+        (ou le backend FFmpeg).
+        
+        Args:
+            scenes (List[Scene]): Scènes des questions, dans l'ordre
+            srt_file (str, optional): Chemin vers le fichier SRT des sous-titres
+            audio_info (List[Dict], optional): Informations sur les fichiers audio
+            
+        Returns:
+            str: Chemin de la vidéo finale
+        """
+        try:
+            if not scenes:
+                raise ValueError("Aucune scène à assembler")
+            
+            # Mise à plat des calques et des sons sur la timeline globale
+            layers = []
+            audio_cues = []
+            offset = 0.0
+            for scene in scenes:
+                layers += [layer.shifted(offset) for layer in scene.layers]
+                audio_cues += [cue.shifted(offset) for cue in scene.audio_cues]
+                offset += scene.duration
+            total_duration = offset
+            
+            # Sous-titres sous le dernier choix : un calque par mot, ou un fichier ASS incrusté par FFmpeg
+            # (toujours avec le backend FFmpeg, où chaque calque serait une entrée du graphe de filtres)
+            subtitles_path = None
+            if self.config["subtitles"]["enabled"] and srt_file and os.path.exists(srt_file):
+                extra_spacing = self.config["subtitles"].get("extra_spacing", 30)
+                if self.subtitles_renderer == "ass" or self.render_backend == "ffmpeg":
+                    subtitles_path = self._create_subtitles_ass(srt_file, self.lowest_choices_y + extra_spacing)
+                else:
+                    layers += self._subtitle_layers(srt_file, self.lowest_choices_y + extra_spacing)
+                    self.sprite_cache.log_stats()
+            
+            # Musique de fond à la durée de la vidéo
+            audio_cues.append(self._music_cue(total_duration))
+            
+            output_path = str(self.temp_dir) + '/' + self._get_unique_filename(prefix="final")
+            background_video_path = self._get_background(self.theme, total_duration)
+            if self.render_backend == "ffmpeg":
+                self._write_video_ffmpeg(Scene(layers, audio_cues, total_duration), background_video_path, output_path,
+                                         subtitles_path=subtitles_path)
+                return output_path
+            
+            background = None
+            if background_video_path:
+                try:
+                    background = self._load_background_clip(background_video_path, total_duration).get_frame
+                except Exception as e:
+                    logger.error(f"Erreur lors de la préparation du background: {str(e)}")
+                    logger.error("Utilisation de la vidéo sans background")
+            
+            compositor = QuizCompositor((self.width, self.height), background=background)
+            compositor.add_layers(layers)
+            compositor.flatten_static()
+            final_clip = compositor.to_clip(total_duration)
+            
+            self._write_video(final_clip, output_path, audio_cues=audio_cues, subtitles_path=subtitles_path)
+            final_clip.close()
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'assemblage des scènes: {str(e)}")
+            raise
+
+    def _resolve_position(self, position, size) -> tuple:
+        """
+        Convertit une position moviepy ('center', nombres...) en coordonnées absolues.
+        
+        Args:
+            position (tuple): Position (x, y) telle que passée à with_position
+            size (tuple): Dimensions (largeur, hauteur) du clip
+            
+        Returns:
+            tuple: Coordonnées (x, y) en pixels
+        """
+        x, y = position
+        w, h = size
+        x_values = {"left": 0, "center": (self.width - w) / 2, "right": self.width - w}
+        y_values = {"top": 0, "center": (self.height - h) / 2, "bottom": self.height - h}
+        x = x_values[x] if isinstance(x, str) else x
+        y = y_values[y] if isinstance(y, str) else y
+        return int(x), int(y)
+
+    def _layer_from_clip(self, clip, start: float, end: float, animated: bool = False) -> Layer:
+        """
+        Rastérise un clip positionné en calque pour le compositeur NumPy.
+        
+        Args:
+            clip: Clip moviepy positionné avec with_position
+            start (float): Début d'affichage en secondes
+            end (float): Fin d'affichage en secondes
+            animated (bool): Rastériser toutes les frames du clip (timer) au lieu d'une seule
+            
+        Returns:
+            Layer: Calque RGBA prémultiplié
+        """
+        x, y = self._resolve_position(clip.pos(0), clip.size)
+        if not animated:
+            return Layer(rasterizer.premultiply(self._clip_to_rgba(clip)), x, y, start, end)
+        
+        fps = self.config["video"]["fps"]
+        total_frames = max(1, int(round((end - start) * fps)))
+        frames = np.stack([
+            rasterizer.premultiply(self._clip_to_rgba(clip, i / fps)) for i in range(total_frames)
+        ])
+        return Layer(frames, x, y, start, end, fps=fps)
+
+    def _flatten_static_clips(self, clips: List, duration: float) -> List[ImageClip]:
+        """
+        Fusionne des clips fixes (contenu et position constants) en overlays pré-aplatis.
+        
+        Args:
+            clips (List): Clips positionnés, affichés de 0 à duration
+            duration (float): Durée d'affichage
+            
+        Returns:
+            List[ImageClip]: Overlays équivalents
+        """
+        layers = [self._layer_from_clip(clip, 0, duration) for clip in clips]
+        overlays = []
+        for layer in flatten_static_layers(layers):
+            overlay = ImageClip(rasterizer.unpremultiply(layer.image))
+            overlays.append(overlay.with_position((layer.x, layer.y)).with_start(layer.start).with_duration(layer.end - layer.start))
+        return overlays
+
+    def _subtitle_layers(self, srt_file: str, y: float) -> List[Layer]:
+        """
+        Crée les calques des sous-titres mot par mot à partir d'un fichier SRT.
+        
+        Args:
+            srt_file (str): Chemin du fichier SRT
+            y (float): Position verticale des sous-titres
+            
+        Returns:
+            List[Layer]: Un calque par sous-titre, centré horizontalement
+        """
+        layers = []
+        for (start, end), text in file_to_subtitles(srt_file):
+            sprite = self._get_subtitle_sprite(text)
+            x = int((self.width - sprite.shape[1]) / 2)
+            layers.append(Layer(sprite, x, int(y), start, end))
+        return layers
+
+    def _create_subtitles_ass(self, srt_file: str, y: float) -> str:
+        """
+        Convertit le fichier SRT en sous-titres ASS à incruster pendant l'encodage final.
+        
+        Args:
+            srt_file (str): Chemin du fichier SRT
+            y (float): Position verticale des sous-titres
+            
+        Returns:
+            str: Chemin du fichier ASS
+        """
+        # Import local : le module charge WhisperX, inutile dans les processus de rendu
+        from src.srt_generator import SRTGenerator
+        return SRTGenerator(config=self.config).generate_ass(srt_file, (self.width, self.height), y)
+
+    def _music_cue(self, total_duration: float = None) -> AudioCue:
+        """
+        Musique de fond répétée sur toute la durée de la vidéo.
+        
+        Args:
+            total_duration (float, optional): Durée de la vidéo (défaut: jusqu'à la fin du mixage)
+            
+        Returns:
+            AudioCue: Musique de fond
+        """
+        return AudioCue(self.music_path, 0, duration=total_duration, loop=True, asset=True)
+
+    def _get_background(self, theme: str, total_duration: float):
+        """
+        Récupère le fond vidéo : fichier configuré, vidéo du thème, ou source de frames
+        générée depuis une image si aucun fond n'est configuré.
+        
+        Args:
+            theme (str): Texte utilisé pour générer le fond
+            total_duration (float): Durée de la vidéo finale
+            
+        Returns:
+            str | ZoomFrameSource: Chemin de la vidéo de fond ou source de frames
+        """
+        background_video_file = self.config["video"]["background"]
+        background_video_path = self.config["path_assets"]["backgrounds"] + '/' + background_video_file
+        if background_video_file == "":
+            background_video_path = self.background_manager.get_background_source(theme, total_duration)
+        return background_video_path
+
+    def _load_background_clip(self, background_video_path, total_duration: float) -> VideoClip:
+        """
+        Charge la vidéo de fond aux dimensions de la vidéo, bouclée si besoin, à la durée exacte.
+        
+        Les frames sont lues depuis la mezzanine du cache des fonds, déjà aux bonnes
+        dimensions et bouclée, ce qui évite tout redimensionnement pendant le rendu.
+        Une source de frames procédurale est utilisée directement, sans fichier.
+        
+        Args:
+            background_video_path (str | ZoomFrameSource): Chemin de la vidéo de fond ou source de frames
+            total_duration (float): Durée de la vidéo finale
+            
+        Returns:
+            VideoClip: Clip de fond
+        """
+        if not isinstance(background_video_path, str):
+            return background_video_path.to_clip()
+        
+        try:
+            background_video_path = self.background_cache.get(background_video_path, total_duration)
+        except Exception as e:
+            logger.warning(f"Mezzanine indisponible pour {background_video_path}, utilisation de la source: {str(e)}")
+        
+        background_video_clip = VideoFileClip(background_video_path, audio=False)
+        if tuple(background_video_clip.size) != (self.width, self.height):
+            background_video_clip = background_video_clip.resized((self.width, self.height))
+        
+        if background_video_clip.duration < total_duration:
+            n_loops = int(total_duration / background_video_clip.duration) + 1
+            background_video_clip = background_video_clip.with_effects([loop(n=n_loops)])
+        
+        return background_video_clip.subclipped(0, total_duration)
+
+    def _write_video(self, clip, output_path: str, audio_cues: List[AudioCue] = None, subtitles_path: str = None):
+        """
+        Encode la vidéo finale.
+        
+        Args:
+            clip: Clip à exporter
+            output_path (str): Chemin du fichier de sortie
+            audio_cues (List[AudioCue], optional): Sons mixés et multiplexés à la place de l'audio du clip
+            subtitles_path (str, optional): Sous-titres ASS à incruster pendant l'encodage
+        """
+        ffmpeg_params = None
+        if subtitles_path:
+            ffmpeg_params = ["-vf", ass_filter(subtitles_path, os.path.dirname(self.config["video"]["font"]))]
+        audio_path = self._write_audio(audio_cues, clip.duration, str(output_path)) if audio_cues is not None else None
+        try:
+            clip.write_videofile(
                 str(output_path),
-                fps=self.config["video"]["fps"],
+                fps=self.config["video"]["fps"],  # 24 ou + recommandé
                 codec='libx264',
+                audio=audio_path or True,
                 audio_codec='aac',
-                preset='ultrafast',
+                preset=self.preset,
                 threads=16,
+                ffmpeg_params=ffmpeg_params,
                 logger="bar"
             )
-            final_clip.close()
-            if 'background' in locals():
-                background_video_path.close()
-            return str(output_path)
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
             
-        except Exception as e:
-            logger.error(f"Erreur lors de la concaténation des vidéos: {str(e)}")
-            raise
+    def _write_audio(self, audio_cues: List[AudioCue], total_duration: float, output_path: str):
+        """
+        Mixe les sons en une passe dans un fichier AAC à part.
+        
+        Args:
+            audio_cues (List[AudioCue]): Sons positionnés sur la timeline
+            total_duration (float): Durée de la vidéo
+            output_path (str): Chemin de la vidéo, qui sert de préfixe au fichier audio
             
+        Returns:
+            str: Chemin du fichier audio, ou None s'il n'y a pas de son
+        """
+        if not audio_cues:
+            return None
+        return self.audio_mixer.write(audio_cues, total_duration, output_path + ".audio.m4a")
+
+    def _write_video_ffmpeg(self, scene: Scene, background, output_path: str, subtitles_path: str = None):
+        """
+        Exporte une vidéo décrite par des calques avec le backend FFmpeg : les calques
+        sont écrits en PNG et composés au-dessus du fond par un seul processus FFmpeg.
+        
+        Args:
+            scene (Scene): Calques et audios sur la timeline globale
+            background (str | ZoomFrameSource): Fond retourné par _get_background (ou None)
+            output_path (str): Chemin de la vidéo finale
+            subtitles_path (str, optional): Sous-titres ASS à incruster au-dessus des calques
+        """
+        temp_paths = []
+        background_path = None
+        try:
+            if isinstance(background, str):
+                try:
+                    background_path = self.background_cache.get(background, scene.duration)
+                except Exception as e:
+                    logger.warning(f"Mezzanine indisponible pour {background}, utilisation de la source: {str(e)}")
+                    background_path = background
+            elif background is not None:
+                # Fond procédural : FFmpeg a besoin d'un fichier
+                background_path = background.write_video(output_path + ".background.mp4")
+                temp_paths.append(background_path)
+            
+            audio_path = self._write_audio(scene.audio_cues, scene.duration, output_path)
+            if audio_path:
+                temp_paths.append(audio_path)
+            
+            renderer = FfmpegOverlayRenderer(
+                (self.width, self.height),
+                self.config["video"]["fps"],
+                cache_dir=str(self.cache_dir / "overlays"),
+                max_bytes=int(self.config.get("render", {}).get("overlay_cache_mb", 256) * 1024 * 1024)
+            )
+            renderer.render(flatten_static_layers(scene.layers), scene.duration, output_path,
+                            background_path=background_path, audio_path=audio_path, preset=self.preset,
+                            subtitles_path=subtitles_path, fonts_dir=os.path.dirname(self.config["video"]["font"]))
+        finally:
+            for path in temp_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write_video_engine(self, audio_cues: List[AudioCue], steps: List, total_duration: float, output_path: str,
+                            producers: int, background):
+        """
+        Encode la vidéo v2 avec le moteur de rendu : les frames sont produites par
+        plusieurs processus pendant que FFmpeg encode (voir RenderEngine).
+        
+        Args:
+            audio_cues (List[AudioCue]): Sons de la vidéo, mixés dans ce processus
+            steps (List): Étapes de la vidéo, pour reconstruire la vidéo dans chaque producteur
+            total_duration (float): Durée totale de la vidéo
+            output_path (str): Chemin de la vidéo finale
+            producers (int): Nombre de processus producteurs
+            background (str | ZoomFrameSource): Fond résolu une fois ici, partagé par les producteurs
+        """
+        audio_path = self._write_audio(audio_cues, total_duration, output_path)
+        try:
+            engine = RenderEngine(
+                V2FrameFactory(self.config, self.theme, steps, total_duration, background=background),
+                (self.width, self.height),
+                self.config["video"]["fps"],
+                producers=producers
+            )
+            engine.render(output_path, total_duration, audio_path=audio_path, preset=self.preset)
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
+
+    def _write_video_chunked(self, audio_cues: List[AudioCue], steps: List, total_duration: float, output_path: str,
+                             chunks: int, background):
+        """
+        Encode la vidéo v2 en parallèle : la timeline est découpée en morceaux aux
+        limites de frames, chaque morceau est rendu par un processus séparé, puis les
+        morceaux sont assemblés par copie de flux avec l'audio rendu une seule fois.
+        
+        Args:
+            audio_cues (List[AudioCue]): Sons de la vidéo, mixés dans ce processus
+            steps (List): Étapes de la vidéo, pour reconstruire la vidéo dans chaque processus
+            total_duration (float): Durée totale de la vidéo
+            output_path (str): Chemin de la vidéo finale
+            chunks (int): Nombre de morceaux (et de processus)
+            background (str | ZoomFrameSource): Fond résolu une fois ici, partagé par les processus
+        """
+        fps = self.config["video"]["fps"]
+        frame_ranges = split_frames(int(total_duration * fps), chunks)
+        chunk_paths = [f"{output_path}.part{i:03d}.mp4" for i in range(len(frame_ranges))]
+        # Les threads de l'encodeur sont répartis entre les processus
+        threads = max(1, 16 // len(frame_ranges))
+        logger.info(f"Rendu parallèle en {len(frame_ranges)} morceaux")
+        factory = V2FrameFactory(self.config, self.theme, steps, total_duration, background=background)
+        
+        audio_path = None
+        try:
+            with ProcessPoolExecutor(max_workers=len(frame_ranges), mp_context=get_context("spawn")) as executor:
+                futures = [
+                    executor.submit(_render_v2_chunk, factory, first_frame, last_frame, chunk_path, threads)
+                    for (first_frame, last_frame), chunk_path in zip(frame_ranges, chunk_paths)
+                ]
+                # L'audio est mixé ici pendant que les processus calculent les images
+                audio_path = self._write_audio(audio_cues, total_duration, output_path)
+                for future in futures:
+                    future.result()
+            
+            concat_chunks(chunk_paths, output_path, audio_path)
+            logger.info(f"Vidéo assemblée: {output_path}")
+        finally:
+            for path in chunk_paths + ([audio_path] if audio_path else []):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def prepare_texts(self, texts: List):
+        """
+        Prépare en une fois tous les textes de la série de questions : sous-ensemble de la
+        police réduit à leurs caractères (si render.font_subset est activé) et, en japonais,
+        découpage en mots mémorisé pour les boîtes de texte et les sous-titres.
+        
+        Args:
+            texts (List): Textes, questions ou étapes (les chaînes des dictionnaires et listes sont collectées)
+        """
+        strings = []
+        box_texts = []
+        def collect(value):
+            if isinstance(value, str):
+                strings.append(value)
+            elif isinstance(value, dict):
+                if {'question', 'choices', 'answer'} <= value.keys():
+                    question_text, choices_texts, correct_text = self._question_box_texts(value)
+                    box_texts.extend([question_text, *choices_texts, correct_text])
+                for item in value.values():
+                    collect(item)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    collect(item)
+        collect(texts)
+        if self.config["subtitles"]["language"] == "ja":
+            # Mêmes clés que les consommateurs : textes entiers pour les sous-titres et la voix,
+            # paragraphes des textes affichés (choix numérotés compris) pour les boîtes
+            paragraphs = [paragraph for text in box_texts for paragraph in text.split("\n")]
+            get_japanese_tokenizer().tokenize_batch(dict.fromkeys(strings + paragraphs))
+        # Caractères ASCII (numéros, ponctuation) et badge, toujours affichés
+        strings.append("".join(chr(code) for code in range(32, 127)) + "クイズ")
+        self.fonts.prepare_subset(self.config["video"]["font"], strings)
+
+    def _font(self, text: str = "") -> str:
+        """Retourne le fichier de la police configurée à utiliser pour un texte."""
+        return self.fonts.font_path(self.config["video"]["font"], text)
+
     def cleanup(self):
         """Nettoie les fichiers temporaires"""
+        self.fonts.log_stats()
+        self.text_layout.log_stats()
+        if self.config["subtitles"]["language"] == "ja":
+            get_japanese_tokenizer().log_stats()
         try:
             for file in self.temp_dir.glob("*"):
                 if file.is_file():  # On ne supprime que les fichiers
                     file.unlink()
-            if hasattr(self, 'music'):
-                self.music.close()
         except Exception as e:
             logger.error(f"Erreur lors du nettoyage des fichiers temporaires: {str(e)}")
 
@@ -825,41 +1512,53 @@ class VideoCreator:
         Returns:
             tuple: (fond, masque)
         """
-        w, h = size
-        mask = np.zeros((h, w), dtype=np.uint8)
-        
-        # Créer les coins arrondis
-        r = corner_radius
-        for i in range(h):
-            for j in range(w):
-                # Vérifier les quatre coins
-                if (j < r and i < r and (j-r)**2 + (i-r)**2 >= r**2) or \
-                    (j < r and i >= h-r and (j-r)**2 + (i-(h-r))**2 >= r**2) or \
-                    (j >= w-r and i < r and (j-(w-r))**2 + (i-r)**2 >= r**2) or \
-                    (j >= w-r and i >= h-r and (j-(w-r))**2 + (i-(h-r))**2 >= r**2):
-                    mask[i, j] = 0
-                else:
-                    mask[i, j] = 255
-                        
-        # Créer l'image de fond
-        color_array = np.array(bg_color).astype('uint8')
-        bg = np.zeros((h, w, 3), dtype=np.uint8)
-        for i in range(3):  # RGB channels
-            bg[:, :, i] = color_array[i]
-        
-        return bg, mask/255.0  # Normaliser le masque 
+        # Rastérisation vectorisée et mémoïsée par (taille, rayon, couleur)
+        return rasterizer.rounded_background(size, bg_color, corner_radius)
 
     def _create_subtitle_clip(self, txt, video_height):
         """
         Crée un clip de sous-titre stylisé avec fond arrondi, optimisé pour les mots individuels.
         Le positionnement est géré séparément dans concatenate_videos.
+        Le rendu de chaque mot est mis en cache sur disque (voir SpriteCache).
         
         Args:
             txt (str): Texte du sous-titre (un mot individuel)
             video_height (int): Hauteur de la vidéo (non utilisé pour le positionnement)
             
         Returns:
-            CompositeVideoClip: Clip du sous-titre
+            ImageClip: Clip du sous-titre
+        """
+        sprite_params = self._subtitle_sprite_params(txt)
+        return self.sprite_cache.get_clip(
+            sprite_params,
+            lambda: self._clip_to_rgba(self._render_subtitle_clip(**sprite_params))
+        )
+
+    def _get_subtitle_sprite(self, txt) -> np.ndarray:
+        """
+        Récupère le sprite d'un mot de sous-titre en RGBA prémultiplié (depuis le cache si possible).
+        
+        Args:
+            txt (str): Texte du sous-titre
+            
+        Returns:
+            np.ndarray: Sprite RGBA uint8 prémultiplié
+        """
+        sprite_params = self._subtitle_sprite_params(txt)
+        return self.sprite_cache.get_sprite(
+            sprite_params,
+            lambda: self._clip_to_rgba(self._render_subtitle_clip(**sprite_params))
+        )
+
+    def _subtitle_sprite_params(self, txt) -> dict:
+        """
+        Calcule les paramètres de style d'un mot de sous-titre, qui servent aussi de clé de cache.
+        
+        Args:
+            txt (str): Texte du sous-titre
+            
+        Returns:
+            dict: Paramètres de _render_subtitle_clip
         """
         # Paramètres des sous-titres tirés de la configuration
         font_size = self.config["subtitles"].get("font_size", 70)
@@ -877,14 +1576,36 @@ class VideoCreator:
         if len(txt.strip()) <= 3:
             adjusted_font_size = int(font_size * 1.3)  # 30% plus grand pour les petits mots
         
+        return {
+            "text": txt.strip(),
+            "font": self.config["video"]["font"],
+            "font_size": adjusted_font_size,
+            "bg_color": list(bg_color),
+            "text_color": text_color,
+            "stroke_color": stroke_color,
+            "stroke_width": stroke_width,
+            "padding": [padding_x, padding_y],
+            "corner_radius": corner_radius,
+        }
+
+    def _render_subtitle_clip(self, text, font, font_size, bg_color, text_color, stroke_color,
+                              stroke_width, padding, corner_radius) -> CompositeVideoClip:
+        """
+        Construit le clip d'un mot de sous-titre (texte sur fond arrondi).
+        
+        Returns:
+            CompositeVideoClip: Clip du sous-titre
+        """
+        padding_x, padding_y = padding
+        
         # Création du texte avec options optimisées
         text_clip = TextClip(
-            text=txt.strip(),
-            font_size=adjusted_font_size,
+            text=text,
+            font_size=font_size,
             color=text_color,
             stroke_color=stroke_color,
             stroke_width=stroke_width,
-            font=self.config["video"]["font"]
+            font=self.fonts.font_path(font, text)
         )
         
         # Obtenir la taille du texte et ajouter une marge
@@ -894,8 +1615,8 @@ class VideoCreator:
         # Création du fond avec coins arrondis
         bg_img, mask_img = self._make_background((bg_w, bg_h), bg_color, corner_radius)
         
-        # Création d'un clip de couleur pour le fond
-        bg_clip = ColorClip(size=(bg_w, bg_h), color=bg_color)
+        # Création d'un clip image pour le fond
+        bg_clip = ImageClip(bg_img)
         
         # Création d'un clip image pour le masque
         mask_clip = ImageClip(mask_img, is_mask=True)
@@ -911,6 +1632,27 @@ class VideoCreator:
         
         return final_clip
 
+    def _clip_to_rgba(self, clip, t: float = 0) -> np.ndarray:
+        """
+        Rastérise un clip à l'instant t en une image RGBA.
+        
+        Args:
+            clip: Clip moviepy (avec ou sans masque)
+            t (float): Instant à rastériser
+            
+        Returns:
+            np.ndarray: Image RGBA uint8 (alpha direct)
+        """
+        rgb = clip.get_frame(t)
+        h, w = rgb.shape[:2]
+        rgba = np.empty((h, w, 4), dtype=np.uint8)
+        rgba[:, :, :3] = np.clip(rgb, 0, 255)
+        if clip.mask is not None:
+            rgba[:, :, 3] = np.clip(np.round(clip.mask.get_frame(t) * 255), 0, 255)
+        else:
+            rgba[:, :, 3] = 255
+        return rgba
+
     def _format_time(self, seconds: float) -> str:
         """
         Convertit un nombre de secondes en format SRT (HH:MM:SS,mmm).
@@ -931,8 +1673,8 @@ class VideoCreator:
     
     def _create_progress_bar_timer_v2(self, timer_duration: float) -> CompositeVideoClip:
         # Paramètres du timer circulaire
-        circle_radius = 100  # Deux fois plus grand
-        circle_thickness = 20  # Épaisseur proportionnelle
+        circle_radius = self._px(100)  # Deux fois plus grand
+        circle_thickness = self._px(20)  # Épaisseur proportionnelle
         circle_color = (255, 165, 0, 255)  # Orange
         circle_bg_color = (40, 44, 52, 180)  # Fond gris foncé semi-transparent
         text_color = (248, 248, 242, 255)    # Texte blanc
@@ -944,93 +1686,24 @@ class VideoCreator:
         # TODO A CHANGER
         timer_y = self.height * 0.5  # Plus d'espace pour un timer plus grand
         
-        # Créer les images pour chaque frame
-        frames = []
-        for frame in range(total_frames):
-            # Calculer le temps restant
-            progress = frame / total_frames
-            time_left = int(timer_duration - (frame / frames_per_second)) + 1
-            
-            # Créer une image pour le timer - plus grande
-            img = Image.new("RGBA", (2*circle_radius + 40, 2*circle_radius + 40), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(img)
-            
-            # Dessiner le cercle de fond
-            draw.ellipse(
-                [(20, 20), (20 + 2*circle_radius, 20 + 2*circle_radius)], 
-                outline=circle_bg_color, 
-                width=circle_thickness
-            )
-            
-            # Calculer l'angle pour l'arc de progression (360 degrés = cercle complet)
-            angle = int(360 * (1 - progress))
-            
-            # Dessiner l'arc de progression
-            # L'angle 0 est à droite (Est) et tourne dans le sens anti-horaire
-            draw.arc(
-                [(20, 20), (20 + 2*circle_radius, 20 + 2*circle_radius)],
-                start=270, 
-                end=(270 + angle) % 360,
-                fill=circle_color, 
-                width=circle_thickness
-            )
-            
-            # Ajouter le texte du temps restant
-            try:
-                font = ImageFont.truetype(self.config["video"]["font"], 80)  # Police plus grande
-            except:
-                font = ImageFont.load_default()
-                
-            # Position texte au centre du cercle
-            text_x = circle_radius + 20
-            text_y = circle_radius + 20
-            
-            draw.text(
-                (text_x, text_y), 
-                str(time_left), 
-                fill=text_color, 
-                font=font, 
-                anchor="mm",
-                stroke_width=5,
+        # Créer un clip combinant toutes les images du timer (rendues une seule fois puis mises en cache)
+        if total_frames > 0:
+            timer_sequence = self.timer_cache.get_clip(
+                timer_duration,
+                frames_per_second,
+                radius=circle_radius,
+                thickness=circle_thickness,
+                circle_color=circle_color,
+                circle_bg_color=circle_bg_color,
+                text_color=text_color,
+                font=self.config["video"]["font"],
+                font_size=self._px(80),
+                stroke_width=self._px(5),
                 stroke_fill="black"
             )
-            # Convertir en array pour moviepy
-            frame_array = np.array(img)
-            frames.append(frame_array)
-        
-        # Créer les clips pour chaque image
-        timer_clips = []
-        for i, frame in enumerate(frames):
-            clip = ImageClip(frame)
-            clip = clip.with_duration(1/frames_per_second)
-            timer_clips.append(clip)
-        
-        # Créer un clip combinant toutes les images du timer
-        if timer_clips:
-            timer_sequence = concatenate_videoclips(timer_clips, method="compose")
-            timer_sequence = timer_sequence.with_duration(timer_duration)
             
             # Positionner le timer au centre
             timer_pos = ("center", timer_y)
             
-            # Ajouter le son beep_10
-            beep_path = os.path.join(self.config["path_assets"]["sound_effects"] + '/' + self.config["sound_effects"]["tick"])
-            
-            # Vérifier si le fichier audio existe
-            audio_clip = None
-            if os.path.exists(beep_path):
-                beep_audio = AudioFileClip(beep_path)
-                # Si l'audio est plus court que le timer, créer une boucle
-                if beep_audio.duration < timer_duration:
-                    # Calculer combien de fois il faut répéter l'audio
-                    repeats = int(timer_duration / beep_audio.duration) + 1
-                    # Créer une liste d'audio clips à concaténer
-                    beep_clips = [beep_audio] * repeats
-                    # Concaténer et couper à la durée exacte
-                    audio_clip = concatenate_audioclips(beep_clips).subclipped(0, timer_duration)
-                else:
-                    # Sinon, couper l'audio à la durée du timer
-                    audio_clip = beep_audio.subclipped(0, timer_duration)
-                    
-                logger.info(f"Son beep_10 ajouté au timer")
-            return timer_sequence.with_position(timer_pos), audio_clip
\ No newline at end of file
+            # Le son beep_10 est ajouté par _audio_cues_v2
+            return timer_sequence.with_position(timer_pos)
\ No newline at end of file
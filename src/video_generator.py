@@ -1,6 +1,19 @@
-from scripts.zoom_effect import ZoomEffect
+import math
+from scripts.zoom_effect import ZoomEffect, ZoomFrameSource
 
 class VideoGenerator:
+    # Paramètres de l'effet de zoom des fonds générés depuis une image
+    ZOOM_PARAMS = {
+        "zoom_factor": 1.1,
+        "fps": 30,
+        "blur": 0,
+        "width": 1080,
+        "height": 1920,
+        "movement": 0.1,
+        "movement_type": "none",
+        "zoom_time": 10
+    }
+
     def __init__(self, theme: str):
         # Chargement des variables d'environnement
         self.output_dir = "assets/backgrounds/videos"
@@ -11,12 +24,44 @@ class VideoGenerator:
             image_path=img_path,
             output_path=self.output_dir + '/' + self.clean_theme + '.mp4',
             duration=120,
-            zoom_factor=1.1,
-            fps=30,
-            blur=0,
-            width=1080,
-            height=1920,
-            movement=0.1,
-            movement_type="none",
-            zoom_time=10
-            )
\ No newline at end of file
+            **self.ZOOM_PARAMS
+            )
+
+    def create_background_source(self, img_path: str, duration: float, width: int = None, height: int = None,
+                                 fps: int = None, loopable: bool = False) -> ZoomFrameSource:
+        """
+        Crée une source de frames paresseuse pour le fond, à la durée exacte de la vidéo.
+
+        Args:
+            img_path (str): Chemin de l'image source
+            duration (float): Durée de la vidéo en secondes
+            width (int): Largeur de la vidéo (défaut: celle de ZOOM_PARAMS)
+            height (int): Hauteur de la vidéo (défaut: celle de ZOOM_PARAMS)
+            fps (int): Images par seconde (défaut: celles de ZOOM_PARAMS)
+            loopable (bool): Allonger la durée jusqu'à un nombre entier de cycles de zoom,
+                pour que la vidéo puisse être bouclée sans saut
+
+        Returns:
+            ZoomFrameSource: Source de frames du fond
+        """
+        params = dict(self.ZOOM_PARAMS)
+        params.update({key: value for key, value in (("width", width), ("height", height), ("fps", fps)) if value})
+        if loopable:
+            duration = self.loop_duration(duration, params["fps"])
+        return ZoomFrameSource.from_image(img_path, duration=duration, **params)
+
+    @classmethod
+    def loop_duration(cls, duration: float, fps: int) -> float:
+        """
+        Arrondit une durée au nombre entier de cycles de zoom supérieur, en frames entières.
+
+        Args:
+            duration (float): Durée minimale en secondes
+            fps (int): Images par seconde
+
+        Returns:
+            float: Durée d'un nombre entier de cycles de zoom
+        """
+        cycle_frames = max(1, int(round(cls.ZOOM_PARAMS["zoom_time"] * fps)))
+        cycles = max(1, math.ceil(duration * fps / cycle_frames - 1e-9))
+        return cycles * cycle_frames / fps
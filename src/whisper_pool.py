@@ -0,0 +1,154 @@
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class WhisperModelPool:
+    def __init__(self):
+        """
+        Modèles WhisperX du processus.
+
+        Chaque modèle de transcription (taille, device, compute_type, langue) et chaque
+        modèle d'alignement (langue, device) n'est chargé qu'une fois, puis réutilisé pour
+        tous les segments et toutes les vidéos. Les temps de chargement et d'inférence
+        sont comptés séparément.
+        """
+        self._models: Dict[Tuple[str, str, str, str], object] = {}
+        self._align_models: Dict[Tuple[str, str], tuple] = {}
+        # Un seul chargement à la fois : le préchargement et la première utilisation
+        # ne chargent pas deux fois le même modèle
+        self._lock = threading.Lock()
+        self.stats = {
+            "loads": 0,
+            "hits": 0,
+            "load_seconds": 0.0,
+            "transcriptions": 0,
+            "transcribe_seconds": 0.0,
+            "align_seconds": 0.0,
+        }
+
+    def model(self, model_size: str, device: str, compute_type: str, language: str):
+        """
+        Retourne le modèle de transcription, chargé au premier appel.
+
+        Args:
+            model_size (str): Taille du modèle Whisper ("medium"...)
+            device (str): "cpu" ou "cuda"
+            compute_type (str): "int8", "float16" ou "float32"
+            language (str): Code de langue
+
+        Returns:
+            Modèle WhisperX
+        """
+        key = (model_size, device, compute_type, language)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self.stats["hits"] += 1
+                return model
+            import whisperx
+            logger.info(f"Chargement du modèle Whisper {model_size} (device: {device}, compute_type: {compute_type})...")
+            start_time = time.perf_counter()
+            model = whisperx.load_model(model_size, device=device, compute_type=compute_type, language=language)
+            self._record_load(start_time)
+            self._models[key] = model
+            return model
+
+    def align_model(self, language: str, device: str) -> tuple:
+        """
+        Retourne le modèle d'alignement et ses métadonnées, chargés au premier appel.
+
+        Args:
+            language (str): Code de langue
+            device (str): "cpu" ou "cuda"
+
+        Returns:
+            tuple: (modèle d'alignement, métadonnées)
+        """
+        key = (language, device)
+        with self._lock:
+            align_model = self._align_models.get(key)
+            if align_model is not None:
+                self.stats["hits"] += 1
+                return align_model
+            import whisperx
+            logger.info(f"Chargement du modèle d'alignement ({language}, {device})...")
+            start_time = time.perf_counter()
+            align_model = whisperx.load_align_model(language_code=language, device=device)
+            self._record_load(start_time)
+            self._align_models[key] = align_model
+            return align_model
+
+    def _record_load(self, start_time: float):
+        elapsed = time.perf_counter() - start_time
+        self.stats["loads"] += 1
+        self.stats["load_seconds"] += elapsed
+        logger.info(f"Modèle chargé en {elapsed:.2f}s")
+
+    def transcribe(self, audio, model_size: str, device: str, compute_type: str, language: str) -> Tuple[dict, dict]:
+        """
+        Transcrit un audio 16 kHz puis aligne les mots, avec les modèles du pool.
+
+        Args:
+            audio (np.ndarray): Audio mono 16 kHz
+            model_size (str): Taille du modèle Whisper
+            device (str): "cpu" ou "cuda"
+            compute_type (str): Type de calcul du modèle
+            language (str): Code de langue
+
+        Returns:
+            Tuple[dict, dict]: Résultat de la transcription et résultat aligné
+        """
+        import whisperx
+        model = self.model(model_size, device, compute_type, language)
+        align_model, metadata = self.align_model(language, device)
+
+        start_time = time.perf_counter()
+        result = model.transcribe(audio, language=language)
+        transcribed_time = time.perf_counter()
+        aligned = whisperx.align(result["segments"], align_model, metadata, audio, device=device)
+        self.stats["transcriptions"] += 1
+        self.stats["transcribe_seconds"] += transcribed_time - start_time
+        self.stats["align_seconds"] += time.perf_counter() - transcribed_time
+        return result, aligned
+
+    def prewarm(self, model_size: str, device: str, compute_type: str, language: str):
+        """
+        Charge d'avance les modèles de transcription et d'alignement.
+
+        Args:
+            model_size (str): Taille du modèle Whisper
+            device (str): "cpu" ou "cuda"
+            compute_type (str): Type de calcul du modèle
+            language (str): Code de langue
+        """
+        try:
+            self.model(model_size, device, compute_type, language)
+            self.align_model(language, device)
+        except Exception as e:
+            logger.error(f"Erreur lors du préchargement de WhisperX: {str(e)}")
+
+    def log_stats(self):
+        """Affiche les temps de chargement et d'inférence dans les logs."""
+        logger.info(
+            f"WhisperX: {self.stats['loads']} modèles chargés en {self.stats['load_seconds']:.2f}s, "
+            f"{self.stats['hits']} réutilisations, {self.stats['transcriptions']} segments transcrits "
+            f"(transcription {self.stats['transcribe_seconds']:.2f}s, alignement {self.stats['align_seconds']:.2f}s)"
+        )
+
+# Pool partagé par tout le processus
+_whisper_pool: Optional[WhisperModelPool] = None
+
+def get_whisper_pool() -> WhisperModelPool:
+    """
+    Retourne le pool des modèles WhisperX du processus, créé au premier appel.
+
+    Returns:
+        WhisperModelPool: Pool partagé
+    """
+    global _whisper_pool
+    if _whisper_pool is None:
+        _whisper_pool = WhisperModelPool()
+    return _whisper_pool
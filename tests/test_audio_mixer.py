@@ -0,0 +1,52 @@
+import numpy as np
+
+from src.audio_mixer import AudioCue, AudioMixer
+
+class _ArrayCache:
+    """Cache des sons décodés réduit à des tableaux en mémoire."""
+
+    def __init__(self, sounds):
+        self.sounds = sounds
+
+    def get(self, path):
+        return self.sounds[path]
+
+def _mixer(sounds, fps=10):
+    return AudioMixer(fps=fps, channels=2, asset_cache=_ArrayCache(sounds))
+
+def _constant(value, samples):
+    return np.full((samples, 2), value, dtype=np.float32)
+
+def test_mix_places_cues_at_their_offsets():
+    mixer = _mixer({"a": _constant(0.25, 5), "b": _constant(0.5, 5)})
+    pcm = mixer.mix([AudioCue("a", 0.0, asset=True), AudioCue("b", 0.3, asset=True)], 1.0)
+    assert pcm.shape == (10, 2)
+    assert pcm.dtype == np.float32
+    np.testing.assert_allclose(pcm[:3, 0], 0.25)
+    np.testing.assert_allclose(pcm[3:5, 0], 0.75)
+    np.testing.assert_allclose(pcm[5:8, 0], 0.5)
+    np.testing.assert_allclose(pcm[8:, 0], 0.0)
+
+def test_mix_applies_gain_and_truncates_to_duration():
+    mixer = _mixer({"a": _constant(0.5, 20)})
+    pcm = mixer.mix([AudioCue("a", 0.5, duration=0.2, gain=0.5, asset=True)], 1.0)
+    np.testing.assert_allclose(pcm[:5, 0], 0.0)
+    np.testing.assert_allclose(pcm[5:7, 0], 0.25)
+    np.testing.assert_allclose(pcm[7:, 0], 0.0)
+
+def test_mix_tiles_looped_sources():
+    ramp = np.repeat(np.arange(3, dtype=np.float32)[:, None] / 10, 2, axis=1)
+    mixer = _mixer({"music": ramp})
+    pcm = mixer.mix([AudioCue("music", 0.2, loop=True, asset=True)], 1.0)
+    np.testing.assert_allclose(pcm[:2, 0], 0.0)
+    np.testing.assert_allclose(pcm[2:, 0], [0.0, 0.1, 0.2, 0.0, 0.1, 0.2, 0.0, 0.1], atol=1e-7)
+
+def test_mix_clips_sum_and_skips_late_cues():
+    mixer = _mixer({"a": _constant(0.8, 10)})
+    pcm = mixer.mix([AudioCue("a", 0.0, asset=True), AudioCue("a", 0.0, asset=True),
+                     AudioCue("a", 2.0, asset=True)], 1.0)
+    np.testing.assert_allclose(pcm, 1.0)
+
+def test_shifted_cue_keeps_settings():
+    cue = AudioCue("a", 1.0, duration=2.0, gain=0.3, loop=True, asset=True).shifted(0.5)
+    assert (cue.start, cue.duration, cue.gain, cue.loop, cue.asset) == (1.5, 2.0, 0.3, True, True)
@@ -0,0 +1,107 @@
+import numpy as np
+
+from src import rasterizer
+from src.compositor import Layer, QuizCompositor, _over, flatten_static_layers
+
+def _layer(color, size, x, y, start, end):
+    rgba = np.empty((size[1], size[0], 4), dtype=np.uint8)
+    rgba[:, :] = color
+    return Layer(rasterizer.premultiply(rgba), x, y, start, end)
+
+def _render(layers, t, size=(64, 48)):
+    compositor = QuizCompositor(size, background_color=(10, 200, 30))
+    compositor.add_layers(layers)
+    return compositor.render_frame(t).copy()
+
+def test_over_opaque_source_replaces_target():
+    target = np.full((2, 2, 4), 77, dtype=np.uint8)
+    source = np.array([[[1, 2, 3, 255]] * 2] * 2, dtype=np.uint8)
+    _over(target, source)
+    assert (target == source).all()
+
+def test_over_transparent_source_keeps_target():
+    target = np.full((2, 2, 4), 77, dtype=np.uint8)
+    _over(target, np.zeros((2, 2, 4), dtype=np.uint8))
+    assert (target == 77).all()
+
+def test_over_half_alpha():
+    target = np.array([[[200, 0, 0, 255]]], dtype=np.uint8)
+    source = rasterizer.premultiply(np.array([[[0, 0, 255, 128]]], dtype=np.uint8))
+    _over(target, source)
+    # 200 * 127 / 255 ≈ 100 ; bleu prémultiplié 128 ; alpha reste opaque
+    assert target[0, 0].tolist() == [100, 0, 128, 255]
+
+def test_render_frame_blends_active_layers_only():
+    red = _layer((255, 0, 0, 255), (10, 10), 5, 5, 0.0, 1.0)
+    blue = _layer((0, 0, 255, 255), (10, 10), 40, 20, 1.0, 2.0)
+    frame = _render([red, blue], 0.5)
+    assert frame[10, 10].tolist() == [255, 0, 0]
+    assert frame[25, 45].tolist() == [10, 200, 30]
+    frame = _render([red, blue], 1.0)
+    assert frame[10, 10].tolist() == [10, 200, 30]
+    assert frame[25, 45].tolist() == [0, 0, 255]
+
+def test_render_frame_clips_layers_to_frame():
+    layer = _layer((255, 255, 255, 255), (20, 20), -10, 40, 0.0, 1.0)
+    frame = _render([layer], 0.0)
+    assert (frame[40:, :10] == 255).all()
+    assert frame[39, 0].tolist() == [10, 200, 30]
+
+def test_animated_layer_frame_at():
+    frames = np.zeros((3, 2, 2, 4), dtype=np.uint8)
+    for i in range(3):
+        frames[i, :, :] = (i * 100, 0, 0, 255)
+    layer = Layer(frames, 0, 0, 1.0, 2.0, fps=3)
+    assert layer.frame_at(1.0)[0, 0, 0] == 0
+    assert layer.frame_at(1.4)[0, 0, 0] == 100
+    assert layer.frame_at(1.99)[0, 0, 0] == 200
+    assert layer.frame_at(5.0)[0, 0, 0] == 200
+
+def test_flatten_static_layers_merges_and_matches_unflattened_render():
+    layers = [
+        _layer((255, 0, 0, 255), (30, 10), 0, 0, 0.0, 3.0),
+        _layer((0, 255, 0, 128), (20, 20), 10, 5, 1.0, 2.0),
+        _layer((0, 0, 255, 200), (10, 10), 50, 30, 0.0, 3.0),
+    ]
+    flattened = flatten_static_layers(layers, min_gap=4)
+    assert all(not layer.animated for layer in flattened)
+    for t in (0.0, 0.5, 1.0, 1.5, 2.0, 2.9):
+        expected = _render(layers, t).astype(np.int16)
+        actual = _render(flattened, t).astype(np.int16)
+        # Fusion entière : l'ordre des arrondis change d'au plus une unité par calque
+        assert np.abs(expected - actual).max() <= 2
+
+def test_flatten_static_layers_keeps_static_layer_above_animated_one():
+    frames = np.zeros((2, 10, 10, 4), dtype=np.uint8)
+    frames[:, :, :] = (255, 255, 255, 255)
+    animated = Layer(frames, 0, 0, 0.0, 1.0, fps=2)
+    above = _layer((255, 0, 0, 255), (5, 5), 2, 2, 0.0, 1.0)
+    apart = _layer((0, 0, 255, 255), (5, 5), 40, 30, 0.0, 1.0)
+    flattened = flatten_static_layers([animated, above, apart])
+    # Le calque qui recouvre le calque animé reste au-dessus de lui
+    assert flattened.index(animated) < flattened.index(above)
+    assert _render(flattened, 0.2)[3, 3].tolist() == [255, 0, 0]
+
+def _word_layers(count, y=40):
+    return [_layer((255, 255, 0, 255), (8, 4), 20, y, i * 0.3, (i + 1) * 0.3) for i in range(count)]
+
+def test_flatten_static_layers_leaves_short_lived_layers_alone():
+    question = _layer((255, 0, 0, 255), (60, 10), 2, 2, 0.0, 100.0)
+    choices = _layer((0, 255, 0, 255), (60, 10), 2, 14, 0.0, 100.0)
+    words = _word_layers(300)
+    flattened = flatten_static_layers([question, choices] + words)
+    # Un seul overlay pour la question et les choix, les mots restent des calques à part
+    assert len(flattened) == 1 + len(words)
+    assert flattened[1:] == words
+
+def test_flatten_static_layers_reuses_unchanged_bands():
+    question = _layer((255, 0, 0, 255), (60, 10), 2, 2, 0.0, 100.0)
+    choices = _layer((0, 255, 0, 255), (60, 10), 2, 14, 0.0, 100.0)
+    words = _word_layers(300)
+    flattened = flatten_static_layers([question, choices] + words, min_gap=4, min_duration=0.0)
+    question_bands = [layer for layer in flattened if layer.y < 30]
+    # La bande de la question n'est fusionnée qu'une fois et couvre toute la vidéo
+    assert len(question_bands) == 1
+    assert (question_bands[0].start, question_bands[0].end) == (0.0, 100.0)
+    # Une bande par mot au plus, sans copie de la bande de la question
+    assert len(flattened) <= 1 + len(words)
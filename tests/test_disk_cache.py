@@ -0,0 +1,48 @@
+import os
+
+from src.disk_cache import DiskCache
+
+def _write(size):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    return write
+
+def test_put_and_get_with_metadata(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1000, suffix=".bin")
+    key = DiskCache.make_key({"text": "bonjour", "size": 12})
+    assert cache.get(key) is None
+    path = cache.put(key, _write(10), metadata={"duration": 1.5})
+    assert cache.get(key) == path
+    assert cache.get_metadata(key) == {"duration": 1.5}
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1 and cache.stats["writes"] == 1
+    assert not list(tmp_path.glob("*.tmp*"))
+
+def test_make_key_ignores_dict_order():
+    assert DiskCache.make_key({"a": 1, "b": 2}) == DiskCache.make_key({"b": 2, "a": 1})
+    assert DiskCache.make_key({"a": 1}) != DiskCache.make_key({"a": 2})
+
+def test_evicts_least_recently_used_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=250, suffix=".bin")
+    for index, key in enumerate(["old", "used", "new"]):
+        cache.put(key, _write(100), metadata={"index": index})
+        # Dates d'accès distinctes, dans l'ordre d'écriture
+        os.utime(cache.path_for(key), (1000 + index, 1000 + index))
+    # Le troisième ajout dépasse la taille : les plus anciennes entrées sont supprimées
+    assert cache.get("old") is None
+    assert cache.get_metadata("old") is None
+    assert cache.get("used") is not None and cache.get("new") is not None
+    assert cache.stats["evictions"] == 1
+
+def test_get_refreshes_entry_before_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=250, suffix=".bin")
+    cache.put("first", _write(100))
+    cache.put("second", _write(100))
+    os.utime(cache.path_for("first"), (1000, 1000))
+    os.utime(cache.path_for("second"), (2000, 2000))
+    # Lire la première entrée la rend plus récente que la seconde
+    cache.get("first")
+    cache.put("third", _write(100))
+    assert cache.path_for("first").exists()
+    assert not cache.path_for("second").exists()
+    assert cache.path_for("third").exists()
@@ -0,0 +1,48 @@
+from src.draft import draft_config
+
+def _config():
+    return {
+        "video": {"width": 1080, "height": 1920, "fps": 30, "spacing": 40,
+                  "question_font_size": 70, "choices_font_size": 60},
+        "subtitles": {"font_size": 70, "stroke_width": 1, "corner_radius": 0, "padding_x": 20},
+        "render": {"preset": "medium", "cache_procedural_background": True},
+        "draft": {"scale": 0.35, "fps": 12},
+    }
+
+def test_draft_scales_video_and_layout():
+    config = _config()
+    draft = draft_config(config)
+    assert (draft["video"]["width"], draft["video"]["height"]) == (378, 672)
+    assert draft["video"]["width"] % 2 == 0 and draft["video"]["height"] % 2 == 0
+    assert draft["video"]["fps"] == 12
+    assert draft["video"]["scale"] == 0.35
+    assert draft["video"]["spacing"] == 14
+    assert draft["video"]["question_font_size"] == 24
+    assert draft["subtitles"]["font_size"] == 24
+    assert draft["render"]["preset"] == "ultrafast"
+    assert draft["render"]["cache_procedural_background"] is False
+
+def test_draft_keeps_small_and_zero_lengths():
+    draft = draft_config(_config())
+    # Une longueur non nulle ne disparaît pas, une longueur nulle reste nulle
+    assert draft["subtitles"]["stroke_width"] == 1
+    assert draft["subtitles"]["corner_radius"] == 0
+
+def test_draft_does_not_modify_config():
+    config = _config()
+    draft_config(config)
+    assert config == _config()
+
+def test_draft_odd_dimensions_round_to_even():
+    config = _config()
+    config["video"]["width"] = 721
+    config["draft"]["scale"] = 0.5
+    assert draft_config(config)["video"]["width"] == 360
+
+def test_draft_defaults_and_existing_scale():
+    config = _config()
+    del config["draft"]
+    config["video"]["scale"] = 0.5
+    draft = draft_config(config)
+    assert draft["video"]["fps"] == 15
+    assert draft["video"]["scale"] == 0.35 * 0.5
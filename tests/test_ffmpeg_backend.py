@@ -0,0 +1,65 @@
+import subprocess
+
+import numpy as np
+import pytest
+from moviepy.config import FFMPEG_BINARY
+
+from src import rasterizer
+from src.compositor import Layer, QuizCompositor
+from src.ffmpeg_backend import FfmpegOverlayRenderer
+
+SIZE = (96, 64)
+FPS = 10
+
+def _layer(color, size, x, y, start, end):
+    rgba = np.empty((size[1], size[0], 4), dtype=np.uint8)
+    rgba[:, :] = color
+    return Layer(rasterizer.premultiply(rgba), x, y, start, end)
+
+def _layers():
+    return [
+        _layer((220, 40, 40, 255), (48, 24), 8, 8, 0.0, 2.0),
+        _layer((40, 40, 220, 160), (40, 24), 40, 24, 0.5, 1.5),
+        _layer((240, 240, 240, 200), (16, 16), 72, 40, 1.0, 2.0),
+        _layer((240, 240, 240, 200), (16, 16), 8, 40, 0.0, 1.0),
+    ]
+
+def _decode(path):
+    cmd = [FFMPEG_BINARY, "-loglevel", "error", "-i", str(path), "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+    data = subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, SIZE[1], SIZE[0], 3)
+
+def _psnr(a, b):
+    mse = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+def test_ffmpeg_render_matches_numpy_compositor_within_tolerance(tmp_path):
+    layers = _layers()
+    output_path = tmp_path / "out.mp4"
+    renderer = FfmpegOverlayRenderer(SIZE, FPS, str(tmp_path / "overlays"), background_color=(20, 120, 60))
+    renderer.render(layers, 2.0, str(output_path))
+    frames = _decode(output_path)
+    assert len(frames) == 2 * FPS
+
+    compositor = QuizCompositor(SIZE, background_color=(20, 120, 60))
+    compositor.add_layers(layers)
+    for index in range(0, len(frames), 3):
+        expected = compositor.render_frame(index / FPS)
+        # Alpha direct, yuv420p et x264 : proche du rendu NumPy, pas identique
+        assert _psnr(frames[index], expected) > 30
+
+def test_identical_images_share_one_input(tmp_path):
+    renderer = FfmpegOverlayRenderer(SIZE, FPS, str(tmp_path / "overlays"))
+    layers = [_layer((255, 255, 255, 255), (8, 8), 4 * i, 4, i * 0.1, (i + 1) * 0.1) for i in range(12)]
+    renderer.render(layers, 1.2, str(tmp_path / "out.mp4"))
+    # Un seul PNG pour les douze calques
+    assert len(list((tmp_path / "overlays").glob("*.png"))) == 1
+
+def test_png_cache_is_bounded(tmp_path):
+    renderer = FfmpegOverlayRenderer(SIZE, FPS, str(tmp_path / "overlays"), max_bytes=1)
+    layers = [_layer((10 * i, 0, 0, 255), (8, 8), 0, 0, i * 0.1, (i + 1) * 0.1) for i in range(5)]
+    # Les PNG évincés pendant le rendu sont recopiés dans le répertoire de travail
+    renderer.render(layers, 0.5, str(tmp_path / "out.mp4"))
+    assert len(list((tmp_path / "overlays").glob("*.png"))) <= 1
+    assert renderer.png_cache.stats["evictions"] >= 4
+    assert (tmp_path / "out.mp4").exists()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src import rasterizer
+
+def test_rounded_rect_mask_corners_and_center():
+    mask = rasterizer.rounded_rect_mask((40, 30), 10)
+    assert mask.shape == (30, 40)
+    assert mask[0, 0] == 0.0
+    assert mask[-1, -1] == 0.0
+    assert mask[15, 20] == 1.0
+    # Bords droits du rectangle entièrement couverts
+    assert mask[15, 0] == 1.0 and mask[0, 20] == 1.0
+    assert ((mask >= 0.0) & (mask <= 1.0)).all()
+
+def test_rounded_rect_mask_without_radius_is_full():
+    assert (rasterizer.rounded_rect_mask((5, 4), 0) == 1.0).all()
+
+def test_rounded_rect_mask_is_memoized_and_read_only():
+    mask = rasterizer.rounded_rect_mask((20, 20), 5)
+    assert rasterizer.rounded_rect_mask([20, 20], 5) is mask
+    with pytest.raises(ValueError):
+        mask[0, 0] = 1.0
+
+def test_rounded_background_uses_rgb_fill():
+    background, mask = rasterizer.rounded_background((8, 6), [220, 20, 20], 2)
+    assert background.shape == (6, 8, 3)
+    assert (background == (220, 20, 20)).all()
+    assert mask.shape == (6, 8)
+
+def test_bordered_box_border_and_fill():
+    box = rasterizer.bordered_box((10, 8), (0, 0, 255), (255, 0, 0, 128), border_width=3)
+    assert box.shape == (8, 10, 4)
+    # Bords haut et gauche : toute l'épaisseur ; bas et droit : épaisseur - 1
+    assert (box[:3, :] == (255, 0, 0, 128)).all()
+    assert (box[:, :3] == (255, 0, 0, 128)).all()
+    assert (box[-2:, :] == (255, 0, 0, 128)).all()
+    assert (box[:, -2:] == (255, 0, 0, 128)).all()
+    assert (box[3:-2, 3:-2] == (0, 0, 255, 255)).all()
+
+def test_premultiply_known_values():
+    rgba = np.array([[[200, 100, 50, 255], [200, 100, 50, 0], [255, 255, 255, 128]]], dtype=np.uint8)
+    result = rasterizer.premultiply(rgba)
+    assert result[0, 0].tolist() == [200, 100, 50, 255]
+    assert result[0, 1].tolist() == [0, 0, 0, 0]
+    assert result[0, 2].tolist() == [128, 128, 128, 128]
+
+def test_unpremultiply_round_trip_error_bound():
+    rng = np.random.default_rng(0)
+    rgba = rng.integers(0, 256, size=(64, 64, 4), dtype=np.uint8)
+    restored = rasterizer.unpremultiply(rasterizer.premultiply(rgba))
+    alpha = rgba[:, :, 3].astype(np.int32)
+    error = np.abs(restored[:, :, :3].astype(np.int32) - rgba[:, :, :3]).max(axis=2)
+    visible = alpha > 0
+    # Perte bornée par le pas de quantification du prémultiplié : 255 / (2 * alpha), arrondi
+    assert (error[visible] <= np.ceil(255 / (2 * alpha[visible]))).all()
+    assert (restored[alpha == 255] == rgba[alpha == 255]).all()
+    assert (restored[:, :, 3] == rgba[:, :, 3]).all()
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from src.render_engine import RenderEngine
+
+SIZE = (64, 48)
+
+class _FlatFactory:
+    """Frames unies dont la teinte suit le temps (sérialisable pour les producteurs)."""
+
+    def __call__(self):
+        def frame(t):
+            return np.full((SIZE[1], SIZE[0], 3), int(t * 50) % 256, dtype=np.uint8)
+        return frame
+
+def test_render_encodes_every_frame(tmp_path):
+    output_path = tmp_path / "video.mp4"
+    RenderEngine(_FlatFactory(), SIZE, 10, producers=2).render(str(output_path), 2.0)
+    assert output_path.stat().st_size > 0
+
+def test_render_surfaces_ffmpeg_error_when_encoder_exits_early(tmp_path):
+    # Dossier de sortie absent : FFmpeg s'arrête et le tube se ferme pendant l'écriture des frames
+    output_path = tmp_path / "absent" / "video.mp4"
+    engine = RenderEngine(_FlatFactory(), SIZE, 10, producers=2)
+    with pytest.raises(RuntimeError, match=r"code [1-9].*absent"):
+        engine.render(str(output_path), 60.0)
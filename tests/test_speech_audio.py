@@ -0,0 +1,51 @@
+import wave
+
+import numpy as np
+import pytest
+
+from src.audio_cache import decode_file
+from src.speech_audio import resample
+
+SOURCE_RATE = 24000
+
+def _write_wav(path, pcm, sample_rate=SOURCE_RATE):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.round(pcm * 32767).astype("<i2").tobytes())
+
+def _voice_like(duration=0.7):
+    # Signal non nul aux deux bords : un rééchantillonnage circulaire y ferait des échos
+    t = np.arange(int(duration * SOURCE_RATE)) / SOURCE_RATE
+    return 0.4 * np.sin(2 * np.pi * 440 * t + 1) + 0.3 * np.sin(2 * np.pi * 3000 * t + 0.3) + 0.1
+
+@pytest.mark.parametrize("target_rate", [44100, 16000, 48000, 22050])
+def test_resample_matches_ffmpeg_including_edges(tmp_path, target_rate):
+    path = tmp_path / "voix.wav"
+    _write_wav(path, _voice_like())
+    with wave.open(str(path), "rb") as wav:
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768.0
+    expected = decode_file(str(path), target_rate, 1)[:, 0]
+    actual = resample(pcm, SOURCE_RATE, target_rate)
+    assert actual.dtype == np.float32
+    assert len(actual) == len(expected)
+    error = np.abs(actual - expected)
+    edge = int(0.005 * target_rate)
+    assert error[:edge].max() < 0.01
+    assert error[-edge:].max() < 0.01
+    assert error[edge:-edge].max() < 1e-3
+
+def test_resample_does_not_wrap_the_end_into_the_start():
+    pcm = np.zeros(SOURCE_RATE, dtype=np.float32)
+    pcm[-200:] = 0.9
+    output = resample(pcm, SOURCE_RATE, 44100)
+    # Le début reste silencieux malgré la fin forte
+    assert np.abs(output[:40000]).max() < 1e-3
+    assert np.abs(output[-100:] - 0.9).max() < 0.05
+
+def test_resample_same_rate_and_short_signals():
+    pcm = np.array([0.5], dtype=np.float32)
+    assert resample(pcm, SOURCE_RATE, SOURCE_RATE) is pcm
+    assert len(resample(pcm, SOURCE_RATE, 48000)) == 2
+    assert len(resample(np.zeros(0, dtype=np.float32), SOURCE_RATE, 16000)) == 0
@@ -0,0 +1,36 @@
+import numpy as np
+
+from src import rasterizer
+from src.sprite_cache import SpriteCache
+
+def _sprite():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, size=(12, 20, 4), dtype=np.uint8)
+
+def test_clip_keeps_rendered_pixels(tmp_path):
+    cache = SpriteCache(str(tmp_path))
+    sprite = _sprite()
+    clip = cache.get_clip({"text": "mot"}, lambda: sprite.copy())
+    # Aucun aller-retour par l'alpha prémultiplié pour moviepy
+    assert (clip.get_frame(0) == sprite[:, :, :3]).all()
+    np.testing.assert_allclose(clip.mask.get_frame(0), sprite[:, :, 3] / 255)
+
+def test_sprite_is_premultiplied_and_rendered_once(tmp_path):
+    cache = SpriteCache(str(tmp_path))
+    renders = []
+    def render():
+        renders.append(1)
+        return _sprite()
+    premultiplied = cache.get_sprite({"text": "mot"}, render)
+    assert (premultiplied == rasterizer.premultiply(_sprite())).all()
+    assert (cache.get_rgba({"text": "mot"}, render) == _sprite()).all()
+    assert len(renders) == 1
+    assert cache.stats["memory_hits"] == 1
+
+def test_sprite_is_read_back_from_disk(tmp_path):
+    SpriteCache(str(tmp_path)).get_rgba({"text": "mot"}, _sprite)
+    cache = SpriteCache(str(tmp_path))
+    def render():
+        raise AssertionError("le sprite devrait venir du disque")
+    assert (cache.get_rgba({"text": "mot"}, render) == _sprite()).all()
+    assert cache.stats["hits"] == 1
@@ -0,0 +1,84 @@
+from PIL import ImageFont
+
+from src.text_layout import NO_LINE_END, NO_LINE_START, TextLayoutEngine
+
+FONT = "default"
+SIZE = 20
+
+class _DefaultFonts:
+    """Registre réduit à la police intégrée à Pillow (aucun fichier de police nécessaire)."""
+
+    def __init__(self):
+        self._faces = {}
+
+    def get(self, path, size, index=0):
+        if size not in self._faces:
+            self._faces[size] = ImageFont.load_default(size)
+        return self._faces[size]
+
+def _engine():
+    return TextLayoutEngine(_DefaultFonts())
+
+def _layout(engine, text, max_width, **kwargs):
+    return engine.layout(text, FONT, SIZE, max_width=max_width, **kwargs).lines
+
+def test_french_never_breaks_before_double_punctuation():
+    engine = _engine()
+    # Assez large pour « ... France » mais pas pour « ... France ? »
+    max_width = engine.measure("Quelle est la capitale de la France", FONT, SIZE) + 1
+    lines = _layout(engine, "Quelle est la capitale de la France ?", max_width)
+    assert lines == ["Quelle est la capitale de la", "France ?"]
+    for text in ("Vrai ou faux !", "Réponse : Paris", "Il a dit « oui »"):
+        for width in range(20, int(engine.measure(text, FONT, SIZE)) + 2, 5):
+            for line in _layout(engine, text, width):
+                assert line.split(" ")[0] not in ("?", "!", ":", "»")
+                assert not line.endswith("«")
+
+def test_french_keeps_overlong_word_whole():
+    engine = _engine()
+    lines = _layout(engine, "anticonstitutionnellement court", 40)
+    assert lines == ["anticonstitutionnellement", "court"]
+
+def test_french_keeps_explicit_line_breaks():
+    engine = _engine()
+    assert _layout(engine, "un\ndeux", None) == ["un", "deux"]
+
+def test_french_lines_fit_width():
+    engine = _engine()
+    text = "Quel est le plus grand océan du monde par sa superficie totale"
+    max_width = 150
+    lines = _layout(engine, text, max_width)
+    assert " ".join(lines) == text
+    assert all(engine.measure(line, FONT, SIZE) <= max_width for line in lines)
+
+def test_japanese_kinsoku_character_by_character():
+    engine = _engine()
+    text = "あいうえお。かきくけこ、「さしすせそ」たちつてと"
+    for chars in range(3, 10):
+        max_width = engine.measure("あ" * chars, FONT, SIZE)
+        lines = _layout(engine, text, max_width, language="ja")
+        assert "".join(lines) == text
+        for line in lines:
+            assert line[0] not in NO_LINE_START
+            assert line[-1] not in NO_LINE_END
+
+def test_japanese_breaks_between_tokens():
+    engine = _engine()
+    tokens = {"きょうはいい天気ですね": ["きょう", "は", "いい", "天気", "です", "ね"]}
+    max_width = engine.measure("あ" * 5, FONT, SIZE)
+    lines = _layout(engine, "きょうはいい天気ですね", max_width, language="ja", tokenize=tokens.__getitem__)
+    assert lines == ["きょうは", "いい天気", "ですね"]
+
+def test_japanese_splits_overlong_unit_with_kinsoku():
+    engine = _engine()
+    text = "あいう「えおかきくけこ」さしす"
+    max_width = engine.measure("あ" * 4, FONT, SIZE)
+    lines = _layout(engine, text, max_width, language="ja", tokenize=lambda paragraph: [paragraph])
+    assert "".join(lines) == text
+    assert len(lines) > 1
+    # Seule une ponctuation fermante, qui ne peut pas commencer la ligne suivante, dépasse
+    closing = "".join(NO_LINE_START)
+    assert all(engine.measure(line.rstrip(closing), FONT, SIZE) <= max_width for line in lines)
+    for line in lines:
+        assert line[0] not in NO_LINE_START
+        assert line[-1] not in NO_LINE_END
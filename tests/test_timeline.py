@@ -0,0 +1,21 @@
+from src.timeline import Timeline
+
+def test_at_returns_active_items_in_insertion_order():
+    timeline = Timeline([(0.0, 2.0, "a"), (1.0, 3.0, "b"), (0.5, 1.5, "c")])
+    assert len(timeline) == 3
+    assert timeline.at(0.0) == ["a"]
+    assert timeline.at(1.0) == ["a", "b", "c"]
+    assert timeline.at(1.5) == ["a", "b"]
+    assert timeline.at(2.5) == ["b"]
+
+def test_at_end_is_exclusive_and_outside_is_empty():
+    timeline = Timeline([(1.0, 2.0, "a")])
+    assert timeline.at(0.5) == []
+    assert timeline.at(1.0) == ["a"]
+    assert timeline.at(2.0) == []
+    assert timeline.at(10.0) == []
+
+def test_at_open_ended_interval():
+    timeline = Timeline([(1.0, None, "music"), (2.0, 3.0, "voice")])
+    assert timeline.at(2.5) == ["music", "voice"]
+    assert timeline.at(1000.0) == ["music"]
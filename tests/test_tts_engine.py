@@ -0,0 +1,102 @@
+import io
+import wave
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from src.tts_engine import TTSEngine
+
+TOO_LONG = "Either `input.text` or `input.ssml` is longer than the limit of 5000 bytes."
+NO_SSML = "This voice currently does not support SSML input."
+
+def _wav(duration=0.5, sample_rate=24000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\0\0" * int(duration * sample_rate))
+    return buffer.getvalue()
+
+class _FakeClient:
+    """Client TTS qui refuse le SSML des textes listés avec le message donné."""
+
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.requests = []
+
+    def synthesize_speech(self, request, timeout=None):
+        ssml = request.input.ssml
+        self.requests.append("ssml" if ssml else "text")
+        for text, message in self.rejected.items():
+            if ssml and text in ssml:
+                raise google_exceptions.InvalidArgument(message)
+        timepoints = []
+        if ssml:
+            names = [str(i) for i in range(ssml.count("<mark") - 1)] + ["end"]
+            timepoints = [SimpleNamespace(mark_name=name, time_seconds=0.05 * i) for i, name in enumerate(names)]
+        return SimpleNamespace(audio_content=_wav(), timepoints=timepoints)
+
+def _engine(tmp_path, monkeypatch, rejected, cache=False):
+    # Les fichiers temporaires du moteur sont relatifs au répertoire courant
+    monkeypatch.chdir(tmp_path)
+    engine = TTSEngine({
+        "tts": {"endpoint": "http://127.0.0.1:9", "language": "fr-FR", "voice": "fr-FR-Stub",
+                "gender": "female", "encoding": "LINEAR16", "cache": cache, "concurrency": 1,
+                "timepoints": True},
+        "subtitles": {"language": "fr"},
+        "path_assets": {"cache": str(tmp_path / "cache")},
+    })
+    engine.client = _FakeClient(rejected)
+    return engine
+
+def test_text_specific_rejection_keeps_marks_for_other_texts(tmp_path, monkeypatch):
+    engine = _engine(tmp_path, monkeypatch, {"interminable": TOO_LONG})
+    results = engine.synthesize_batch(["un texte", "interminable", "encore un texte"])
+    # Seul le texte refusé est relu sans repères
+    assert [words is None for _, _, words in results] == [False, True, False]
+    assert engine.client.requests == ["ssml", "ssml", "text", "ssml"]
+    assert engine._marks_supported
+
+def test_voice_without_ssml_disables_marks(tmp_path, monkeypatch):
+    engine = _engine(tmp_path, monkeypatch, {"premier": NO_SSML})
+    results = engine.synthesize_batch(["premier texte", "second texte"])
+    assert all(words is None for _, _, words in results)
+    assert engine.client.requests == ["ssml", "text", "text"]
+    assert not engine._marks_supported
+
+def test_invalid_text_without_marks_is_raised(tmp_path, monkeypatch):
+    engine = _engine(tmp_path, monkeypatch, {})
+    engine._marks_supported = False
+    def synthesize_speech(request, timeout=None):
+        raise google_exceptions.InvalidArgument("texte invalide")
+    engine.client.synthesize_speech = synthesize_speech
+    # Sans repères, un refus n'a plus de repli
+    with pytest.raises(google_exceptions.InvalidArgument):
+        engine.synthesize_batch(["premier texte"])
+
+def test_cache_key_follows_requested_marks(tmp_path, monkeypatch):
+    engine = _engine(tmp_path, monkeypatch, {}, cache=True)
+    engine.synthesize_batch(["un texte"])
+    cache = engine.audio_cache
+    assert cache.get(engine._cache_key("un texte", True)) is not None
+    # L'audio avec repères n'est pas rendu pour une synthèse sans timing des mots
+    assert cache.get(engine._cache_key("un texte", False)) is None
+    engine.client.requests.clear()
+    results = engine.synthesize_batch(["un texte"])
+    assert engine.client.requests == []
+    assert results[0][2] is not None
+
+def test_refused_ssml_is_cached_under_the_marks_key(tmp_path, monkeypatch):
+    engine = _engine(tmp_path, monkeypatch, {"interminable": TOO_LONG}, cache=True)
+    engine.synthesize_batch(["interminable"])
+    key = engine._cache_key("interminable", True)
+    metadata = engine.audio_cache.get_metadata(key)
+    assert metadata["ssml_refused"] and metadata["words"] is None
+    # Nouveau rendu : ni requête SSML refusée ni nouvelle synthèse
+    engine = _engine(tmp_path, monkeypatch, {"interminable": TOO_LONG}, cache=True)
+    results = engine.synthesize_batch(["interminable"])
+    assert engine.client.requests == []
+    assert results[0][2] is None
+    assert engine._marks_supported
@@ -0,0 +1,52 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from scripts import tts_stub_server
+from scripts.tts_stub_server import StubHandler
+from src.tts_engine import TTSEngine
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    monkeypatch.setattr(StubHandler, "latency", 0.01)
+    monkeypatch.setattr(StubHandler, "failure_rate", 0.5)
+    monkeypatch.setattr(StubHandler, "counters", {"requests": 0, "failures": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def _engine(endpoint, tmp_path):
+    return TTSEngine({
+        "tts": {"endpoint": endpoint, "language": "fr-FR", "voice": "fr-FR-Stub", "gender": "female",
+                "encoding": "LINEAR16", "cache": False, "concurrency": 4,
+                "max_retries": 30, "retry_backoff": 0.001},
+        "subtitles": {"language": "fr"},
+        "path_assets": {"cache": str(tmp_path / "cache")},
+    })
+
+def test_synthesize_batch_retries_and_keeps_input_order(stub_server, tmp_path, monkeypatch):
+    # Les fichiers temporaires du moteur sont relatifs au répertoire courant
+    monkeypatch.chdir(tmp_path)
+    engine = _engine(stub_server, tmp_path)
+    texts = [("mot " * length).strip() for length in (7, 1, 12, 3, 9, 5, 11, 2, 8, 4, 10, 6)]
+    texts.append(texts[0])
+    try:
+        results = engine.synthesize_batch(texts)
+    finally:
+        engine.cleanup()
+    # Une requête sur deux échoue : chaque échec a été relancé, un seul appel par texte distinct abouti
+    counters = StubHandler.counters
+    assert counters["failures"] > 0
+    assert engine.stats["retries"] == counters["failures"]
+    assert counters["requests"] - counters["failures"] == len(texts) - 1
+    # La durée du son dépend de la longueur du texte : elle identifie le résultat de chaque texte
+    assert len(results) == len(texts)
+    for text, (_, duration, words) in zip(texts, results):
+        expected = round(2 * tts_stub_server.LEAD_IN + tts_stub_server.SECONDS_PER_CHAR * len(text), 2)
+        assert duration == pytest.approx(expected, abs=1e-3)
+        assert words is None
+    assert results[-1] == results[0]
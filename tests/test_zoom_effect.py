@@ -0,0 +1,37 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from scripts.zoom_effect import ZoomFrameSource
+
+def _source(width, height, duration=1.0, fps=10, zoom_time=0.5):
+    image = np.random.default_rng(0).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    return ZoomFrameSource(image, width, height, duration, fps, zoom_factor=1.1, zoom_time=zoom_time,
+                           movement_margin=0, movement_type="none")
+
+def test_cycle_frames_of_static_framing():
+    assert _source(16, 16, duration=2.0, fps=10, zoom_time=0.5).cycle_frames() == 5
+    assert _source(16, 16, duration=2.0, fps=10, zoom_time=0.33).cycle_frames() is None
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg introuvable")
+def test_write_video_reports_encoder_failure(tmp_path):
+    # libx264 refuse une largeur impaire : FFmpeg s'arrête avant d'avoir lu les frames
+    source = _source(1081, 301, duration=2.0)
+    with pytest.raises(RuntimeError, match="code"):
+        source.write_video(str(tmp_path / "out.mp4"), workers=1)
+
+def test_loop_duration_is_whole_zoom_cycles():
+    from src.video_generator import VideoGenerator
+    zoom_time = VideoGenerator.ZOOM_PARAMS["zoom_time"]
+    assert VideoGenerator.loop_duration(1.0, 30) == zoom_time
+    assert VideoGenerator.loop_duration(zoom_time, 30) == zoom_time
+    assert VideoGenerator.loop_duration(zoom_time + 0.1, 30) == 2 * zoom_time
+
+def test_loopable_source_wraps_without_jump():
+    from src.video_generator import VideoGenerator
+    duration = VideoGenerator.loop_duration(23.3, 30)
+    source = _source(32, 32, duration=duration, fps=30, zoom_time=VideoGenerator.ZOOM_PARAMS["zoom_time"])
+    # La frame qui suivrait la dernière est la première : la boucle est continue
+    assert source.calculate_zoom(source.num_frames / source.num_frames) == source.calculate_zoom(0)
+    assert (source.render(source.num_frames) == source.render(0)).all()